@@ -84,6 +84,44 @@ if errorlevel 1 (
     "%VENV_PY%" -m pip install --quiet nuitka
 )
 
+REM ==================================================
+REM STARTUP BUDGET (import time + deferred heavy modules)
+REM ==================================================
+echo [INFO] Checking startup budget...
+"%VENV_PY%" py_startup.py --check
+if errorlevel 1 (
+    echo.
+    echo [ERROR] Startup budget check failed - see above.
+    pause
+    exit /b 1
+)
+
+REM ==================================================
+REM PIPELINE BENCHMARK (only when a baseline is kept)
+REM ==================================================
+if exist bench_baseline.json (
+    echo [INFO] Benchmarking pipelines against bench_baseline.json...
+    "%VENV_PY%" py_bench.py --scales small,medium --repeat 3 --baseline bench_baseline.json --out bench_latest.json
+    if errorlevel 1 (
+        echo.
+        echo [ERROR] Pipeline benchmark regressed - see above, or refresh the baseline from bench_latest.json.
+        pause
+        exit /b 1
+    )
+)
+
+REM ==================================================
+REM MEMORY BUDGETS (bulk I/O must stream)
+REM ==================================================
+echo [INFO] Checking peak memory of the I/O pipelines...
+"%VENV_PY%" py_bench.py --memory
+if errorlevel 1 (
+    echo.
+    echo [ERROR] A pipeline stage went over its memory budget - see above.
+    pause
+    exit /b 1
+)
+
 REM ==================================================
 REM READ BUILD VERSION
 REM ==================================================
@@ -98,11 +136,23 @@ REM Versioned output name
 set VERSIONED_EXE=%PROJECT_NAME%-%BUILDVER%.exe
 set TARGET_EXE=%DISTDIR%\%VERSIONED_EXE%
 
+REM ==================================================
+REM KEEP THE PREVIOUS BUILD (delta patch source)
+REM ==================================================
+set "PREV_EXE="
+for %%F in ("%DISTDIR%\%PROJECT_NAME%-*.exe") do set "PREV_EXE=%%~nxF"
+if defined PREV_EXE (
+    if not exist "%DISTDIR%\previous" mkdir "%DISTDIR%\previous"
+    del /q "%DISTDIR%\previous\%PROJECT_NAME%-*.exe" 2>nul
+    move /Y "%DISTDIR%\!PREV_EXE!" "%DISTDIR%\previous\!PREV_EXE!" >nul
+)
+
 REM ==================================================
 REM CLEAN PREVIOUS BUILDS (OPTIONAL: removes all versions)
 REM ==================================================
 echo [INFO] Cleaning previous builds...
 if exist "%DISTDIR%\%PROJECT_NAME%-*.exe" del /q "%DISTDIR%\%PROJECT_NAME%-*.exe" 2>nul
+if exist "%DISTDIR%\%PROJECT_NAME%-*.mgpatch" del /q "%DISTDIR%\%PROJECT_NAME%-*.mgpatch" 2>nul
 
 REM ==================================================
 REM NUITKA BUILD
@@ -143,6 +193,19 @@ if not exist "%TARGET_EXE%" (
     exit /b 1
 )
 
+REM ==================================================
+REM DELTA PATCH FROM THE PREVIOUS BUILD (upload next to the exe)
+REM ==================================================
+if defined PREV_EXE (
+    set "PREV_VER=!PREV_EXE:%PROJECT_NAME%-=!"
+    set "PREV_VER=!PREV_VER:.exe=!"
+    if not "!PREV_VER!"=="%BUILDVER%" (
+        echo [INFO] Creating delta patch !PREV_VER! -^> %BUILDVER%...
+        "%VENV_PY%" py_delta.py make "%DISTDIR%\previous\!PREV_EXE!" "%TARGET_EXE%" "%DISTDIR%\%PROJECT_NAME%-!PREV_VER!-to-%BUILDVER%.mgpatch"
+        if errorlevel 1 echo [WARNING] Delta patch failed - release the full exe only.
+    )
+)
+
 REM ==================================================
 REM TIMER END
 REM ==================================================
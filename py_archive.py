@@ -1,4 +1,7 @@
 from py_imports import *
+from py_templedger import temp_ledger
+from py_spans import span
+from py_progress import Progress
 import subprocess, shutil, zipfile
 
 class ArchiveBundler:
@@ -14,19 +17,30 @@ class ArchiveBundler:
         return self.sevenz_path.exists()
     
 
+    @staticmethod
+    def extraction_dir(archive_name: str) -> Path:
+        temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
+        base = Path(archive_name).stem
+        ts = datetime.now().strftime("%Y%m%d%H%M%S")
+        return temp_root / "ModGnizer" / "extracted_reassembled" / f"{base}_{ts}"
+
     @staticmethod
     def extract_archive(archive_path: Path, password: str | None = None) -> Path | None:
         archive_path = Path(archive_path)
         if not archive_path.exists():
             return None
+        with span("archive.extract", format=archive_path.suffix.lower()) as s:
+            s.add(bytes=archive_path.stat().st_size)
+            return ArchiveBundler._extract_archive(archive_path, password)
+
+    @staticmethod
+    def _extract_archive(archive_path: Path, password: str | None) -> Path | None:
 
         # Output directory
-        temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
-        base = archive_path.stem
-        ts = datetime.now().strftime("%Y%m%d%H%M%S")
-        out_dir = temp_root / "ModGnizer" / "extracted_reassembled" / f"{base}_{ts}"
+        out_dir = ArchiveBundler.extraction_dir(archive_path.name)
 
         if out_dir.exists():
+            temp_ledger().discard(out_dir)
             shutil.rmtree(out_dir)
         out_dir.mkdir(parents=True, exist_ok=True)
 
@@ -35,10 +49,14 @@ class ArchiveBundler:
         # ZIP → Python built‑in
         if ext == ".zip":
             with zipfile.ZipFile(archive_path, "r") as zf:
-                if password:
-                    zf.extractall(out_dir, pwd=password.encode())
-                else:
-                    zf.extractall(out_dir)
+                members = zf.infolist()
+                pwd = password.encode() if password else None
+                # Same as extractall, one member at a time so progress can be reported
+                with Progress(f"Extracting {archive_path.name}", sum(m.file_size for m in members), len(members)) as progress:
+                    for member in members:
+                        zf.extract(member, out_dir, pwd=pwd)
+                        progress.update(member.file_size, items=1)
+            temp_ledger().add(out_dir)
             return out_dir
 
         # External tools
@@ -53,6 +71,7 @@ class ArchiveBundler:
             if password:
                 cmd.append(f"-p{password}")
             subprocess.run(cmd, check=True)
+            temp_ledger().add(out_dir)
             return out_dir
 
 
@@ -65,6 +84,7 @@ class ArchiveBundler:
                 cmd.append(f"-p{password}")
             cmd += [str(archive_path), str(out_dir)]
             subprocess.run(cmd, check=True)
+            temp_ledger().add(out_dir)
             return out_dir
 
         return None
@@ -83,7 +103,10 @@ class ArchiveBundler:
             cmd.insert(2, f"-p{password}")
             cmd.insert(3, "-mhe=on")  # encrypt file list
 
-        subprocess.run(cmd, check=True)
+        with span("archive.bundle", format="7z") as s, Progress(f"Bundling {Path(output_file).name} (7-Zip)") as progress:
+            subprocess.run(cmd, check=True)
+            progress.update(Path(output_file).stat().st_size)
+            s.add(bytes=progress.bytes_done)
         return output_file
 
     
@@ -105,7 +128,10 @@ class ArchiveBundler:
         if password:
             cmd.insert(3, f"-hp{password}")  # full encryption (file list too)
 
-        subprocess.run(cmd, check=True)
+        with span("archive.bundle", format="rar") as s, Progress(f"Bundling {Path(output_file).name} (WinRAR)") as progress:
+            subprocess.run(cmd, check=True)
+            progress.update(Path(output_file).stat().st_size)
+            s.add(bytes=progress.bytes_done)
         return output_file
 
 
@@ -113,10 +139,14 @@ class ArchiveBundler:
 
     def bundle_zip(self, output_file: Path):
         compression = zipfile.ZIP_DEFLATED
-        with zipfile.ZipFile(output_file, "w", compression=compression) as zipf:
-            for root, _, files in os.walk(self.source_folder):
-                for file in files:
-                    full_path = Path(root) / file
+        sources = [Path(root) / file for root, _, files in os.walk(self.source_folder) for file in files]
+        sizes = [p.stat().st_size for p in sources]
+        # progress: input bytes compressed; span: archive bytes written
+        with span("archive.bundle", format="zip") as s, Progress(f"Bundling {Path(output_file).name}", sum(sizes), len(sources)) as progress:
+            with zipfile.ZipFile(output_file, "w", compression=compression) as zipf:
+                for full_path, size in zip(sources, sizes):
                     arcname = full_path.relative_to(self.source_folder)
                     zipf.write(full_path, arcname)
+                    progress.update(size, items=1)
+            s.add(bytes=Path(output_file).stat().st_size, items=len(sources))
         return output_file
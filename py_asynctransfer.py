@@ -0,0 +1,138 @@
+# py_asynctransfer.py
+from __future__ import annotations
+from typing import Dict, Any, List, Callable
+from py_imports import *
+from py_tmpfiles import TmpFilesClient, TmpFilesError
+import asyncio
+import threading
+import requests
+
+
+class AsyncTmpFilesClient(TmpFilesClient):
+    """
+    TmpFilesClient whose multi-part transfers run concurrently on an asyncio loop.
+
+    Same public API as TmpFilesClient (upload, upload_in_chunks, download,
+    download_from_paste), plus *_async coroutines for callers that already run
+    an event loop. Each part is still a blocking `requests` call, executed in a
+    worker thread with its own Session; at most `concurrency` run at once.
+    Part order, digests, retries and cleanup behave exactly as in the base client.
+    """
+
+    DEFAULT_CONCURRENCY = 4
+
+    def __init__(self, *args, concurrency: int = DEFAULT_CONCURRENCY, **kwargs):
+        self._local = threading.local()
+        self.concurrency = max(1, int(concurrency))
+        super().__init__(*args, **kwargs)
+
+    # requests.Session isn't guaranteed thread-safe: one per worker thread
+    @property
+    def session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._make_session()
+        return session
+
+    @session.setter
+    def session(self, value: requests.Session):
+        self._local.session = value
+
+    # -------------------------
+    # ASYNC API
+    # -------------------------
+
+    async def upload_async(self, file_path: Path) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.upload, file_path)
+
+    async def download_async(self, url: str, expected_sha256: str | None = None, expected_size: int | None = None, store: str | None = None) -> Path:
+        return await asyncio.to_thread(self.download, url, expected_sha256, expected_size, store)
+
+    async def upload_in_chunks_async(self, file_path: Path, chunk_size: int | None = None, cleanup_parts: bool = True) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.upload_in_chunks, file_path, chunk_size, cleanup_parts)
+
+    async def download_from_paste_async(self, manifest: dict, cleanup_parts: bool = True, on_part: Callable[[int, Path], None] | None = None, reassemble: bool = True) -> List[Path]:
+        return await asyncio.to_thread(self.download_from_paste, manifest, cleanup_parts, on_part, reassemble)
+
+    async def upload_parts_async(self, parts: List[Path]) -> tuple[List[str], List[Any]]:
+        results = await self._bounded(self._upload_part, [(p,) for p in parts])
+        self._raise_first(results)
+        return [link for link, _ in results], [payload for _, payload in results]
+
+    async def fetch_parts_async(
+        self,
+        links: List[str],
+        part_digests: List[str],
+        part_sizes: List[int] | None = None,
+        store: str | None = None,
+        on_part: Callable[[int, Path], None] | None = None,
+    ) -> List[Path]:
+        calls = [
+            (
+                idx, len(links), link,
+                part_digests[idx - 1] if part_digests else None,
+                part_sizes[idx - 1] if part_sizes else None,
+                store,
+            )
+            for idx, link in enumerate(links, start=1)
+        ]
+        def fetch(idx, *args):
+            path = self._fetch_part(idx, *args)
+            if on_part:
+                on_part(idx - 1, path)
+            return path
+
+        results = await self._bounded(fetch, calls)
+        try:
+            self._raise_first(results)
+        except Exception:
+            # Best-effort cleanup of the parts that did arrive
+            self._discard([r for r in results if isinstance(r, Path)])
+            raise
+        return results
+
+    # -------------------------
+    # OVERRIDES (used by upload_in_chunks / download_from_paste)
+    # -------------------------
+
+    def _upload_parts(self, parts: List[Path]) -> tuple[List[str], List[Any]]:
+        return self._run(self.upload_parts_async(parts))
+
+    def _fetch_parts(
+        self,
+        links: List[str],
+        part_digests: List[str],
+        part_sizes: List[int] | None = None,
+        store: str | None = None,
+        on_part: Callable[[int, Path], None] | None = None,
+    ) -> List[Path]:
+        return self._run(self.fetch_parts_async(links, part_digests, part_sizes, store, on_part))
+
+    # -------------------------
+    # HELPERS
+    # -------------------------
+
+    async def _bounded(self, fn: Callable, calls: List[tuple]) -> List[Any]:
+        """Run fn(*args) for each args tuple in worker threads, `concurrency` at a time. Results keep call order."""
+        gate = asyncio.Semaphore(self.concurrency)
+
+        async def run(args):
+            async with gate:
+                return await asyncio.to_thread(fn, *args)
+
+        return await asyncio.gather(*(run(args) for args in calls), return_exceptions=True)
+
+    @staticmethod
+    def _raise_first(results: List[Any]):
+        for r in results:
+            if isinstance(r, BaseException):
+                raise r
+
+    @staticmethod
+    def _run(coro):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        coro.close()
+        raise TmpFilesError("Blocking transfer called from a running event loop; use the *_async methods.")
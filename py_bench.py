@@ -0,0 +1,513 @@
+# py_bench.py
+"""
+Offline end-to-end benchmark of the load and share pipelines.
+
+Builds synthetic launchers in a scratch folder (a Modrinth app.db with its
+`profiles` and `cache` tables, CurseForge instances with minecraftinstance.json
+manifests, mods folders of random "jar" bytes), points TEMP/APPDATA at it, runs a
+py_tmpfiles_standin server and times every stage of the real code paths:
+
+    discover_modrinth    UnDBJ over app.db
+    discover_curseforge  UnDBJ over the Instances folder, cold then warm (catalog)
+    bundle               ArchiveBundler.bundle_zip of one profile
+    upload               TmpFilesClient.upload_in_chunks to the stand-in
+    download             share download + reassembly (TmpFilesClient)
+    extract              ArchiveBundler.extract_archive
+    download_extract     the menu's path: parallel parts, extracted while downloading
+    diff                 py_report.diff_profile against a profile sharing half the mods
+    install              py_report.install_mods (backup + copy)
+
+    python py_bench.py                                   # small + medium
+    python py_bench.py --scales small,medium,large --repeat 3 --out bench.json
+    python py_bench.py --baseline bench_baseline.json    # exit 1 on a regression
+    python py_bench.py --custom 20,300,1024              # profiles,mods,KB per mod
+
+The JSON report holds, per scale, the median seconds of each stage over --repeat
+runs with the bytes/items it processed. Against --baseline, a stage regresses when
+it is more than --tolerance slower and at least --min-delta seconds slower.
+
+    python py_bench.py --memory                          # exit 1 over a memory budget
+
+--memory runs the pipeline once over a few mods far bigger than any budget, split
+into parts bigger still, with tracemalloc on: every bulk I/O stage must peak under
+its MEMORY_BUDGETS entry, i.e. stream through fixed-size buffers instead of
+holding a file, part or archive in memory.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List
+from py_imports import *
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+MB = 1024 * 1024
+
+SCALES: Dict[str, Dict[str, int]] = {
+    "small":  {"profiles": 10,  "mods": 50,  "mod_kb": 64},
+    "medium": {"profiles": 50,  "mods": 200, "mod_kb": 256},
+    "large":  {"profiles": 200, "mods": 400, "mod_kb": 512},
+}
+STAGES = (
+    "discover_modrinth", "discover_curseforge_cold", "discover_curseforge_warm",
+    "bundle", "upload", "download", "extract", "download_extract",
+    "diff", "install",
+)
+# --memory: mods of 12-36 MB in 48 MB parts, so a stage holding any one of them blows its budget
+MEMORY_SCALE = {"profiles": 2, "mods": 4, "mod_kb": 24 * 1024}
+MEMORY_CHUNK = 48 * MB
+MEMORY_BUDGETS = {  # peak bytes allocated by Python during the stage
+    "bundle": 4 * MB,
+    "upload": 6 * MB,
+    "download": 6 * MB,
+    "extract": 4 * MB,
+    "download_extract": 10 * MB,  # a 1 MiB read buffer per concurrent part + inflate state
+    "diff": 4 * MB,
+    "install": 4 * MB,
+}
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA = 0.05
+
+
+# -------------------------
+# FIXTURES
+# -------------------------
+
+class Fixture:
+    """Synthetic Modrinth + CurseForge installs under `root` (deterministic for a given seed)."""
+
+    def __init__(self, root: Path, profiles: int, mods: int, mod_kb: int, seed: int = 1):
+        self.root = Path(root)
+        self.profiles = profiles
+        self.mods = mods
+        self.mod_size = mod_kb * 1024
+        self.rng = random.Random(seed)
+        self.appdata = self.root / "appdata"
+        self.modrinth_db = self.appdata / "ModrinthApp" / "app.db"
+        self.instances = self.root / "curseforge" / "Instances"
+        self.temp = self.root / "temp"
+
+    def build(self):
+        self.temp.mkdir(parents=True, exist_ok=True)
+        self._build_modrinth()
+        self._build_curseforge()
+
+    def source_profile(self) -> Path:
+        """The instance that gets bundled and shared."""
+        return self.instances / "Instance 000"
+
+    def reset_target(self) -> Path:
+        """(Re)write the instance the share is diffed against / installed into: half the source's mods, half changed."""
+        target = self.instances / "Bench Target" / "mods"
+        if target.exists():
+            shutil.rmtree(target)
+        target.mkdir(parents=True)
+        rng = random.Random(7)
+        for i, src in enumerate(sorted(self.source_profile().joinpath("mods").iterdir())):
+            if i % 2 == 0:
+                shutil.copy2(src, target / src.name)
+            elif i % 4 == 1:
+                (target / src.name).write_bytes(rng.randbytes(src.stat().st_size))
+        (target / "only-in-target.jar").write_bytes(rng.randbytes(self.mod_size))
+        self._write_manifest(target.parent, "Bench Target", target)
+        return target
+
+    def _mod_names(self, index: int) -> List[str]:
+        return [f"mod-{index:03d}-{m:04d}.jar" for m in range(self.mods)]
+
+    def _write_mods(self, mods_dir: Path, names: List[str]):
+        mods_dir.mkdir(parents=True, exist_ok=True)
+        for name in names:
+            # Jars are already compressed: random bytes, +-50% around the configured size
+            size = max(1024, int(self.mod_size * self.rng.uniform(0.5, 1.5)))
+            (mods_dir / name).write_bytes(self.rng.randbytes(size))
+
+    def _build_modrinth(self):
+        profiles_dir = self.modrinth_db.parent / "profiles"
+        self.modrinth_db.parent.mkdir(parents=True, exist_ok=True)
+        self.modrinth_db.unlink(missing_ok=True)
+        conn = sqlite3.connect(self.modrinth_db)
+        try:
+            conn.execute("CREATE TABLE profiles (path TEXT, name TEXT, game_version TEXT, mod_loader TEXT, last_played INTEGER)")
+            conn.execute("CREATE TABLE cache (id TEXT, data_type TEXT, data TEXT)")
+            for p in range(self.profiles):
+                folder = f"profile-{p:03d}"
+                conn.execute(
+                    "INSERT INTO profiles VALUES (?, ?, ?, ?, ?)",
+                    (folder, f"Bench Profile {p}", "1.20.1", "fabric", 1_700_000_000 + p * 3600),
+                )
+                # Discovery reads the DB only: empty mods folders, but a full-size hash cache
+                (profiles_dir / folder / "mods").mkdir(parents=True, exist_ok=True)
+                conn.executemany(
+                    "INSERT INTO cache VALUES (?, 'file_hash', ?)",
+                    [
+                        (f"{folder}/mods/{name}", json.dumps({"path": f"{folder}/mods/{name}", "size": self.mod_size, "hash": self.rng.randbytes(20).hex()}))
+                        for name in self._mod_names(p)
+                    ],
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _build_curseforge(self):
+        for p in range(self.profiles):
+            inst = self.instances / f"Instance {p:03d}"
+            mods_dir = inst / "mods"
+            if p == 0:
+                self._write_mods(mods_dir, self._mod_names(p))
+            else:
+                mods_dir.mkdir(parents=True, exist_ok=True)
+            self._write_manifest(inst, f"Bench Instance {p}", mods_dir)
+
+    def _write_manifest(self, inst: Path, name: str, mods_dir: Path):
+        # Shaped like CurseForge's: the fields UnDBJ reads up front, a large installedAddons array after
+        addons = []
+        files = sorted(mods_dir.iterdir()) if mods_dir.exists() else []
+        names = [f.name for f in files] or self._mod_names(0)
+        for i, file_name in enumerate(names):
+            path = mods_dir / file_name
+            addons.append({
+                "addonID": 100000 + i,
+                "name": file_name[:-4],
+                "installedFile": {
+                    "id": 4000000 + i,
+                    "fileName": file_name,
+                    "fileLength": path.stat().st_size if path.exists() else self.mod_size,
+                    "hashes": [
+                        {"type": 1, "value": _sha1(path) if path.exists() else "0" * 40},
+                        {"type": 2, "value": str(i)},
+                    ],
+                    "dependencies": [{"addonId": 100000 + (i + 1) % len(names), "type": 3}],
+                    "modules": [{"foldername": "META-INF", "fingerprint": i}, {"foldername": "assets", "fingerprint": i + 1}],
+                },
+                "dateInstalled": "2024-01-01T00:00:00Z",
+            })
+        manifest = {
+            "name": name,
+            "gameVersion": "1.20.1",
+            "minecraftVersion": "1.20.1",
+            "baseModLoader": {"name": "forge-47.2.0", "minecraftVersion": "1.20.1"},
+            "modLoader": "forge",
+            "lastPlayed": "1700000000000",
+            "installedAddons": addons,
+            "allocatedMemory": 8192,
+        }
+        inst.mkdir(parents=True, exist_ok=True)
+        (inst / "minecraftinstance.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+
+def _sha1(path: Path) -> str:
+    import hashlib
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+# -------------------------
+# RUN
+# -------------------------
+
+class _Timer:
+    def __init__(self):
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def run(self, stage: str, fn: Callable, nbytes: Callable[[Any], int] | int = 0, items: Callable[[Any], int] | int = 0):
+        # Under tracemalloc (--memory), also the stage's peak above what was allocated before it
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - started
+        self.results[stage] = {
+            "seconds": seconds,
+            "bytes": nbytes(result) if callable(nbytes) else nbytes,
+            "items": items(result) if callable(items) else items,
+        }
+        if tracing:
+            self.results[stage]["peak_bytes"] = tracemalloc.get_traced_memory()[1] - before
+        return result
+
+
+def run_pipeline(fixture: Fixture, base_url: str, chunk_size: int, concurrency: int) -> Dict[str, Dict[str, Any]]:
+    """One pass over every stage with cold caches. Returns {stage: {"seconds", "bytes", "items"}}."""
+    from py_archive import ArchiveBundler
+    from py_asynctransfer import AsyncTmpFilesClient
+    from py_hashcache import HashCache
+    from py_report import DIFF_HASH, diff_profile, install_mods
+    from py_streamzip import PipelinedZipExtraction
+    from py_tmpfiles import TmpFilesClient
+    from py_undbj import UnDBJ
+
+    # Cold caches: everything ModGnizer keeps under %TEMP%/ModGnizer
+    shutil.rmtree(fixture.temp / "ModGnizer", ignore_errors=True)
+    target = fixture.reset_target()
+    work = fixture.root / "work"
+    shutil.rmtree(work, ignore_errors=True)
+    work.mkdir()
+    t = _Timer()
+
+    t.run("discover_modrinth", lambda: UnDBJ(fixture.modrinth_db).get_internal_profiles(), items=len)
+    t.run("discover_curseforge_cold", lambda: UnDBJ(fixture.instances).get_internal_profiles(), items=len)
+    t.run("discover_curseforge_warm", lambda: UnDBJ(fixture.instances).get_internal_profiles(), items=len)
+
+    source = fixture.source_profile() / "mods"
+    archive = work / "bench_share.zip"
+    t.run("bundle", lambda: ArchiveBundler(source).bundle_zip(archive), nbytes=lambda p: p.stat().st_size, items=fixture.mods)
+
+    client = TmpFilesClient(base_url=base_url, use_cache=False)
+    upload = t.run(
+        "upload", lambda: client.upload_in_chunks(archive, chunk_size=chunk_size),
+        nbytes=lambda r: r["size"], items=lambda r: len(r["links"]),
+    )
+    manifest = TmpFilesClient.parse_modgnizer_manifest(TmpFilesClient.encode_manifest_payload(
+        archive.name, upload["size"], "bench", upload["links"], upload["sha256"],
+        upload["part_sha256s"], upload["part_sizes"], upload["backend"], upload["expires_at"],
+    ))
+
+    downloaded = t.run(
+        "download", lambda: client.download_from_paste(manifest)[0],
+        nbytes=lambda p: p.stat().st_size, items=len(upload["links"]),
+    )
+    t.run("extract", lambda: ArchiveBundler.extract_archive(downloaded), nbytes=upload["size"], items=fixture.mods)
+
+    # The menu's path (App.fetch_share): parallel parts, each extracted as soon as it arrives
+    def download_extract():
+        async_client = AsyncTmpFilesClient(base_url=base_url, use_cache=False, concurrency=concurrency)
+        pipeline = PipelinedZipExtraction(
+            ArchiveBundler.extraction_dir(archive.name), len(upload["links"]), manifest.get("sha256")
+        )
+        try:
+            parts = async_client.download_from_paste(
+                manifest, cleanup_parts=False, on_part=pipeline.part_ready, reassemble=False
+            )
+        except Exception:
+            pipeline.abort()
+            raise
+        out = pipeline.finish()
+        if not out:
+            async_client._discard(parts)
+            raise RuntimeError(f"streaming extraction fell back: {pipeline.fallback_reason}")
+        return out, pipeline.digests
+    extracted, digests = t.run("download_extract", download_extract, nbytes=upload["size"], items=fixture.mods)
+
+    diff = t.run(
+        "diff", lambda: diff_profile(extracted, target, digests, HashCache(DIFF_HASH)),
+        items=lambda d: len(d["extracted_files"]) + len(d["profile_files"]),
+    )
+    t.run(
+        "install", lambda: install_mods(diff["extracted_files"], diff["profile_files"], target),
+        nbytes=sum(f.stat().st_size for f in diff["extracted_files"]) + sum(f.stat().st_size for f in diff["profile_files"]),
+        items=len(diff["extracted_files"]) + len(diff["profile_files"]),
+    )
+    return t.results
+
+
+@contextlib.contextmanager
+def _bench_env(name: str, config: Dict[str, int], keep: bool = False):
+    """A built Fixture with TEMP/APPDATA pointed into it and a stand-in server; yields (fixture, server)."""
+    from py_tmpfiles_standin import StandInServer
+
+    root = Path(tempfile.mkdtemp(prefix=f"modgnizer_bench_{name}_"))
+    saved_env = {k: os.environ.get(k) for k in ("TEMP", "APPDATA")}
+    try:
+        fixture = Fixture(root, **config)
+        os.environ["TEMP"] = str(fixture.temp)
+        os.environ["APPDATA"] = str(fixture.appdata)
+        started = time.perf_counter()
+        fixture.build()
+        print(f"[{name}] fixtures: {config} ({time.perf_counter() - started:.1f}s)", file=sys.stderr)
+        with StandInServer(root=root / "standin") as server:
+            yield fixture, server
+    finally:
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        if keep:
+            print(f"[{name}] kept {root}", file=sys.stderr)
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def run_scale(name: str, config: Dict[str, int], repeat: int, chunk_size: int, concurrency: int, keep: bool = False, verbose: bool = False) -> Dict[str, Any]:
+    runs = []
+    with _bench_env(name, config, keep) as (fixture, server):
+        for i in range(repeat):
+            # The pipelines' own progress lines would only measure the console
+            with contextlib.redirect_stdout(sys.stderr if verbose else io.StringIO()):
+                runs.append(run_pipeline(fixture, server.base_url, chunk_size, concurrency))
+            print(f"[{name}] run {i + 1}/{repeat}: " + ", ".join(f"{s} {r['seconds']:.2f}s" for s, r in runs[-1].items()), file=sys.stderr)
+
+    stages = {}
+    for stage in STAGES:
+        seconds = statistics.median(run[stage]["seconds"] for run in runs)
+        nbytes = runs[0][stage]["bytes"]
+        stages[stage] = {
+            "seconds": round(seconds, 4),
+            "bytes": nbytes,
+            "items": runs[0][stage]["items"],
+            "mb_per_s": round(nbytes / MB / seconds, 2) if nbytes and seconds > 0 else None,
+        }
+    return {"config": config, "repeat": repeat, "stages": stages}
+
+
+def run_memory(concurrency: int, keep: bool = False, verbose: bool = False) -> Dict[str, Any]:
+    """
+    One pipeline run over MEMORY_SCALE in MEMORY_CHUNK parts under tracemalloc.
+    {"config", "chunk", "stages": {stage: {"peak_bytes", "budget", "bytes", "over"}}, "over_budget": [...]}
+    """
+    stages, over_budget = {}, []
+    with _bench_env("memory", MEMORY_SCALE, keep) as (fixture, server):
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(sys.stderr if verbose else io.StringIO()):
+                results = run_pipeline(fixture, server.base_url, MEMORY_CHUNK, concurrency)
+        finally:
+            tracemalloc.stop()
+    for stage, budget in MEMORY_BUDGETS.items():
+        r = results[stage]
+        over = r["peak_bytes"] > budget
+        stages[stage] = {"peak_bytes": r["peak_bytes"], "budget": budget, "bytes": r["bytes"], "over": over}
+        if over:
+            over_budget.append(stage)
+    return {"config": MEMORY_SCALE, "chunk": MEMORY_CHUNK, "stages": stages, "over_budget": over_budget}
+
+
+# -------------------------
+# BASELINE
+# -------------------------
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_delta: float) -> Dict[str, Any]:
+    """
+    {"regressions": [...], "stages": {"<scale>/<stage>": {"baseline", "current", "ratio", "regressed"}}}
+    Only scales/stages present in both reports are compared.
+    """
+    stages, regressions = {}, []
+    for scale, current in report["scales"].items():
+        before = baseline.get("scales", {}).get(scale)
+        if not before:
+            continue
+        if before.get("config") != current["config"]:
+            print(f"[{scale}] baseline was measured with {before.get('config')}: skipped", file=sys.stderr)
+            continue
+        for stage, now in current["stages"].items():
+            then = before["stages"].get(stage)
+            if not then:
+                continue
+            ratio = now["seconds"] / then["seconds"] if then["seconds"] else None
+            regressed = (
+                now["seconds"] - then["seconds"] >= min_delta
+                and now["seconds"] > then["seconds"] * (1 + tolerance)
+            )
+            key = f"{scale}/{stage}"
+            stages[key] = {
+                "baseline": then["seconds"],
+                "current": now["seconds"],
+                "ratio": round(ratio, 3) if ratio is not None else None,
+                "regressed": regressed,
+            }
+            if regressed:
+                regressions.append(key)
+    return {"tolerance": tolerance, "min_delta": min_delta, "regressions": regressions, "stages": stages}
+
+
+def print_report(report: Dict[str, Any]):
+    comparison = report.get("comparison", {}).get("stages", {})
+    for scale, result in report["scales"].items():
+        print(f"\n{scale}: {result['config']}")
+        for stage, r in result["stages"].items():
+            rate = f"{r['mb_per_s']:8.1f} MB/s" if r["mb_per_s"] else " " * 13
+            line = f"  {stage:<26} {r['seconds']:8.3f}s {rate} {r['items']:>7} items"
+            c = comparison.get(f"{scale}/{stage}")
+            if c and c["ratio"] is not None:
+                line += f"   x{c['ratio']:.2f} vs baseline" + ("  << REGRESSION" if c["regressed"] else "")
+            print(line)
+
+
+def print_memory_report(report: Dict[str, Any]):
+    print(f"\nmemory: {report['config']}, {report['chunk'] // MB} MB parts")
+    for stage, r in report["stages"].items():
+        line = f"  {stage:<26} peak {r['peak_bytes'] / MB:7.2f} MB of {r['budget'] / MB:5.1f} MB   ({r['bytes'] / MB:.0f} MB through)"
+        print(line + ("  << OVER BUDGET" if r["over"] else ""))
+
+
+# -------------------------
+# MAIN
+# -------------------------
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark of the ModGnizer pipelines")
+    parser.add_argument("--scales", default="small,medium", help=f"comma-separated, from: {', '.join(SCALES)}")
+    parser.add_argument("--custom", metavar="PROFILES,MODS,KB", help="an extra scale: profiles, mods in the shared profile, KB per mod")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per scale (median reported)")
+    parser.add_argument("--chunk", type=int, default=8 * MB, help="upload part size in bytes")
+    parser.add_argument("--concurrency", type=int, default=4, help="parallel part downloads in download_extract")
+    parser.add_argument("--out", type=Path, help="write the JSON report here")
+    parser.add_argument("--baseline", type=Path, help="earlier report to compare against; exit 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA, help="ignore slowdowns under this many seconds")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch folders")
+    parser.add_argument("--verbose", action="store_true", help="show the pipelines' own output (on stderr)")
+    parser.add_argument("--memory", action="store_true", help="check peak memory of the bulk I/O stages against MEMORY_BUDGETS instead")
+    args = parser.parse_args(argv)
+
+    if args.memory:
+        report = run_memory(args.concurrency, args.keep, args.verbose)
+        print_memory_report(report)
+        if args.out:
+            args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+            print(f"\nReport: {args.out}")
+        if report["over_budget"]:
+            print(f"\n{len(report['over_budget'])} stage(s) over their memory budget: {', '.join(report['over_budget'])}")
+            return 1
+        return 0
+
+    scales = {}
+    for name in filter(None, (s.strip() for s in args.scales.split(","))):
+        if name not in SCALES:
+            parser.error(f"unknown scale {name!r}")
+        scales[name] = SCALES[name]
+    if args.custom:
+        try:
+            profiles, mods, kb = (int(x) for x in args.custom.split(","))
+        except ValueError:
+            parser.error("--custom takes PROFILES,MODS,KB")
+        scales["custom"] = {"profiles": profiles, "mods": mods, "mod_kb": kb}
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else None
+
+    report: Dict[str, Any] = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "chunk": args.chunk,
+        "scales": {
+            name: run_scale(name, config, max(args.repeat, 1), args.chunk, args.concurrency, args.keep, args.verbose)
+            for name, config in scales.items()
+        },
+    }
+    if baseline:
+        report["comparison"] = compare(report, baseline, args.tolerance, args.min_delta)
+
+    print_report(report)
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nReport: {args.out}")
+
+    regressions = report.get("comparison", {}).get("regressions", [])
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) regressed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
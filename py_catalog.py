@@ -0,0 +1,237 @@
+# py_catalog.py
+from __future__ import annotations
+from typing import Dict, Any
+from py_imports import *
+import json
+
+
+class InstanceCatalog:
+    """
+    Persistent record of what was read from each CurseForge instance, so the
+    profile menu doesn't re-search and re-parse every instance each time it opens.
+
+    Stored in %TEMP%/ModGnizer/instance_catalog.json, keyed by instance directory:
+        {
+            "<instance dir>": {
+                "manifest": "<path of minecraftinstance.json>",
+                "mtime_ns": int,     # manifest stat when parsed
+                "size": int,
+                "fields": {...},     # what UnDBJ extracted ({} = malformed JSON)
+            }
+        }
+    An entry is reused only while the manifest still has the same mtime and size.
+    """
+
+    CATALOG_NAME = "instance_catalog.json"
+
+    def __init__(self, path: Path | None = None):
+        if path is None:
+            temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
+            path = temp_root / "ModGnizer" / self.CATALOG_NAME
+        self.path = Path(path)
+        self._entries: Dict[str, Dict[str, Any]] | None = None
+        self._dirty = False
+
+    # -------------------------
+    # PUBLIC API
+    # -------------------------
+
+    def manifest_path(self, instance_dir: Path) -> Path | None:
+        """Where the manifest was found last time, if it is still there."""
+        entry = self._load().get(str(instance_dir))
+        if not entry or not entry.get("manifest"):
+            return None
+        manifest = Path(entry["manifest"])
+        return manifest if manifest.is_file() else None
+
+    def fields(self, instance_dir: Path, manifest: Path, st: os.stat_result) -> Dict[str, Any] | None:
+        """Cached fields for this manifest, or None when it moved or changed since it was parsed."""
+        entry = self._load().get(str(instance_dir))
+        if (
+            not entry
+            or entry.get("manifest") != str(manifest)
+            or entry.get("mtime_ns") != st.st_mtime_ns
+            or entry.get("size") != st.st_size
+        ):
+            return None
+        return entry.get("fields")
+
+    def put(self, instance_dir: Path, manifest: Path, st: os.stat_result, fields: Dict[str, Any]):
+        self._load()[str(instance_dir)] = {
+            "manifest": str(manifest),
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "fields": fields,
+        }
+        self._dirty = True
+
+    def prune(self, root: Path, seen: set[str]):
+        """Forget instances under root that no longer exist."""
+        entries = self._load()
+        for key in [k for k in entries if Path(k).parent == Path(root) and k not in seen]:
+            del entries[key]
+            self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._entries), encoding="utf-8")
+            tmp.replace(self.path)
+            self._dirty = False
+        except OSError:
+            pass
+
+    # -------------------------
+    # HELPERS
+    # -------------------------
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self._entries = data if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+
+class ProfileRecord:
+    """
+    One launcher profile. Slotted to stay small with hundreds of profiles; the date
+    and display line are only formatted for profiles that actually get printed.
+    Supports record["folder"]-style access like the dicts UnDBJ returns.
+    """
+
+    __slots__ = ("path", "folder", "name", "game_version", "mod_loader", "last_played", "_last_played_text")
+
+    def __init__(self, path: Path, folder: str, name: str, game_version: str, mod_loader: str, last_played: int | None):
+        self.path = path
+        self.folder = folder
+        self.name = name or folder
+        self.game_version = str(game_version or "unknown")
+        self.mod_loader = str(mod_loader or "unknown")
+        self.last_played = last_played
+        self._last_played_text = None
+
+    @classmethod
+    def from_profile(cls, profile: dict) -> "ProfileRecord":
+        return cls(
+            profile["path"], profile["folder"], profile["name"],
+            profile["game_version"], profile["mod_loader"], _epoch_seconds(profile.get("last_played")),
+        )
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__ or key.startswith("_"):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    @property
+    def last_played_text(self) -> str:
+        if self._last_played_text is None:
+            self._last_played_text = (
+                datetime.fromtimestamp(self.last_played).strftime("%d %B %Y") if self.last_played else "never"
+            )
+        return self._last_played_text
+
+    def display(self, name_width: int = 0, version_width: int = 0, loader_width: int = 0) -> str:
+        return (
+            f"{self.name:<{name_width}}   "
+            f"v{self.game_version:<{version_width}}   "
+            f"{self.mod_loader:<{loader_width}}   "
+            f"Last Played: {self.last_played_text}"
+        )
+
+
+class ProfileCatalog:
+    """
+    Profiles of one launcher, most recently played first, with search and paging
+    for the profile picker.
+
+        catalog = ProfileCatalog(records)
+        matches = catalog.search("all the mods")
+        lines = catalog.format_page(catalog.page(matches, 0))
+    """
+
+    PAGE_SIZE = 20
+
+    def __init__(self, records):
+        self.records = sorted(records, key=lambda r: r.last_played or 0, reverse=True)
+        self._search_keys = [f"{r.name} {r.folder}".lower() for r in self.records]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def search(self, query: str) -> list[ProfileRecord]:
+        """
+        Profiles matching `query`: substring matches on name/folder first, then fuzzy
+        ones (query letters appear in order), tighter fuzzy matches first. Empty query = all.
+        """
+        query = query.strip().lower()
+        if not query:
+            return list(self.records)
+
+        exact, fuzzy = [], []
+        for record, key in zip(self.records, self._search_keys):
+            if query in key:
+                exact.append(record)
+                continue
+            span = _subsequence_span(query, key)
+            if span is not None:
+                fuzzy.append((span, record))
+        fuzzy.sort(key=lambda item: item[0])
+        return exact + [record for _, record in fuzzy]
+
+    def page_count(self, records: list) -> int:
+        return max(1, -(-len(records) // self.PAGE_SIZE))
+
+    def page(self, records: list, index: int) -> list[ProfileRecord]:
+        start = index * self.PAGE_SIZE
+        return records[start:start + self.PAGE_SIZE]
+
+    @staticmethod
+    def format_page(records: list[ProfileRecord]) -> list[str]:
+        """Display lines for the given records, padded to line up with each other."""
+        if not records:
+            return []
+        widths = (
+            max(len(r.name) for r in records),
+            max(len(r.game_version) for r in records),
+            max(len(r.mod_loader) for r in records),
+        )
+        return [r.display(*widths) for r in records]
+
+
+def _epoch_seconds(value) -> int | None:
+    """Launchers store last-played as epoch seconds, epoch ms or an ISO date; normalise to seconds."""
+    if value in (None, "", 0):
+        return None
+    try:
+        val = int(float(value))
+        return val // 1000 if val > 10**12 else val
+    except (TypeError, ValueError):
+        pass
+    try:
+        return int(datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return None
+
+
+def _subsequence_span(query: str, text: str) -> int | None:
+    """Length of the stretch of text covering query's letters in order, or None if they don't all appear."""
+    start = pos = text.find(query[0])
+    if start < 0:
+        return None
+    for char in query[1:]:
+        pos = text.find(char, pos + 1)
+        if pos < 0:
+            return None
+    return pos - start + 1
@@ -0,0 +1,505 @@
+# py_cli.py
+"""
+Non-interactive entry point: the menu's pipelines as subcommands, for scripts and CI.
+
+    ModGnizer.exe managers
+    ModGnizer.exe profiles --manager modrinth [--search "all the mods"]
+    ModGnizer.exe bundle   --manager modrinth --profile "My Pack" --format 7z --password-env PACK_PW [--upload]
+    ModGnizer.exe upload   pack.7z [--store local] [--share-out share.md]
+    ModGnizer.exe diff     --share share.md --manager curseforge --profile MyPack [--exit-code]
+    ModGnizer.exe load     --archive pack.zip --manager modrinth --profile "My Pack" --install --yes
+    ModGnizer.exe load     --share share.md --manager modrinth --profile PackA --profile PackB --install --yes
+    ModGnizer.exe store    [--gc [--verify] [--dry-run]]
+
+(`python py_main.py <command> ...` in a dev checkout.) With no arguments the
+interactive menu starts as before.
+
+Exactly one JSON document is written to stdout:
+    {"ok": true, "command": "...", ..., "timings": {"<stage>": seconds, ...}}
+    {"ok": false, "command": "...", "error": "...", "exit_code": n}
+Progress and other chatter goes to stderr. Exit codes are listed in EXIT_CODES.
+
+`--profile-out PATH` (before the command) records py_spans timing spans for the
+run, writes them to PATH and adds the per-stage summary to the result as
+"stages"; `--cprofile` adds a cProfile of the run next to it (PATH.prof).
+("--profile" itself already picks the mod manager profile.)
+
+load/diff take --profile more than once to apply one download/extraction to
+several profiles; the result then lists them under "targets", one entry each
+with its "profile", "diff" (and "installed"/"backup"/"copy_strategies") instead of those keys at
+the top level.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict
+from py_imports import *
+import argparse
+import contextlib
+import json
+import time
+import py_spans
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2          # argparse
+EXIT_NOT_FOUND = 3      # mod manager / profile / archive not found, or ambiguous
+EXIT_INTEGRITY = 4      # downloaded bytes failed their size/checksum check
+EXIT_DIFFERENT = 5      # diff --exit-code: the archive and the profile differ
+EXIT_CODES = {
+    EXIT_OK: "success",
+    EXIT_ERROR: "failure",
+    EXIT_USAGE: "bad arguments",
+    EXIT_NOT_FOUND: "not found / ambiguous",
+    EXIT_INTEGRITY: "integrity check failed",
+    EXIT_DIFFERENT: "differences found (diff --exit-code)",
+}
+
+
+class CliError(Exception):
+    def __init__(self, message: str, exit_code: int = EXIT_ERROR):
+        super().__init__(message)
+        self.exit_code = exit_code
+
+
+# -------------------------
+# ARGUMENTS
+# -------------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ModGnizer",
+        description="ModGnizer pipelines, non-interactively. Run without arguments for the menu.",
+        epilog="Exit codes: " + ", ".join(f"{code} = {text}" for code, text in EXIT_CODES.items()),
+    )
+    parser.add_argument("--profile-out", type=Path, metavar="PATH", help="record timing spans for every stage and write them to PATH (JSON)")
+    parser.add_argument("--cprofile", action="store_true", help="with --profile-out: also write a cProfile of the run to PATH.prof")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("managers", help="list detected mod managers")
+
+    p = sub.add_parser("profiles", help="list a mod manager's profiles, most recently played first")
+    _add_manager(p)
+    p.add_argument("--search", help="only profiles matching this (same matching as the menu's /search)")
+
+    p = sub.add_parser("bundle", help="bundle a profile's mods into an archive (optionally upload it)")
+    _add_manager(p)
+    _add_profile(p)
+    p.add_argument("--format", choices=("zip", "7z", "rar"), default="zip")
+    _add_password(p, "password for 7z/rar (required for those formats)")
+    p.add_argument("--output", type=Path, help="archive path (default: %%TEMP%%/ModGnizer/bundled/<profile>.<format>)")
+    p.add_argument("--force", action="store_true", help="overwrite an existing archive")
+    p.add_argument("--upload", action="store_true", help="upload the archive afterwards")
+    _add_upload_options(p)
+
+    p = sub.add_parser("upload", help="upload an archive and produce its share block")
+    p.add_argument("archive", type=Path)
+    _add_upload_options(p)
+
+    for name, text in (
+        ("load", "download/extract an archive or share; with --manager/--profile also diff, with --install install"),
+        ("diff", "compare an archive or share with a profile's mods (never installs)"),
+    ):
+        p = sub.add_parser(name, help=text)
+        source = p.add_mutually_exclusive_group(required=True)
+        source.add_argument("--archive", type=Path, help="local .zip/.7z/.rar")
+        source.add_argument("--share", help="file holding a MODGNIZER share block ('-' = stdin)")
+        _add_password(p, "archive password, if it has one")
+        _add_manager(p, required=(name == "diff"))
+        _add_profile(p, required=(name == "diff"), multiple=True)
+        if name == "load":
+            p.add_argument("--install", action="store_true", help="replace the profile's mods with the archive's (backup kept)")
+            p.add_argument("--yes", action="store_true", help="confirm --install without prompting (required)")
+        else:
+            p.add_argument("--exit-code", action="store_true", help=f"exit with {EXIT_DIFFERENT} when anything differs")
+
+    p = sub.add_parser("store", help="usage of the shared mod store (MODGNIZER_MOD_STORE); --gc removes unused files")
+    p.add_argument("--gc", action="store_true", help="remove stored mods no profile links to")
+    p.add_argument("--verify", action="store_true", help="with --gc: also re-hash the rest and drop any that changed")
+    p.add_argument("--dry-run", action="store_true", help="with --gc: only report what would be removed")
+
+    return parser
+
+
+def _add_manager(p, required: bool = True):
+    p.add_argument("--manager", required=required, help="Modrinth, CurseForge, ... (case-insensitive, prefix ok)")
+
+
+def _add_profile(p, required: bool = True, multiple: bool = False):
+    if multiple:
+        p.add_argument("--profile", required=required, action="append",
+                       help="profile folder or name (case-insensitive, exact); repeat for several profiles")
+    else:
+        p.add_argument("--profile", required=required, help="profile folder or name (case-insensitive, exact)")
+
+
+def _add_password(p, text: str):
+    group = p.add_mutually_exclusive_group()
+    group.add_argument("--password-env", metavar="VAR", help=f"{text}: read from this environment variable")
+    group.add_argument("--password-file", type=Path, metavar="PATH", help=f"{text}: first line of this file")
+    group.add_argument("--password-stdin", action="store_true", help=f"{text}: first line of stdin")
+
+
+def _add_upload_options(p):
+    p.add_argument("--store", help="storage backend (tmpfiles, or http/local when configured); default tmpfiles")
+    p.add_argument("--share-out", type=Path, help="also write the share block to this file")
+
+
+# -------------------------
+# MAIN
+# -------------------------
+
+def main(argv=None, app_factory: Callable | None = None) -> int:
+    """Run one subcommand; returns the process exit code. app_factory defaults to py_main.App."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.cprofile and not args.profile_out:
+        parser.error("--cprofile needs --profile-out")
+    if args.profile_out:
+        py_spans.enable(args.profile_out, cprofile=args.cprofile)
+    out = sys.stdout
+    result: Dict[str, Any] = {"command": args.command}
+    timings: Dict[str, float] = {}
+
+    try:
+        # Everything the pipelines print is progress: keep stdout for the JSON result
+        with contextlib.redirect_stdout(sys.stderr):
+            if app_factory is None:
+                from py_main import App as app_factory
+            app = app_factory(interactive=False)
+            result.update(COMMANDS[args.command](app, args, timings))
+        exit_code = result.pop("exit_code", EXIT_OK)
+        result = {"ok": True, **result}
+    except CliError as e:
+        exit_code = e.exit_code
+        result.update(ok=False, error=str(e), exit_code=exit_code)
+    except Exception as e:
+        from py_tmpfiles import TmpFilesIntegrityError
+        exit_code = EXIT_INTEGRITY if isinstance(e, TmpFilesIntegrityError) else EXIT_ERROR
+        result.update(ok=False, error=f"{type(e).__name__}: {e}", exit_code=exit_code)
+
+    result["timings"] = {stage: round(seconds, 4) for stage, seconds in timings.items()}
+    if args.profile_out:
+        result["profile_out"] = py_spans.export()
+        result["stages"] = py_spans.report()["stages"]
+    out.write(json.dumps(result, indent=2, default=str) + "\n")
+    out.flush()
+    return exit_code
+
+
+@contextlib.contextmanager
+def _timed(timings: Dict[str, float], stage: str):
+    started = time.perf_counter()
+    try:
+        with py_spans.span(f"cli.{stage}"):
+            yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+
+
+# -------------------------
+# COMMANDS
+# -------------------------
+
+def cmd_managers(app, args, timings) -> dict:
+    with _timed(timings, "detect"):
+        managers = app.detect_mod_managers()
+    return {"managers": [{"name": m["name"], "profiles_path": m["profiles_path"]} for m in managers.values()]}
+
+
+def cmd_profiles(app, args, timings) -> dict:
+    manager = _resolve_manager(app, args.manager, timings)
+    with _timed(timings, "scan_profiles"):
+        catalog = app.get_profile_catalog(manager)
+    records = catalog.search(args.search or "")
+    return {"manager": manager["name"], "profiles": [_profile_json(r) for r in records]}
+
+
+def cmd_bundle(app, args, timings) -> dict:
+    from py_archive import ArchiveBundler
+    from py_report import profile_mods_dir
+
+    manager = _resolve_manager(app, args.manager, timings)
+    profile = _resolve_profile(app, manager, args.profile, timings)
+    mods_dir = profile_mods_dir(manager, profile)
+    if not mods_dir.is_dir():
+        raise CliError(f"Mods folder not found: {mods_dir}", EXIT_NOT_FOUND)
+
+    password = _read_password(args)
+    if args.format != "zip" and not password:
+        raise CliError(f"A password is required for {args.format} (--password-env/--password-file/--password-stdin).", EXIT_USAGE)
+
+    output = args.output
+    if output is None:
+        temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
+        output = temp_root / "ModGnizer" / "bundled" / f"{profile['folder']}.{args.format}"
+    output = Path(output)
+    if output.exists():
+        if not args.force:
+            raise CliError(f"{output} already exists (use --force to overwrite).")
+        from py_templedger import temp_ledger
+        temp_ledger().discard(output)
+        output.unlink()
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    bundler = ArchiveBundler(mods_dir)
+    with _timed(timings, "bundle"):
+        if args.format == "zip":
+            bundler.bundle_zip(output)
+        elif args.format == "7z":
+            bundler.bundle_7z(output, password)
+        else:
+            bundler.bundle_rar(output, password)
+    from py_templedger import temp_ledger
+    temp_ledger().add(output)
+    app.temp_evictor.run(protect={output})
+
+    result = {
+        "manager": manager["name"],
+        "profile": _profile_json(profile),
+        "archive": output,
+        "size": output.stat().st_size,
+    }
+    if args.upload:
+        result["upload"] = _upload(app, output, args, timings)
+    return result
+
+
+def cmd_upload(app, args, timings) -> dict:
+    if not args.archive.is_file():
+        raise CliError(f"Archive not found: {args.archive}", EXIT_NOT_FOUND)
+    return {"archive": args.archive, "upload": _upload(app, args.archive, args, timings)}
+
+
+def cmd_load(app, args, timings) -> dict:
+    if not args.manager and (args.install or args.profile):
+        raise CliError(f"{'--install' if args.install else '--profile'} needs --manager.", EXIT_USAGE)
+    if args.manager and not args.profile:
+        raise CliError("--manager needs --profile.", EXIT_USAGE)
+    if args.install and not args.yes:
+        raise CliError("--install replaces the profile's mods: confirm with --yes.", EXIT_USAGE)
+
+    source, digests = _fetch_and_extract(app, args, timings)
+    if not args.manager:
+        return source
+
+    manager, targets = _diff(app, args, source, digests, timings)
+    entries = [{"profile": _profile_json(profile), "diff": _diff_json(diff)} for profile, _, diff in targets]
+    if args.install:
+        from py_report import install_mods
+        backups = set()
+        link_from = None
+        for entry, (_, mods_dir, diff) in zip(entries, targets):
+            if not entry["diff"]["changes"]:
+                entry["installed"] = False
+                continue
+            # Profiles after the first hard-link the files just installed, when on the same volume
+            strategies = {}
+            with _timed(timings, "install"):
+                backup = install_mods(diff["extracted_files"], diff["profile_files"], mods_dir, link_from, app.mod_store, diff["extracted_digests"], strategies)
+            link_from = mods_dir
+            backups.add(backup)
+            entry.update(installed=True, backup=backup, copy_strategies=strategies)
+        if backups:
+            app.temp_evictor.run(protect={*backups, Path(source["extracted_path"])})
+    return _targets_result(source, manager, entries)
+
+
+def cmd_diff(app, args, timings) -> dict:
+    source, digests = _fetch_and_extract(app, args, timings)
+    manager, targets = _diff(app, args, source, digests, timings)
+    entries = [{"profile": _profile_json(profile), "diff": _diff_json(diff)} for profile, _, diff in targets]
+    result = _targets_result(source, manager, entries)
+    if args.exit_code and any(entry["diff"]["changes"] for entry in entries):
+        result["exit_code"] = EXIT_DIFFERENT
+    return result
+
+
+def cmd_store(app, args, timings) -> dict:
+    from py_modstore import ENV_MOD_STORE
+    if not app.mod_store:
+        raise CliError(f"No mod store configured (set {ENV_MOD_STORE}).", EXIT_NOT_FOUND)
+    if (args.verify or args.dry_run) and not args.gc:
+        raise CliError("--verify/--dry-run go with --gc.", EXIT_USAGE)
+    result: Dict[str, Any] = {"store": app.mod_store.root}
+    if args.gc:
+        with _timed(timings, "gc"):
+            result["gc"] = app.mod_store.gc(verify=args.verify, dry_run=args.dry_run)
+        result["dry_run"] = args.dry_run
+    with _timed(timings, "usage"):
+        result["usage"] = app.mod_store.usage()
+    return result
+
+
+def _targets_result(source: dict, manager: dict, entries: list) -> dict:
+    # One profile keeps the flat shape; several are listed under "targets"
+    if len(entries) == 1:
+        return {**source, "manager": manager["name"], **entries[0]}
+    return {**source, "manager": manager["name"], "targets": entries}
+
+
+COMMANDS = {
+    "managers": cmd_managers,
+    "profiles": cmd_profiles,
+    "bundle": cmd_bundle,
+    "upload": cmd_upload,
+    "load": cmd_load,
+    "diff": cmd_diff,
+    "store": cmd_store,
+}
+
+
+# -------------------------
+# HELPERS
+# -------------------------
+
+def _resolve_manager(app, name: str, timings) -> dict:
+    with _timed(timings, "detect"):
+        managers = app.detect_mod_managers()
+    wanted = name.strip().lower()
+    matches = [m for key, m in managers.items() if key.lower() == wanted] or \
+              [m for key, m in managers.items() if key.lower().startswith(wanted)]
+    if len(matches) != 1:
+        known = ", ".join(managers) or "none detected"
+        raise CliError(f"Mod manager {name!r} {'is ambiguous' if matches else 'not found'} (detected: {known}).", EXIT_NOT_FOUND)
+    return matches[0]
+
+
+def _resolve_profile(app, manager: dict, name: str, timings):
+    with _timed(timings, "scan_profiles"):
+        catalog = app.get_profile_catalog(manager)
+    wanted = name.strip().lower()
+    matches = [r for r in catalog.records if r.folder.lower() == wanted] or \
+              [r for r in catalog.records if r.name.lower() == wanted]
+    if len(matches) != 1:
+        hint = ", ".join(r.folder for r in catalog.search(name)[:5])
+        problem = "is ambiguous" if matches else "not found"
+        raise CliError(f"Profile {name!r} {problem} in {manager['name']}" + (f" (close: {hint})" if hint else "") + ".", EXIT_NOT_FOUND)
+    return matches[0]
+
+
+def _read_password(args) -> str | None:
+    if args.password_env:
+        if args.password_env not in os.environ:
+            raise CliError(f"Environment variable {args.password_env} is not set.", EXIT_USAGE)
+        return os.environ[args.password_env]
+    if args.password_file:
+        try:
+            return args.password_file.read_text(encoding="utf-8").splitlines()[0]
+        except (OSError, IndexError) as e:
+            raise CliError(f"Could not read a password from {args.password_file}: {e}", EXIT_USAGE) from e
+    if args.password_stdin:
+        return sys.stdin.readline().rstrip("\r\n")
+    return None
+
+
+def _upload(app, archive: Path, args, timings) -> dict:
+    from py_storage import available_backends
+    from py_tmpfiles import TmpFilesClient
+
+    backends = available_backends(timeout=120)
+    store = args.store or "tmpfiles"
+    if store not in backends:
+        raise CliError(f"Storage {store!r} is not available (available: {', '.join(backends)}).", EXIT_USAGE)
+
+    client = TmpFilesClient(timeout=120, backend=backends[store])
+    with _timed(timings, "upload"):
+        upload = client.upload_in_chunks(archive)
+    links = upload.get("links", [])
+    if not links:
+        raise CliError("Upload completed but no links returned.")
+
+    share = app.build_share_markdown(links, archive, upload)
+    if args.share_out:
+        args.share_out.write_text(share, encoding="utf-8")
+    return {
+        "store": store,
+        "links": links,
+        "sha256": upload.get("sha256"),
+        "part_sha256s": upload.get("part_sha256s"),
+        "expires_at": upload.get("expires_at"),
+        "share_file": args.share_out,
+        "share": share,
+    }
+
+
+def _fetch_and_extract(app, args, timings):
+    """Returns (result fields, digests computed during a streamed extraction or None)"""
+    from py_archive import ArchiveBundler
+
+    result: Dict[str, Any] = {}
+    extracted_path = extracted_digests = None
+    if args.archive:
+        if not args.archive.is_file():
+            raise CliError(f"Archive not found: {args.archive}", EXIT_NOT_FOUND)
+        archive_path = args.archive
+    else:
+        from py_tmpfiles import TmpFilesClient
+        try:
+            text = sys.stdin.read() if args.share == "-" else Path(args.share).read_text(encoding="utf-8")
+        except OSError as e:
+            raise CliError(f"Could not read share: {e}", EXIT_NOT_FOUND) from e
+        manifest = TmpFilesClient.parse_modgnizer_manifest(text)
+        if not manifest.get("links"):
+            raise CliError("No download links found in the share.")
+        with _timed(timings, "download"):
+            archive_path, extracted_path, extracted_digests = app.fetch_share(manifest)
+        result["links"] = manifest["links"]
+        result["streamed_extraction"] = extracted_path is not None
+
+    if not extracted_path:
+        with _timed(timings, "extract"):
+            try:
+                extracted_path = ArchiveBundler.extract_archive(archive_path, password=_read_password(args) or None)
+            except Exception as e:
+                raise CliError(f"Extraction failed (wrong password or corrupted archive?): {e}") from e
+        if not extracted_path:
+            raise CliError(f"Unsupported archive type: {archive_path.suffix}")
+
+    result.update(archive=archive_path, extracted_path=extracted_path)
+    return result, extracted_digests
+
+
+def _diff(app, args, source: dict, digests, timings):
+    """Returns (manager, [(profile, mods_dir, diff), ...]) for every --profile, in order"""
+    from py_report import diff_profile, profile_mods_dir
+
+    manager = _resolve_manager(app, args.manager, timings)
+    profiles = []
+    for name in args.profile:
+        profile = _resolve_profile(app, manager, name, timings)
+        mods_dir = profile_mods_dir(manager, profile)
+        if not mods_dir.is_dir():
+            raise CliError(f"Mods folder not found: {mods_dir}", EXIT_NOT_FOUND)
+        if any(p["folder"] == profile["folder"] for p, _ in profiles):
+            raise CliError(f"Profile {profile['folder']!r} given more than once.", EXIT_USAGE)
+        profiles.append((profile, mods_dir))
+
+    # The archive is scanned and hashed once, whatever the number of profiles
+    digests = {} if digests is None else digests
+    extracted_files = None
+    targets = []
+    for profile, mods_dir in profiles:
+        with _timed(timings, "diff"):
+            diff = diff_profile(source["extracted_path"], mods_dir, digests, app.hash_cache, extracted_files)
+        extracted_files = diff["extracted_files"]
+        targets.append((profile, mods_dir, diff))
+    return manager, targets
+
+
+def _diff_json(diff: dict) -> dict:
+    summary = {key: sorted(diff[key]) for key in ("identical", "differing", "only_in_extracted", "only_in_profile")}
+    summary["changes"] = len(diff["differing"]) + len(diff["only_in_extracted"]) + len(diff["only_in_profile"])
+    return summary
+
+
+def _profile_json(record) -> dict:
+    return {
+        "folder": record["folder"],
+        "name": record["name"],
+        "game_version": record["game_version"],
+        "mod_loader": record["mod_loader"],
+        "last_played": record["last_played"],
+    }
+
+
+if __name__ == "__main__":
+    sys.exit(main())
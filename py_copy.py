@@ -0,0 +1,193 @@
+# py_copy.py
+"""
+File copies for installs and backups: the cheapest strategy each filesystem allows,
+many files at once.
+
+copy_file() tries, in order:
+    reflink          copy-on-write clone (Linux FICLONE: btrfs, XFS); nothing is written
+    link             hard link, only with allow_link=True (the caller knows neither side
+                     will be edited, e.g. a backup of a file that's deleted next)
+    copy_file_range  in-kernel copy (Linux)
+    sendfile         in-kernel copy (Linux)
+    copyfile2        the OS copy (Windows, Python 3.12+; clones on ReFS / Dev Drive)
+    buffered         IO_BUFFER reads and writes
+and returns the name of the one that worked. Like shutil.copy2, the copy keeps the
+source's timestamps and permission bits. A strategy that fails between two devices
+isn't tried again for that pair.
+
+copy_files() runs copy_file (or another per-file function) over many files on up to
+IO_CONCURRENCY threads, so hundreds of small jars aren't paced by per-file overhead.
+
+    with Progress("Installing mods", total) as progress:
+        used = copy_files(pairs, on_done=lambda src, dest, size: progress.update(size, items=1))
+    used  # Counter({"copy_file_range": 212, "link": 3})
+"""
+from __future__ import annotations
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, Set, Tuple
+from py_imports import *
+import errno
+import shutil
+import threading
+
+IO_BUFFER = 1024 * 1024
+IO_CONCURRENCY = 8          # files copied at once
+FICLONE = 0x40049409        # Linux reflink ioctl
+
+try:
+    import fcntl
+except ImportError:         # Windows
+    fcntl = None
+try:
+    import _winapi
+except ImportError:
+    _winapi = None
+
+# Failures any strategy would hit: they don't rule a strategy out for the devices
+_FILE_ERRORS = {errno.ENOENT, errno.EACCES, errno.ENOSPC, errno.EISDIR, errno.ENOTDIR, errno.EROFS, errno.EMLINK}
+
+# (strategy, source device, destination device) that failed once for lack of support
+_unsupported: Set[Tuple[str, int, int]] = set()
+_unsupported_lock = threading.Lock()
+
+
+def copy_file(src: Path, dest: Path, allow_link: bool = False) -> str:
+    """Copy src over dest (replaced if present). Returns the strategy used (see module docstring)."""
+    src, dest = Path(src), Path(dest)
+    st = src.stat()
+    size = st.st_size
+    devices = (st.st_dev, dest.parent.stat().st_dev)
+
+    for strategy, attempt in _STRATEGIES:
+        if (strategy == "link" and not allow_link) or not _supported(strategy, devices):
+            continue
+        dest.unlink(missing_ok=True)
+        try:
+            done = attempt(src, dest, size)
+        except OSError as e:
+            if e.errno in _FILE_ERRORS:
+                continue
+            done = False
+        if done:
+            if strategy != "link":
+                shutil.copystat(src, dest)
+            return strategy
+        _mark_unsupported(strategy, devices)
+
+    dest.unlink(missing_ok=True)
+    _buffered(src, dest)
+    shutil.copystat(src, dest)
+    return "buffered"
+
+
+def copy_files(
+    pairs: Iterable[Tuple[Path, Path]],
+    allow_link: bool = False,
+    copy: Callable[[Path, Path], str] | None = None,
+    on_done: Callable[[Path, Path, int], None] | None = None,
+    workers: int = IO_CONCURRENCY,
+) -> Counter:
+    """
+    Copy every (src, dest) pair, up to `workers` at a time. `copy` replaces copy_file
+    per file (it returns the strategy name). on_done(src, dest, size) is called on
+    this thread as each file finishes. When two pairs share a dest, the later one
+    wins, as it would one after the other. Returns how often each strategy was used;
+    the first failure is raised once the copies already running have finished.
+    """
+    copy = copy or (lambda src, dest: copy_file(src, dest, allow_link))
+    jobs = {}
+    for src, dest in pairs:
+        jobs.pop(Path(dest), None)
+        jobs[Path(dest)] = Path(src)
+
+    used = Counter()
+    if not jobs:
+        return used
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs))), thread_name_prefix="copy") as pool:
+        futures = {pool.submit(copy, src, dest): (src, dest) for dest, src in jobs.items()}
+        try:
+            for future in as_completed(futures):
+                src, dest = futures[future]
+                used[future.result()] += 1
+                if on_done:
+                    on_done(src, dest, dest.stat().st_size)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return used
+
+
+def format_strategies(used: Counter) -> str:
+    """Counter({"link": 3, "buffered": 2}) -> "3 link, 2 buffered" """
+    return ", ".join(f"{n} {strategy}" for strategy, n in used.most_common())
+
+
+# -------------------------
+# STRATEGIES
+# -------------------------
+
+def _reflink(src: Path, dest: Path, size: int) -> bool:
+    with open(src, "rb", buffering=0) as fin, open(dest, "wb", buffering=0) as fout:
+        fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+    return True
+
+
+def _link(src: Path, dest: Path, size: int) -> bool:
+    os.link(src, dest)
+    return True
+
+
+def _copy_file_range(src: Path, dest: Path, size: int) -> bool:
+    with open(src, "rb", buffering=0) as fin, open(dest, "wb", buffering=0) as fout:
+        while os.copy_file_range(fin.fileno(), fout.fileno(), IO_BUFFER * 64):
+            pass
+        return fout.tell() == size
+
+
+def _sendfile(src: Path, dest: Path, size: int) -> bool:
+    offset = 0
+    with open(src, "rb", buffering=0) as fin, open(dest, "wb", buffering=0) as fout:
+        while offset < size:
+            n = os.sendfile(fout.fileno(), fin.fileno(), offset, IO_BUFFER * 64)
+            if not n:
+                break
+            offset += n
+    return offset == size
+
+
+def _copyfile2(src: Path, dest: Path, size: int) -> bool:
+    _winapi.CopyFile2(str(src), str(dest), 0)
+    return True
+
+
+def _buffered(src: Path, dest: Path):
+    buffer = memoryview(bytearray(IO_BUFFER))
+    with open(src, "rb", buffering=0) as fin, open(dest, "wb", buffering=0) as fout:
+        while True:
+            n = fin.readinto(buffer)
+            if not n:
+                break
+            fout.write(buffer[:n])
+
+
+# Tried in this order; "buffered" is the fallback when none of them works
+_STRATEGIES = [("reflink", _reflink)] if fcntl is not None else []
+_STRATEGIES.append(("link", _link))
+if hasattr(os, "copy_file_range"):
+    _STRATEGIES.append(("copy_file_range", _copy_file_range))
+if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+    _STRATEGIES.append(("sendfile", _sendfile))
+if _winapi is not None and hasattr(_winapi, "CopyFile2"):
+    _STRATEGIES.append(("copyfile2", _copyfile2))
+
+
+def _supported(strategy: str, devices: Tuple[int, int]) -> bool:
+    return (strategy, *devices) not in _unsupported
+
+
+def _mark_unsupported(strategy: str, devices: Tuple[int, int]):
+    with _unsupported_lock:
+        _unsupported.add((strategy, *devices))
+
@@ -0,0 +1,250 @@
+# py_delta.py
+"""
+Binary delta patches between two builds of the executable (stdlib only).
+
+    python py_delta.py make  OLD.exe NEW.exe ModGnizer-<old>-to-<new>.mgpatch
+    python py_delta.py apply OLD.exe PATCH   NEW.exe
+
+The new file is described block by block (BLOCK bytes, aligned): a block whose
+content exists at an aligned offset of the old file becomes a copy from it,
+anything else is carried as an LZMA-compressed literal. That catches the
+unchanged parts of a rebuild at their original or a block-shifted position; it
+is not a byte-level (bsdiff-style) diff, so a patch can come out close to the
+full size; the `make` command drops patches above MAX_USEFUL_RATIO of it.
+
+Format:
+    MAGIC
+    one JSON line: {"block", "old_size", "old_sha256", "new_size", "new_sha256"}
+    ops: b"C" <u64 old offset> <u32 length>          copy from the old file
+         b"L" <u32 raw length> <u32 packed length> <lzma bytes>
+         b"E"                                         end
+apply() checks the old file's digest before writing anything and the new
+file's digest as it is written.
+"""
+from __future__ import annotations
+from typing import Callable
+from pathlib import Path
+import hashlib
+import json
+import lzma
+import struct
+import sys
+
+MAGIC = b"MGPATCH1\n"
+BLOCK = 4096
+LITERAL_FLUSH = 1024 * 1024     # literal bytes compressed per "L" op
+READ_SIZE = 1024 * 1024
+MAX_USEFUL_RATIO = 0.8          # a patch bigger than this share of the new build isn't shipped
+
+_COPY = struct.Struct("<QI")
+_LITERAL = struct.Struct("<II")
+
+
+class DeltaError(Exception):
+    pass
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(READ_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _blocks(path: Path):
+    with Path(path).open("rb") as f:
+        offset = 0
+        while True:
+            data = f.read(READ_SIZE)
+            if not data:
+                return
+            for i in range(0, len(data), BLOCK):
+                yield offset + i, data[i:i + BLOCK]
+            offset += len(data)
+
+
+# -------------------------
+# MAKE
+# -------------------------
+
+def make_patch(old_path: Path, new_path: Path, patch_path: Path) -> dict:
+    """Write a patch turning old_path into new_path. Returns {"patch_size", "new_size", "copied", "literal"}."""
+    old_path, new_path, patch_path = Path(old_path), Path(new_path), Path(patch_path)
+
+    # Aligned blocks of the old file, by content (first occurrence wins)
+    index = {}
+    old_sha = hashlib.sha256()
+    for offset, block in _blocks(old_path):
+        old_sha.update(block)
+        if len(block) == BLOCK:
+            index.setdefault(hashlib.blake2b(block, digest_size=16).digest(), offset)
+
+    header = {
+        "block": BLOCK,
+        "old_size": old_path.stat().st_size,
+        "old_sha256": old_sha.hexdigest(),
+        "new_size": new_path.stat().st_size,
+        "new_sha256": file_sha256(new_path),
+    }
+
+    copied = literal_total = 0
+    with patch_path.open("wb") as out:
+        out.write(MAGIC)
+        out.write(json.dumps(header).encode("utf-8") + b"\n")
+
+        copy_from = copy_len = 0
+        literal = bytearray()
+
+        def flush_copy():
+            nonlocal copy_len
+            if copy_len:
+                out.write(b"C" + _COPY.pack(copy_from, copy_len))
+                copy_len = 0
+
+        def flush_literal():
+            if literal:
+                packed = lzma.compress(bytes(literal), preset=6)
+                out.write(b"L" + _LITERAL.pack(len(literal), len(packed)) + packed)
+                literal.clear()
+
+        for _, block in _blocks(new_path):
+            old_offset = index.get(hashlib.blake2b(block, digest_size=16).digest()) if len(block) == BLOCK else None
+            if old_offset is None:
+                flush_copy()
+                literal += block
+                literal_total += len(block)
+                if len(literal) >= LITERAL_FLUSH:
+                    flush_literal()
+                continue
+            flush_literal()
+            if copy_len and copy_from + copy_len == old_offset:
+                copy_len += BLOCK
+            else:
+                flush_copy()
+                copy_from, copy_len = old_offset, BLOCK
+            copied += BLOCK
+
+        flush_copy()
+        flush_literal()
+        out.write(b"E")
+
+    return {"patch_size": patch_path.stat().st_size, "new_size": header["new_size"], "copied": copied, "literal": literal_total}
+
+
+# -------------------------
+# APPLY
+# -------------------------
+
+def read_header(patch_path: Path) -> dict:
+    with Path(patch_path).open("rb") as f:
+        return _read_header(f)
+
+
+def _read_header(f) -> dict:
+    if f.read(len(MAGIC)) != MAGIC:
+        raise DeltaError("Not a ModGnizer patch.")
+    try:
+        return json.loads(f.readline().decode("utf-8"))
+    except ValueError as e:
+        raise DeltaError(f"Corrupt patch header: {e}") from e
+
+
+def apply_patch(old_path: Path, patch_path: Path, out_path: Path, on_bytes: Callable[[int], None] | None = None) -> str:
+    """
+    Rebuild the new file from old_path + patch_path into out_path. Returns its SHA-256.
+    Raises DeltaError (and removes out_path) if the old file isn't the one the patch
+    was made from, the patch is damaged, or the result doesn't match the recorded digest.
+    """
+    old_path, patch_path, out_path = Path(old_path), Path(patch_path), Path(out_path)
+    with patch_path.open("rb") as patch:
+        header = _read_header(patch)
+        if old_path.stat().st_size != header["old_size"] or file_sha256(old_path) != header["old_sha256"]:
+            raise DeltaError(f"{old_path.name} is not the build this patch was made from.")
+
+        digest = hashlib.sha256()
+        written = 0
+        try:
+            with old_path.open("rb") as old, out_path.open("wb") as out:
+                while True:
+                    op = patch.read(1)
+                    if op == b"E":
+                        break
+                    if op == b"C":
+                        offset, length = _COPY.unpack(_read_exact(patch, _COPY.size))
+                        old.seek(offset)
+                        pieces = _read_pieces(old, length)
+                    elif op == b"L":
+                        raw_len, packed_len = _LITERAL.unpack(_read_exact(patch, _LITERAL.size))
+                        try:
+                            data = lzma.decompress(_read_exact(patch, packed_len))
+                        except lzma.LZMAError as e:
+                            raise DeltaError(f"Corrupt patch data: {e}") from e
+                        if len(data) != raw_len:
+                            raise DeltaError("Corrupt patch data: literal length mismatch.")
+                        pieces = (data,)
+                    else:
+                        raise DeltaError("Corrupt patch: unknown operation.")
+                    for data in pieces:
+                        written += len(data)
+                        if written > header["new_size"]:
+                            raise DeltaError("Patch output is longer than recorded.")
+                        digest.update(data)
+                        out.write(data)
+                        if on_bytes:
+                            on_bytes(len(data))
+
+            if written != header["new_size"] or digest.hexdigest() != header["new_sha256"]:
+                raise DeltaError("Patched file doesn't match the release checksum.")
+        except BaseException:
+            out_path.unlink(missing_ok=True)
+            raise
+    return digest.hexdigest()
+
+
+def _read_pieces(f, length: int):
+    # A coalesced copy can span most of the file: stream it
+    while length:
+        data = f.read(min(length, READ_SIZE))
+        if not data:
+            raise DeltaError("Patch copies past the end of the old file.")
+        length -= len(data)
+        yield data
+
+
+def _read_exact(f, n: int) -> bytes:
+    data = f.read(n)
+    if len(data) != n:
+        raise DeltaError("Truncated patch.")
+    return data
+
+
+# -------------------------
+# COMMAND LINE (release builds)
+# -------------------------
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 4 or argv[0] not in ("make", "apply"):
+        print("usage: py_delta.py make OLD NEW PATCH | apply OLD PATCH NEW", file=sys.stderr)
+        return 2
+    command, a, b, c = argv
+    try:
+        if command == "make":
+            stats = make_patch(Path(a), Path(b), Path(c))
+            ratio = stats["patch_size"] / max(stats["new_size"], 1)
+            print(f"{Path(c).name}: {stats['patch_size']} bytes ({ratio:.0%} of the full build), "
+                  f"{stats['copied']} bytes reused")
+            if ratio > MAX_USEFUL_RATIO:
+                Path(c).unlink()
+                print("Not worth shipping: removed (clients download the full build).")
+        else:
+            print(apply_patch(Path(a), Path(b), Path(c)))
+    except (OSError, DeltaError) as e:
+        print(f"py_delta: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+# py_dlcache.py
+from __future__ import annotations
+from typing import Dict, Any
+from py_imports import *
+from py_templedger import temp_ledger
+import hashlib
+import json
+import shutil
+import threading
+import time
+
+
+class DownloadCache:
+    """
+    On-disk cache of downloaded parts, so re-importing the same share
+    (e.g. after cancelling at the profile prompt) doesn't hit the network again.
+
+    Layout (%TEMP%/ModGnizer/download_cache/):
+        index.json          - { "blobs": {...}, "links": {...} }
+        <blob key>          - cached bytes
+
+    A blob is keyed by its SHA-256 when the manifest carried one, otherwise by
+    a hash of the direct link. Links map onto blob keys, so the same content
+    shared under a new link is still a hit when its digest is known.
+    Eviction is LRU once the total exceeds max_bytes.
+    """
+
+    DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB
+    INDEX_NAME = "index.json"
+
+    def __init__(self, root: Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        if root is None:
+            temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
+            root = temp_root / "ModGnizer" / "download_cache"
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._index: Dict[str, Any] | None = None
+        self._lock = threading.RLock()  # parts may be fetched on several worker threads
+
+    # -------------------------
+    # PUBLIC API
+    # -------------------------
+
+    def lookup(self, link: str, sha256: str | None = None) -> Path | None:
+        """
+        Return the cached blob for link (or for sha256, if given) after validating it,
+        or None on a miss. Invalid entries are dropped.
+        """
+        with self._lock:
+            return self._lookup(link, sha256)
+
+    def store(self, link: str, path: Path, sha256: str | None = None):
+        """Add a freshly downloaded file to the cache (hard link when possible, else copy)."""
+        with self._lock:
+            self._store(link, path, sha256)
+
+    def _lookup(self, link: str, sha256: str | None) -> Path | None:
+        index = self._load()
+        key = sha256.lower() if sha256 and sha256.lower() in index["blobs"] else index["links"].get(link)
+        if not key:
+            return None
+
+        entry = index["blobs"].get(key)
+        blob = self.root / key
+        if not entry or not self._is_valid(blob, entry, sha256):
+            self._drop(key)
+            return None
+
+        entry["last_used"] = time.time()
+        index["links"][link] = key
+        self._save()
+        return blob
+
+    def _store(self, link: str, path: Path, sha256: str | None):
+        path = Path(path)
+        if not path.is_file():
+            return
+
+        key = sha256.lower() if sha256 else "link-" + hashlib.sha256(link.encode("utf-8")).hexdigest()
+        blob = self.root / key
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            temp_ledger().discard(blob)
+            blob.unlink(missing_ok=True)
+            self._place(path, blob)
+            st = blob.stat()
+        except OSError:
+            return
+        temp_ledger().add(blob, st.st_size)
+
+        index = self._load()
+        index["blobs"][key] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": sha256.lower() if sha256 else None,
+            "last_used": time.time(),
+        }
+        index["links"][link] = key
+        self._evict()
+        self._save()
+
+    def materialize(self, blob: Path, target: Path) -> Path:
+        """Place a cached blob at target without copying bytes when the volume allows it."""
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Never write through an existing name: it may be a hard link into the cache
+        target.unlink(missing_ok=True)
+        self._place(Path(blob), target)
+        return target
+
+    def clear(self):
+        with self._lock:
+            temp_ledger().discard(self.root)
+            shutil.rmtree(self.root, ignore_errors=True)
+            self._index = None
+
+    # -------------------------
+    # HELPERS
+    # -------------------------
+
+    @staticmethod
+    def _place(src: Path, dest: Path):
+        try:
+            os.link(src, dest)
+        except OSError:
+            shutil.copy2(src, dest)
+
+    @staticmethod
+    def _is_valid(blob: Path, entry: dict, sha256: str | None) -> bool:
+        try:
+            st = blob.stat()
+        except OSError:
+            return False
+
+        if st.st_size != entry.get("size"):
+            return False
+
+        if sha256:
+            h = hashlib.sha256()
+            with blob.open("rb") as fh:
+                for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+                    h.update(chunk)
+            return h.hexdigest() == sha256.lower()
+
+        # No digest to check against: trust the blob only if it hasn't been touched since stored
+        return st.st_mtime_ns == entry.get("mtime_ns")
+
+    def _drop(self, key: str):
+        index = self._load()
+        index["blobs"].pop(key, None)
+        index["links"] = {l: k for l, k in index["links"].items() if k != key}
+        try:
+            temp_ledger().discard(self.root / key)
+            (self.root / key).unlink(missing_ok=True)
+        except OSError:
+            pass
+        self._save()
+
+    def _evict(self):
+        index = self._load()
+        blobs = index["blobs"]
+        total = sum(e.get("size", 0) for e in blobs.values())
+        if total <= self.max_bytes:
+            return
+
+        for key, entry in sorted(blobs.items(), key=lambda kv: kv[1].get("last_used", 0)):
+            if total <= self.max_bytes:
+                break
+            try:
+                (self.root / key).unlink(missing_ok=True)
+            except OSError:
+                continue
+            temp_ledger().discard(self.root / key, entry.get("size", 0))
+            total -= entry.get("size", 0)
+            blobs.pop(key, None)
+
+        index["links"] = {l: k for l, k in index["links"].items() if k in blobs}
+
+    def _load(self) -> Dict[str, Any]:
+        if self._index is not None:
+            return self._index
+
+        index = {"blobs": {}, "links": {}}
+        try:
+            data = json.loads((self.root / self.INDEX_NAME).read_text(encoding="utf-8"))
+            if isinstance(data.get("blobs"), dict) and isinstance(data.get("links"), dict):
+                index = data
+        except (OSError, ValueError, AttributeError):
+            pass
+
+        self._index = index
+        return index
+
+    def _save(self):
+        if self._index is None:
+            return
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = self.root / (self.INDEX_NAME + ".tmp")
+            tmp.write_text(json.dumps(self._index), encoding="utf-8")
+            tmp.replace(self.root / self.INDEX_NAME)
+        except OSError:
+            pass
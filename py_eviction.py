@@ -0,0 +1,168 @@
+# py_eviction.py
+from __future__ import annotations
+from typing import Dict, List, Tuple
+from py_imports import *
+from py_templedger import temp_ledger, tree_size
+import shutil
+import threading
+import time
+
+GB = 1024 * 1024 * 1024
+DAY = 24 * 60 * 60
+
+
+class TempEvictor:
+    """
+    Keeps %TEMP%/ModGnizer bounded, category by category, instead of all-or-nothing.
+
+    Each policy applies to the items of one category (a file or folder each):
+        "dir"        - folder under the temp dir whose entries are the items,
+        "prefix"     - or: top-level entries starting with this are the items (backups),
+        "max_bytes"  - least recently used items go first once the category exceeds this,
+        "max_age"    - items unused for longer than this (seconds) go regardless,
+        "max_items"  - optional cap on the number of items.
+
+    "Used" is the later of mtime and atime for files, the newest mtime for folders.
+    Items touched within GRACE seconds are never evicted, so a run straight after an
+    import can't pull the extraction out from under it.
+    download_cache isn't listed: DownloadCache already evicts its own blobs LRU.
+    """
+
+    POLICIES: Dict[str, Dict] = {
+        "extracted_reassembled":       {"dir": "extracted_reassembled",       "max_bytes": 2 * GB, "max_age": 2 * DAY},
+        "downloaded_from_tmpfiles_org": {"dir": "downloaded_from_tmpfiles_org", "max_bytes": 2 * GB, "max_age": 14 * DAY},
+        "uploads":                     {"dir": "uploads",                     "max_bytes": 1 * GB, "max_age": 1 * DAY},
+        "bundled":                     {"dir": "bundled",                     "max_bytes": 2 * GB, "max_age": 30 * DAY},
+        "backup_*":                    {"prefix": "backup_",                  "max_bytes": 5 * GB, "max_age": 90 * DAY, "max_items": 10},
+    }
+    GRACE = 10 * 60
+
+    def __init__(self, root: Path | None = None, policies: Dict[str, Dict] | None = None):
+        if root is None:
+            temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
+            root = temp_root / "ModGnizer"
+        self.root = Path(root)
+        self.policies = policies or self.POLICIES
+        self._lock = threading.Lock()
+
+    # -------------------------
+    # PUBLIC API
+    # -------------------------
+
+    def run(self, protect: set | None = None) -> Dict[str, Tuple[int, int]]:
+        """
+        Apply every policy once. Paths in `protect` (and anything inside them) are kept.
+        Returns {category: (items removed, bytes freed)} for categories that lost anything.
+        """
+        protect = {Path(p) for p in (protect or ())}
+        evicted = {}
+        with self._lock:
+            for category, policy in self.policies.items():
+                count, freed = self._apply(policy, protect)
+                if count:
+                    evicted[category] = (count, freed)
+        temp_ledger().save()
+        return evicted
+
+    def run_in_background(self, protect: set | None = None):
+        """Fire-and-forget run(), for after an import/bundle/upload."""
+        threading.Thread(target=self.run, args=(protect,), daemon=True).start()
+
+    def usage(self) -> Dict[str, int]:
+        """Bytes per category, from the temp ledger (no disk walk)."""
+        entries = temp_ledger().entries()
+        usage = {}
+        for category, policy in self.policies.items():
+            if "dir" in policy:
+                usage[category] = entries.get(policy["dir"], 0)
+            else:
+                usage[category] = sum(size for name, size in entries.items() if name.startswith(policy["prefix"]))
+        return usage
+
+    # -------------------------
+    # HELPERS
+    # -------------------------
+
+    def _apply(self, policy: Dict, protect: set) -> Tuple[int, int]:
+        items = self._items(policy)
+        if not items:
+            return 0, 0
+
+        now = time.time()
+        total = sum(size for _, size, _ in items)
+        max_bytes = policy.get("max_bytes")
+        max_items = policy.get("max_items")
+        remaining = len(items)
+        count = freed = 0
+
+        # Least recently used first
+        for path, size, last_used in sorted(items, key=lambda item: item[2]):
+            expired = now - last_used > policy.get("max_age", float("inf"))
+            over_size = max_bytes is not None and total > max_bytes
+            over_count = max_items is not None and remaining > max_items
+            if not (expired or over_size or over_count):
+                break
+            if now - last_used < self.GRACE or any(path == p or p.is_relative_to(path) or path.is_relative_to(p) for p in protect):
+                continue
+            if self._remove(path, size):
+                total -= size
+                remaining -= 1
+                count += 1
+                freed += size
+        return count, freed
+
+    def _items(self, policy: Dict) -> List[Tuple[Path, int, float]]:
+        if "dir" in policy:
+            folder, prefix = self.root / policy["dir"], ""
+        else:
+            folder, prefix = self.root, policy["prefix"]
+
+        items = []
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if not entry.name.startswith(prefix) or entry.name.endswith(".tmp"):
+                        continue
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                        path = Path(entry.path)
+                        if entry.is_dir(follow_symlinks=False):
+                            size = tree_size(path)
+                            # Not atime: listing the folder (this scan included) refreshes it
+                            last_used = max(st.st_mtime, self._newest_mtime(path))
+                        else:
+                            size = st.st_size
+                            last_used = max(st.st_mtime, st.st_atime)
+                        items.append((path, size, last_used))
+                    except OSError:
+                        continue
+        except OSError:
+            return []
+        return items
+
+    @staticmethod
+    def _newest_mtime(folder: Path) -> float:
+        # A folder's own mtime only moves when entries are added/removed directly in it
+        newest = 0.0
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    try:
+                        newest = max(newest, entry.stat(follow_symlinks=False).st_mtime)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return newest
+
+    @staticmethod
+    def _remove(path: Path, size: int) -> bool:
+        try:
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+        except OSError:
+            return False
+        temp_ledger().discard(path, size)
+        return True
@@ -0,0 +1,112 @@
+# py_hashcache.py
+from __future__ import annotations
+from typing import Dict, List
+from py_imports import *
+import hashlib
+import json
+import threading
+import time
+
+
+class HashCache:
+    """
+    Digests of profile files, remembered across runs so the import diff only
+    hashes files that changed since last time.
+
+    Stored in %TEMP%/ModGnizer/hash_cache.json:
+        { "algorithm": "sha1", "files": { "<path>": [size, mtime_ns, digest, last_used] } }
+    An entry counts only while the file's size and mtime_ns are unchanged; switching
+    algorithm discards the whole cache. Shared between the menu thread and the
+    background watcher, hence the lock.
+    """
+
+    CACHE_NAME = "hash_cache.json"
+    MAX_ENTRIES = 20000
+    CHUNK = 1024 * 1024
+
+    def __init__(self, algorithm: str, path: Path | None = None):
+        if path is None:
+            temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
+            path = temp_root / "ModGnizer" / self.CACHE_NAME
+        self.path = Path(path)
+        self.algorithm = algorithm
+        self._files: Dict[str, List] | None = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    # -------------------------
+    # PUBLIC API
+    # -------------------------
+
+    def digest(self, file_path: Path, st: os.stat_result | None = None) -> str:
+        """Digest of file_path, from the cache when the file is unchanged, else computed and stored."""
+        file_path = Path(file_path)
+        st = st or file_path.stat()
+        key = str(file_path)
+
+        with self._lock:
+            entry = self._load().get(key)
+            if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+                entry[3] = time.time()
+                self._dirty = True
+                return entry[2]
+
+        # Hash outside the lock so the watcher and the review step don't serialise on I/O
+        h = hashlib.new(self.algorithm)
+        with file_path.open("rb") as fh:
+            for chunk in iter(lambda: fh.read(self.CHUNK), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+
+        with self._lock:
+            self._load()[key] = [st.st_size, st.st_mtime_ns, digest, time.time()]
+            self._dirty = True
+        return digest
+
+    def is_fresh(self, file_path: Path) -> bool:
+        try:
+            st = Path(file_path).stat()
+        except OSError:
+            return False
+        with self._lock:
+            entry = self._load().get(str(file_path))
+            return bool(entry) and entry[0] == st.st_size and entry[1] == st.st_mtime_ns
+
+    def forget(self, file_path: Path):
+        with self._lock:
+            if self._load().pop(str(file_path), None) is not None:
+                self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or self._files is None:
+                return
+            files = self._files
+            if len(files) > self.MAX_ENTRIES:
+                keep = sorted(files.items(), key=lambda kv: kv[1][3], reverse=True)[:self.MAX_ENTRIES]
+                self._files = files = dict(keep)
+            payload = json.dumps({"algorithm": self.algorithm, "files": files})
+            self._dirty = False
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(payload, encoding="utf-8")
+            tmp.replace(self.path)
+        except OSError:
+            pass
+
+    # -------------------------
+    # HELPERS
+    # -------------------------
+
+    def _load(self) -> Dict[str, List]:
+        if self._files is None:
+            self._files = {}
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("algorithm") == self.algorithm and isinstance(data.get("files"), dict):
+                    self._files = data["files"]
+            except (OSError, ValueError, AttributeError):
+                pass
+        return self._files
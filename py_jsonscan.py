@@ -0,0 +1,141 @@
+# py_jsonscan.py
+from __future__ import annotations
+from typing import Dict, Any, Iterable, Tuple, Union
+from py_imports import *
+import json
+
+_WS = re.compile(r"[ \t\r\n]*")
+_DECODER = json.JSONDecoder()
+_DELIMITERS = frozenset(",:]} \t\r\n")
+
+
+class _Scanner:
+    """Incremental reader over a JSON text file: only the current window is held in memory."""
+
+    def __init__(self, fh, chunk_size: int):
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self) -> bool:
+        chunk = self.fh.read(self.chunk_size)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of file)."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of the current window")
+        self.pos += 1
+
+    def decode(self) -> Any:
+        """Decode one value. Retries with more text when it could be cut off at the window's end."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+                # A number is only complete once a delimiter follows it ("-25" may be "-25.0")
+                if self.eof or (end < len(self.buf) and self.buf[end] in _DELIMITERS):
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            self.more()
+
+    def skip_value(self):
+        """
+        Step over one value. Containers are walked member by member, each decoded and
+        dropped, so only the largest single member is ever held, not the whole container.
+        """
+        first = self.peek()
+        if first == "[":
+            for _ in self.elements():
+                pass
+        elif first == "{":
+            for _ in self.members():
+                self.skip_value()
+        else:
+            self.decode()
+
+    def elements(self):
+        """Yield the items of the array at the current position, one at a time."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.decode()
+            self._separator("]")
+            if self.buf[self.pos - 1] == "]":
+                return
+
+    def members(self):
+        """Yield each key of the object at the current position; the caller must consume its value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise ValueError("Expected an object key")
+            key = self.decode()
+            self.expect(":")
+            yield key
+            self._separator("}")
+            if self.buf[self.pos - 1] == "}":
+                return
+
+    def _separator(self, close: str):
+        sep = self.peek()
+        if sep not in (",", close):
+            raise ValueError(f"Expected ',' or {close!r} after a value")
+        self.pos += 1
+
+
+def read_top_level_fields(
+    path: Path, keys: Iterable[Union[str, Tuple[str, ...]]], chunk_size: int = 64 * 1024
+) -> Dict[str, Any]:
+    """
+    Return {key: value} for the requested top-level keys of the JSON object in `path`.
+
+    Each item of `keys` is a key, or a tuple of alternative spellings of one field
+    (e.g. ("lastPlayed", "lastLaunch")). Reading stops as soon as every item has a
+    non-empty value under one of its keys, so a field's alternatives that appear
+    later in the file are not returned then.
+
+    The file is read in chunk_size pieces; values of other keys (e.g. a multi-MB
+    "installedAddons" array) are stepped over member by member without being kept,
+    so memory stays around one chunk (or one addon entry) regardless of file size.
+    Raises ValueError on malformed JSON, like json.load.
+    """
+    groups = [(k,) if isinstance(k, str) else tuple(k) for k in keys]
+    group_of = {key: i for i, group in enumerate(groups) for key in group}
+    pending = set(range(len(groups)))
+    found: Dict[str, Any] = {}
+
+    with Path(path).open("r", encoding="utf-8") as fh:
+        scan = _Scanner(fh, chunk_size)
+        for key in scan.members():
+            if key in group_of and key not in found:
+                found[key] = scan.decode()
+                if found[key] not in (None, "", [], {}):
+                    pending.discard(group_of[key])
+                    if not pending:
+                        break
+            else:
+                scan.skip_value()
+    return found
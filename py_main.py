@@ -1,11 +1,21 @@
+import time
+_STARTED = time.perf_counter()
+
 from py_imports import *
-from PyQt5.QtWidgets import QApplication, QFileDialog
 from py_archive import ArchiveBundler
-from py_undbj import UnDBJ
-from py_tmpfiles import TmpFilesClient, TmpFilesError
-from py_report import review_and_install
-from py_updater import check_for_updates
-import winreg, send2trash, shutil
+from py_report import review_and_install, review_and_install_many, DIFF_HASH
+from py_hashcache import HashCache
+from py_templedger import temp_ledger
+from py_eviction import TempEvictor
+from py_modstore import mod_store_from_env
+from py_transfer import format_rate, format_eta
+from py_progress import subscribe as subscribe_progress
+import py_spans
+import winreg, shutil
+
+# Heavy or rarely needed modules (PyQt5, requests via py_tmpfiles/py_storage/py_updater,
+# sqlite3 via py_undbj, send2trash, ...) are imported where they're first used, keeping
+# them off the path to the first menu. `python py_startup.py` reports what startup imports.
 
 # -------------------------
 # COLORAMA (UI Enhancements)
@@ -17,6 +27,9 @@ init(autoreset=True)
 class App:
     
     VERSION_FILE = "buildId.version"
+    # Temp cache policies are applied (in the background) after these menu actions
+    EVICT_AFTER = {"menu_load_mods_from_archive", "menu_bundle_mods_to_archive"}
+    PROGRESS_REDRAW = 0.1
     MENU_TITLE = "Main Menu"
     DIVIDER = "-- -x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x-x- --"
 
@@ -63,32 +76,56 @@ class App:
 
 
 
-    def __init__(self):
+    def __init__(self, interactive: bool = True):
+        """interactive=False (used by py_cli): no update check, no screen clearing, no menu"""
         self.debug = False
         self.log = None
+        self.interactive = interactive
         
-        # Check for updates and ask user consent
-        user_accepted_update = check_for_updates(
-            self.get_runtime_base() / self.VERSION_FILE,
-            lambda:self.get_consent("\n\n\n\n\nA new version is available. Do you want to update")
-        ) if self.is_running_as_exe() else False
-        if not user_accepted_update: self.cls()
+        # Check for updates in the background; the menu offers the update once it's known
+        self.update_check = None
+        self.update_announced = False
+        if interactive and self.is_running_as_exe():
+            from py_updater import UpdateCheck
+            self.update_check = UpdateCheck(self.get_runtime_base() / self.VERSION_FILE).start()
+        if interactive: self.cls()
         
-        self.build_id, self.IS_FIRST_TIME_SETUP = self.load_or_init_build_id()
+        self.build_id, self.IS_FIRST_TIME_SETUP = self.load_or_init_build_id() if interactive else (self.read_build_id(), False)
         
         self.operation_text = None
+        self.profile_catalogs = {}
+        self.hash_cache = HashCache(DIFF_HASH)
+        self.profile_watch = None
+        self.temp_evictor = TempEvictor()
+        # Shared content-addressed mod store, when MODGNIZER_MOD_STORE points at one (see py_modstore)
+        self.mod_store = mod_store_from_env()
+        # Every long operation reports on the progress bus; drawn as one live status line
+        self._progress_drawn_at = 0.0
+        subscribe_progress(self.render_progress)
+        if not interactive:
+            return
         self.refresh_main_menu()
+        py_spans.record("startup", time.perf_counter() - _STARTED)
+
+        if os.environ.get("MODGNIZER_PROFILE_STARTUP"):
+            self.operation_text = f"Startup: {(time.perf_counter() - _STARTED) * 1000:.0f} ms to first menu"
 
     def refresh_main_menu(self):
         """Refresh the main menu with updated temp cache size"""
         _, temp_bytes = self.get_modgnizer_temp_info()
+        temp_size = "counting..." if temp_bytes is None else self.format_bytes(temp_bytes)
         self.menu_main_definition = {
             "1": ("Load *MODS* from an ARCHIVE (or link)",                  "menu_load_mods_from_archive"),
             "2": ("Bundle *MODS* to an ARCHIVE",                            "menu_bundle_mods_to_archive"),
-            "3": (f"Clear temp cache ({self.format_bytes(temp_bytes)})",    "menu_clear_temp_cache"),
+            "3": (f"Clear temp cache ({temp_size})",                        "menu_clear_temp_cache"),
             "4": ("Log errors",                                             "menu_toggle_error_logging"),
+            "5": (f"Watch profiles in background ({'on' if self.profile_watch else 'off'})", "menu_toggle_profile_watch"),
             "#": ("Quit",                                                   "menu_quit"),
         }
+        if self.update_check and self.update_check.release:
+            self.menu_main_definition["6"] = (f"Update to {self.update_check.release['tag']}", "menu_install_update")
+        if self.mod_store:
+            self.menu_main_definition["7"] = ("Clean up the shared mod store", "menu_clean_mod_store")
         self.menu_modes = {
             key: (label, getattr(self, handler))
             for key, (label, handler) in self.menu_main_definition.items()
@@ -115,6 +152,61 @@ class App:
         self.refresh_main_menu()
         return True
 
+    def menu_install_update(self):
+        self._log("IN -> menu_install_update", "info")
+
+        from py_updater import install_update
+        install_update(
+            self.update_check.release,
+            lambda: self.get_consent("\nA new version is available. Do you want to update"),
+        )
+        # Still here: declined or failed
+        self.operation_text = "Update skipped."
+        return True
+
+    def menu_clean_mod_store(self):
+        self._log("IN -> menu_clean_mod_store", "info")
+
+        usage = self.mod_store.usage()
+        print(Fore.YELLOW + f"\n{self.mod_store.root}")
+        print(Fore.LIGHTBLACK_EX + f"  {usage['blobs']} stored file(s), {self.format_bytes(usage['bytes'])}")
+        print(Fore.LIGHTBLACK_EX + f"  {usage['unreferenced']} no longer used by any profile, {self.format_bytes(usage['unreferenced_bytes'])}")
+        if not usage["unreferenced"]:
+            self.operation_text = "Every stored mod is still in use."
+            return True
+
+        if not self.get_consent("Remove the stored mods no profile uses"):
+            return True
+        result = self.mod_store.gc()
+        self.operation_text = f"Removed {result['removed']} stored mod(s), freed {self.format_bytes(result['freed'])}."
+        return True
+
+    def menu_toggle_profile_watch(self):
+        self._log("IN -> menu_toggle_profile_watch", "info")
+
+        if self.profile_watch:
+            self.profile_watch.stop()
+            self.profile_watch = None
+            self.operation_text = "Profile watching DISABLED."
+            self.refresh_main_menu()
+            return True
+
+        managers = self.detect_mod_managers()
+        if not managers:
+            self.operation_text = Fore.RED + "No supported mod managers were detected."
+            return True
+
+        from py_watch import ProfileWatch
+        self.profile_watch = ProfileWatch(
+            managers.values(),
+            self.hash_cache,
+            on_profiles_changed=lambda manager: self.profile_catalogs.pop(str(manager["db_path"]), None),
+            load_profiles=lambda manager: self.get_profile_catalog(manager).records,
+        ).start()
+        self.operation_text = f"Profile watching ENABLED ({self.profile_watch.watcher.kind})."
+        self.refresh_main_menu()
+        return True
+
     def _log(self, msg, level="info"):
         if not self.log: return
 
@@ -165,21 +257,48 @@ class App:
         version_path.write_text(str(new_id), encoding="utf-8")
         return new_id, False
 
+    def read_build_id(self):
+        """Build id without the dev-mode increment of load_or_init_build_id"""
+        try:
+            return int((self.get_temp_runtime_base() / self.VERSION_FILE).read_text().strip())
+        except (OSError, ValueError):
+            return 0
+
     # -------------------------
     # region MENU HANDLERS
     # -------------------------
     def menu_clear_temp_cache(self):
         self._log("IN -> menu_clear_temp_cache","info")
 
+        # Exact figure before asking to delete: recount now rather than trust the ledger
+        temp_ledger().reconcile(wait=True)
         temp_path, temp_bytes = self.get_modgnizer_temp_info()
         
-        if temp_bytes == 0:
+        if not temp_bytes:
             self.operation_text = "Temp cache is empty."
             return True
 
-        print(Fore.YELLOW + f"\nDelete:\n{temp_path}\nTotal size: {self.format_bytes(temp_bytes)}")
-        
-        if not self.get_consent("Are you sure you want to clear the temp cache"):
+        print(Fore.YELLOW + f"\n{temp_path}\nTotal size: {self.format_bytes(temp_bytes)}")
+        for category, size in self.temp_evictor.usage().items():
+            if size:
+                print(Fore.LIGHTBLACK_EX + f"  {category:<30} {self.format_bytes(size)}")
+
+        print(Style.BRIGHT + "\n**Clear:**")
+        print(Fore.LIGHTBLACK_EX + "1. Old and excess items only (keeps recent downloads, bundles and backups)")
+        print(Fore.LIGHTBLACK_EX + "2. Everything")
+        choice = self._get_numeric_input(2)
+        if choice is None:
+            return True
+
+        if choice == 1:
+            evicted = self.temp_evictor.run()
+            freed = sum(size for _, size in evicted.values())
+            count = sum(n for n, _ in evicted.values())
+            self.operation_text = f"Removed {count} old item(s), freed {self.format_bytes(freed)}." if count else "Nothing is old or over its size limit."
+            self.refresh_main_menu()
+            return True
+
+        if not self.get_consent("Are you sure you want to clear the ENTIRE temp cache"):
             return True
 
         if self.clear_modgnizer_temp():
@@ -199,8 +318,11 @@ class App:
 
         kind, value = source
         archive_path = None
+        extracted_path = None
+        extracted_digests = None
 
         if kind == "clipboard":
+            from py_tmpfiles import TmpFilesClient
             try:
                 manifest = TmpFilesClient.parse_modgnizer_manifest(value)
             except Exception as e:
@@ -214,11 +336,9 @@ class App:
                 return True
             
             print(Fore.BLUE + f"Found {len(links)} part(s). Downloading to temp ...")
-            
+
             try:
-                client = TmpFilesClient(timeout=120)
-                downloaded = client.download_from_paste(manifest)
-                archive_path = downloaded[0]
+                archive_path, extracted_path, extracted_digests = self.fetch_share(manifest)
             except Exception as e:
                 self._log(e,"critical")
                 self.operation_text = Fore.RED + f"Download failed: {e}"
@@ -227,13 +347,12 @@ class App:
         elif kind == "local":
             archive_path = value
 
-        # Query user for password
-        password = input(Fore.YELLOW + "\nEnter password for archive (leave blank if none): ").strip()
-
-        # Extract archive
-        extracted_path = None
+        # Extract archive (unless it was already extracted while downloading)
         try:
-            extracted_path = ArchiveBundler.extract_archive(archive_path, password=password)
+            if not extracted_path:
+                # Query user for password
+                password = input(Fore.YELLOW + "\nEnter password for archive (leave blank if none): ").strip()
+                extracted_path = ArchiveBundler.extract_archive(archive_path, password=password)
         except Exception as e:
             self._log(e,"critical")
             exit_code = e.args[0]
@@ -256,27 +375,43 @@ class App:
         if not chosen_mod_manager:
             return True
         
-        chosen_mod_profile = self.get_mod_profiles(chosen_mod_manager)
-        if not chosen_mod_profile:
+        # Several profiles can take the same import: one download/extraction, a diff each
+        chosen_mod_profiles = self.get_mod_profiles(chosen_mod_manager, multiple=True)
+        if not chosen_mod_profiles:
             return True
 
         # Check if archive name matches profile
         archive_name = archive_path.name
-        profile_folder_with_ext = f"{chosen_mod_profile['folder']}{archive_path.suffix}"
-        if archive_name != profile_folder_with_ext:
-            msg = Fore.YELLOW + f"`{archive_name}` doesn't match `{profile_folder_with_ext}`, proceed anyway"
+        expected = [f"{p['folder']}{archive_path.suffix}" for p in chosen_mod_profiles]
+        if archive_name not in expected:
+            msg = Fore.YELLOW + f"`{archive_name}` doesn't match `{'`, `'.join(expected)}`, proceed anyway"
             if not self.get_consent(msg):
                 return True
 
         # Review and install
         print(self.DIVIDER)
         try:
+            if len(chosen_mod_profiles) > 1:
+                review_and_install_many(
+                    extracted_path,
+                    chosen_mod_manager,
+                    chosen_mod_profiles,
+                    self.get_consent,
+                    lambda text: setattr(self, "operation_text", text),
+                    extracted_digests,
+                    self.hash_cache,
+                    self.mod_store,
+                )
+                return True
             review_and_install(
                 extracted_path,
                 chosen_mod_manager,
-                chosen_mod_profile,
+                chosen_mod_profiles[0],
                 self.get_consent,
-                lambda text: setattr(self, "operation_text", text)
+                lambda text: setattr(self, "operation_text", text),
+                extracted_digests,
+                self.hash_cache,
+                self.mod_store,
             )
         except Exception as e:
             self._log(e,"critical")
@@ -284,6 +419,53 @@ class App:
         
         return True
 
+    @py_spans.traced("main.fetch_share")
+    def fetch_share(self, manifest: dict):
+        """
+        Download a share. Split ZIPs are extracted part by part while the rest is still downloading.
+        Returns (archive_path, extracted_path, extracted_digests); the last two are None when the
+        archive still has to be extracted. A split ZIP that streamed through completely is never
+        reassembled: archive_path only names it then. Raises on download failure.
+        """
+        from py_tmpfiles import TmpFilesClient
+        from py_asynctransfer import AsyncTmpFilesClient
+        from py_streamzip import PipelinedZipExtraction
+
+        links = manifest.get("links", [])
+        internal_name = manifest.get("internal_name") or ""
+        pipeline = None
+        if len(links) > 1 and internal_name.lower().endswith(".zip"):
+            pipeline = PipelinedZipExtraction(
+                ArchiveBundler.extraction_dir(internal_name), len(links), manifest.get("sha256")
+            )
+
+        try:
+            # v2 shares carry per-part sizes and digests, so parts can safely be fetched in parallel
+            client_cls = AsyncTmpFilesClient if manifest.get("version", 1) >= 2 else TmpFilesClient
+            client = client_cls(timeout=120)
+            if pipeline:
+                downloaded = client.download_from_paste(
+                    manifest, cleanup_parts=False, on_part=pipeline.part_ready, reassemble=False
+                )
+            else:
+                downloaded = client.download_from_paste(manifest)
+        except Exception:
+            if pipeline:
+                pipeline.abort()
+            raise
+
+        extracted_path = extracted_digests = None
+        if pipeline:
+            extracted_path = pipeline.finish()
+            if extracted_path:
+                extracted_digests = pipeline.digests
+                return client.reassembly_path(internal_name), extracted_path, extracted_digests
+            # The parts were kept for this: extract the reassembled archive instead
+            self._log(f"Streaming extraction fell back: {pipeline.fallback_reason}", "info")
+            assembled = client.reassemble_parts(downloaded, internal_name, manifest.get("sha256"), manifest.get("size_bytes"))
+            return assembled, None, None
+        return downloaded[0], extracted_path, extracted_digests
+
     def menu_bundle_mods_to_archive(self):
         self._log("IN -> menu_bundle_mods_to_archive", "info")
 
@@ -325,6 +507,7 @@ class App:
         
         try:
             format_handlers[archive_prefs["format"]]()
+            temp_ledger().add(output_path)
         except FileNotFoundError as e:
             self._log(e,"critical")
             self.operation_text = Fore.RED + f"Required tool not found: {e}"
@@ -347,6 +530,8 @@ class App:
 
     def menu_quit(self):
         self._log("IN -> menu_quit", "info")
+        if self.profile_watch:
+            self.profile_watch.stop()
         print(Fore.WHITE + "Goodbye.")
         return False
 
@@ -372,25 +557,76 @@ class App:
         choice = self._get_numeric_input(len(manager_list))
         return None if choice is None else manager_list[choice - 1][1]
 
-    def get_mod_profiles(self, chosen_mod_manager):
+    def get_mod_profiles(self, chosen_mod_manager, multiple: bool = False):
+        """The chosen profile, or with multiple=True a list of one or more ("1,3,5-7")"""
         self._log("GET -> get_mod_profiles", "info")
 
-        undb = UnDBJ(chosen_mod_manager["db_path"])
-        profiles = undb.get_internal_profiles()
+        catalog = self.get_profile_catalog(chosen_mod_manager)
         
-        if not profiles:
+        if not len(catalog):
             self.operation_text = Fore.RED + "No profiles were detected in this mod manager."
             return None
         
-        print(self.DIVIDER)
-        
-        for i, p in enumerate(profiles, 1):
-            print(Fore.LIGHTBLACK_EX + f"{i}. {p['display']}")
-        
-        print(Style.BRIGHT + "\n**Select a Profile**")
-        
-        choice = self._get_numeric_input(len(profiles))
-        return None if choice is None else profiles[choice - 1]
+        query, page = "", 0
+        while True:
+            matches = catalog.search(query)
+            pages = catalog.page_count(matches)
+            page = min(page, pages - 1)
+            shown = catalog.page(matches, page)
+            first = page * catalog.PAGE_SIZE
+
+            print(self.DIVIDER)
+            for i, line in enumerate(catalog.format_page(shown), first + 1):
+                print(Fore.LIGHTBLACK_EX + f"{i}. {line}")
+            if not shown:
+                print(Fore.YELLOW + f"No profiles match '{query}'.")
+
+            status = f"Page {page + 1}/{pages}, {len(matches)} profile(s)" + (f" matching '{query}'" if query else "")
+            print(Fore.LIGHTBLACK_EX + f"\n{status}")
+            print(Fore.LIGHTBLACK_EX + "[number] select   [n/p] next/previous page   [/text] search   [/] clear   [r] rescan")
+            if multiple:
+                print(Fore.LIGHTBLACK_EX + "[1,3,5-7] select several: the same mods go into each")
+            print(Style.BRIGHT + "\n**Select a Profile**")
+
+            choice = input(Fore.WHITE + "> ").strip()
+            if choice.isdigit() and 1 <= int(choice) <= len(matches):
+                return [matches[int(choice) - 1]] if multiple else matches[int(choice) - 1]
+            picked = self._parse_selection(choice, len(matches)) if multiple else None
+            if picked:
+                return [matches[i - 1] for i in picked]
+            if choice.lower() == "n":
+                page = min(page + 1, pages - 1)
+            elif choice.lower() == "p":
+                page = max(page - 1, 0)
+            elif choice.startswith("/"):
+                query, page = choice[1:].strip(), 0
+            elif choice.lower() == "r":
+                catalog = self.get_profile_catalog(chosen_mod_manager, rescan=True)
+            else:
+                self.operation_text = Fore.RED + "Invalid selection."
+                return None
+
+    @staticmethod
+    def _parse_selection(choice: str, count: int) -> list[int] | None:
+        """"1,3,5-7" -> [1, 3, 5, 6, 7] (1-based, in order, no repeats); None unless every entry is in 1..count"""
+        picked = []
+        for entry in choice.replace(" ", "").split(","):
+            m = re.fullmatch(r"(\d+)(?:-(\d+))?", entry)
+            if not m:
+                return None
+            first, last = int(m[1]), int(m[2] or m[1])
+            if not 1 <= first <= last <= count:
+                return None
+            picked += [i for i in range(first, last + 1) if i not in picked]
+        return picked
+
+    def get_profile_catalog(self, chosen_mod_manager, rescan: bool = False):
+        """Profiles are scanned once per session and launcher; [r] in the picker rescans"""
+        key = str(chosen_mod_manager["db_path"])
+        if rescan or key not in self.profile_catalogs:
+            from py_undbj import UnDBJ
+            self.profile_catalogs[key] = UnDBJ(chosen_mod_manager["db_path"]).get_profile_catalog()
+        return self.profile_catalogs[key]
 
     def get_archive_preferences(self):
         self._log("GET -> get_archive_preferences", "info")
@@ -454,6 +690,7 @@ class App:
         
         elif choice == "2":
             try:
+                from PyQt5.QtWidgets import QApplication, QFileDialog
                 app = QApplication.instance() or QApplication(sys.argv)
                 file_path, _ = QFileDialog.getOpenFileName(
                     None, "Select Mod Archive",
@@ -503,6 +740,8 @@ class App:
             return False
         
         try:
+            import send2trash
+            temp_ledger().discard(file_path)
             send2trash.send2trash(str(file_path))
             print(Fore.BLUE + "Existing file moved to Recycle Bin.")
             return True
@@ -518,32 +757,38 @@ class App:
             self.operation_text = Fore.RED + "Archive not found for upload."
             return
         
-        print("\n" + Fore.YELLOW + "--> Note: tmpfiles.org automatically deletes uploads after 60 minutes. <-- ")
+        backend = self.get_storage_backend()
+        if not backend:
+            return
+
+        if backend.ttl:
+            print("\n" + Fore.YELLOW + f"--> Note: this storage automatically deletes uploads after {backend.ttl // 60} minutes. <-- ")
         print(Fore.RED + "--> [!] if your zip is NOT password protected, be careful that others could download! <--  [!] [!]")
         
-        if not self.get_consent("Upload this archive to tmpfiles.org to share with friends"):
+        if not self.get_consent(f"Upload this archive to {backend.label} to share with friends"):
             print(Fore.WHITE + "Skipping upload.")
             self.reveal_in_explorer(archive_path)
             self.operation_text = "Archive bundled locally (upload skipped)"
             return
         
-        client = TmpFilesClient(timeout=120)
+        from py_tmpfiles import TmpFilesClient, TmpFilesError
+        client = TmpFilesClient(timeout=120, backend=backend)
         try:
-            print(Fore.BLUE + "Uploading to tmpfiles.org ...")
-            result = client.upload_in_chunks(archive_path, chunk_size=90 * 1024 * 1024)
+            print(Fore.BLUE + f"Uploading to {backend.label} ...")
+            result = client.upload_in_chunks(archive_path)
             links = result.get("links", [])
             
             if not links:
                 raise Exception("Upload completed but no links returned.")
             
             if len(links) == 1:
-                self.save_links_md_and_copy_to_clipboard([links[0]], archive_path)
+                self.save_links_md_and_copy_to_clipboard([links[0]], archive_path, result)
                 print(Fore.GREEN + "Upload successful!")
                 print(Fore.WHITE + "A MODGNIZER share block has been copied to your clipboard.")
             else:
                 print(Fore.GREEN + "Chunked upload successful!")
                 print(Fore.WHITE + f"Parts uploaded: {len(links)}")
-                self.save_links_md_and_copy_to_clipboard(links, archive_path)
+                self.save_links_md_and_copy_to_clipboard(links, archive_path, result)
                 print(Fore.LIGHTBLACK_EX + "\nTip: Send the copied text to your friend.")
                 print(Fore.LIGHTBLACK_EX + "They can paste it directly into ModGnizer.")
         except TmpFilesError as e:
@@ -553,17 +798,30 @@ class App:
             self._log(e,"critical")
             self.operation_text = Fore.RED + f"Unexpected error during upload: {e}"
 
+    def get_storage_backend(self):
+        """Where to upload: tmpfiles.org, plus any LAN/local targets configured via environment"""
+        self._log("GET -> get_storage_backend", "info")
+
+        from py_storage import available_backends
+        backends = list(available_backends(timeout=120).values())
+        if len(backends) == 1:
+            return backends[0]
+
+        print(Style.BRIGHT + "\n**Upload to:**\n")
+        for i, backend in enumerate(backends, 1):
+            print(Fore.LIGHTBLACK_EX + f"{i}. {backend.label}")
+
+        choice = self._get_numeric_input(len(backends))
+        return None if choice is None else backends[choice - 1]
+
     def get_modgnizer_temp_info(self):
+        """Temp dir and its size from the ledger (None until first counted); recounts in the background when stale"""
         self._log("GET -> get_modgnizer_temp_info", "info")
 
-        temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
-        temp_dir = temp_root / "ModGnizer"
-        
-        if not temp_dir.exists():
-            return temp_dir, 0
-        
-        total_size = sum(p.stat().st_size for p in temp_dir.rglob("*") if p.is_file())
-        return temp_dir, total_size
+        ledger = temp_ledger()
+        ledger.reconcile_if_stale()
+        ledger.save()
+        return ledger.root, ledger.total()
 
     # -------------------------
     # region MAIN MENU
@@ -574,6 +832,11 @@ class App:
         self.refresh_main_menu()
         self.cls()
 
+        if self.update_check and self.update_check.release and not self.update_announced:
+            self.update_announced = True
+            notice = Fore.GREEN + f"A new version ({self.update_check.release['tag']}) is available: select 6 to update."
+            self.operation_text = f"{self.operation_text}\n{notice}" if self.operation_text else notice
+
         os.system(f"title ModGnizer v{self.build_id}")
 
         print(Fore.WHITE + f" // (Version {self.build_id}) //\nby @LukieD4 on GitHub\n")
@@ -589,7 +852,12 @@ class App:
         
         if choice in self.menu_modes:
             _, handler = self.menu_modes[choice]
-            return handler()
+            # Includes the time spent at prompts; the stages inside have their own spans
+            with py_spans.span(f"menu.{handler.__name__}"):
+                result = handler()
+            if handler.__name__ in self.EVICT_AFTER:
+                self.temp_evictor.run_in_background()
+            return result
         else:
             self.operation_text = Fore.RED + "Invalid choice."
             return True
@@ -607,6 +875,7 @@ class App:
                 continue
         return False, None
 
+    @py_spans.traced("main.detect_mod_managers")
     def detect_mod_managers(self):
         self._log("DETECT -> detect_mod_managers", "info")
 
@@ -632,20 +901,45 @@ class App:
         
         return {k: v for k, v in mod_managers.items() if v["installed"]}
 
-    def save_links_md_and_copy_to_clipboard(self, links: list[str], original_file: Path):
+    def save_links_md_and_copy_to_clipboard(self, links: list[str], original_file: Path, upload_result: dict = None):
         self._log("SAVE -> save_links_md_and_copy_to_clipboard", "info")
 
         if not links:
             return
+
+        md_content = self.build_share_markdown(links, original_file, upload_result)
         
         temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
         modgnizer_temp = temp_root / "ModGnizer"
         modgnizer_temp.mkdir(parents=True, exist_ok=True)
+        short_ts = datetime.now().strftime("%Y%m%d%H%M%S")
+        
+        # Save markdown file
+        md_filename = f"MODGNIZER_shared_modlist_{short_ts}.md"
+        md_path = modgnizer_temp / md_filename
+        md_path.write_text(md_content, encoding="utf-8")
+        temp_ledger().add(md_path)
+        
+        # Copy to clipboard
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication(sys.argv)
+        app.clipboard().setText(md_content)
+        self.reveal_in_notepad(md_path)
+        
+        print(Fore.GREEN + "Share info saved & copied to clipboard!")
+        print(Fore.WHITE + f"Markdown file: {md_path}")
+        self.operation_text = f"Copied links to clipboard. Share it with your friends!\n{md_path}"
+
+    def build_share_markdown(self, links: list[str], original_file: Path, upload_result: dict = None) -> str:
+        """The share block friends paste into ModGnizer (human-readable part + encoded manifest)"""
+        upload_result = upload_result or {}
+        sha256 = upload_result.get("sha256")
+        part_sha256s = upload_result.get("part_sha256s")
         
         internal_name = original_file.name
         size_bytes = original_file.stat().st_size if original_file.exists() else 0
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        short_ts = datetime.now().strftime("%Y%m%d%H%M%S")
+        sha_line = f"SHA-256 of modlist: {sha256}  \n" if sha256 else ""
         
         md_content = f"""```# MODGNIZER
 
@@ -653,7 +947,7 @@ A friend has shared their modlist with you!
 
 *Internal name: "{internal_name}"  
 Size of modlist: {size_bytes} bytes  
-Date of modlist: {timestamp}*
+{sha_line}Date of modlist: {timestamp}*
 
 **Instructions**
 - Highlight *this entire text*
@@ -668,27 +962,26 @@ Date of modlist: {timestamp}*
 
 {self.DIVIDER}
 
-## Download Links
 """
-        md_content += "\n".join(links) + "\n```"
-        
-        # Save markdown file
-        md_filename = f"MODGNIZER_shared_modlist_{short_ts}.md"
-        md_path = modgnizer_temp / md_filename
-        md_path.write_text(md_content, encoding="utf-8")
-        
-        # Copy to clipboard
-        app = QApplication.instance() or QApplication(sys.argv)
-        app.clipboard().setText(md_content)
-        self.reveal_in_notepad(md_path)
-        
-        print(Fore.GREEN + "Share info saved & copied to clipboard!")
-        print(Fore.WHITE + f"Markdown file: {md_path}")
-        self.operation_text = f"Copied links to clipboard. Share it with your friends!\n{md_path}"
+        if part_sha256s and len(part_sha256s) == len(links):
+            md_content += "## Part Checksums (SHA-256)\n"
+            md_content += "\n".join(f"{i}: {h}" for i, h in enumerate(part_sha256s)) + "\n\n"
+
+        md_content += "## Download Links\n"
+        md_content += "\n".join(links) + "\n\n"
+
+        # Machine-readable copy of everything above (format version, part sizes, digests)
+        from py_tmpfiles import TmpFilesClient
+        md_content += TmpFilesClient.encode_manifest_payload(
+            internal_name, size_bytes, timestamp, links, sha256, part_sha256s,
+            upload_result.get("part_sizes"), upload_result.get("backend"), upload_result.get("expires_at"),
+        ) + "\n```"
+        return md_content
 
     def read_from_clipboard(self):
         self._log("READ -> read_from_clipboard", "info")
 
+        from PyQt5.QtWidgets import QApplication
         app = QApplication.instance() or QApplication(sys.argv)
         text = app.clipboard().text()
         return text if text and text.strip() else None
@@ -719,13 +1012,39 @@ Date of modlist: {timestamp}*
         
         try:
             shutil.rmtree(temp_dir)
+            temp_ledger().reset()
             self.operation_text = "Temp cache cleared successfully."
             return True
         except Exception as e:
             self._log(e,"critical")
+            # Part of the tree may be gone: recount what's left
+            temp_ledger().reconcile()
             self.operation_text = f"Failed to clear temp cache: {e}"
             return False
 
+    def render_progress(self, event: dict):
+        """Single-line live status for any long operation (see py_progress), redrawn at most every PROGRESS_REDRAW seconds"""
+        now = time.perf_counter()
+        if not event["done"] and now - self._progress_drawn_at < self.PROGRESS_REDRAW:
+            return
+        self._progress_drawn_at = now
+
+        line = event["label"]
+        if event["items_total"]:
+            line += f"  {event['items_done']}/{event['items_total']}"
+        if event["bytes_done"] or event["bytes_total"]:
+            total = f" / {self.format_bytes(event['bytes_total'])}" if event["bytes_total"] else ""
+            line += f"  {self.format_bytes(event['bytes_done'])}{total}  {format_rate(event['rate'])}"
+        eta = f"  ETA {format_eta(event['eta'])}"
+
+        if not event["done"]:
+            print("\r" + Fore.LIGHTBLACK_EX + line + eta + " " * 4, end="", flush=True)
+            return
+
+        latency = f"  (server {event['latency'] * 1000:.0f} ms)" if event["latency"] is not None else ""
+        color = Fore.LIGHTBLACK_EX if event["ok"] else Fore.RED
+        print("\r" + color + line + latency + " " * 16)
+
     def format_bytes(self, size: int):
         self._log("FORMAT -> format_bytes", "info")
         for unit in ("B", "KB", "MB", "GB"):
@@ -752,4 +1071,11 @@ Date of modlist: {timestamp}*
             running = self.menu()
 
 
-App().run()
\ No newline at end of file
+if __name__ == "__main__":
+    # MODGNIZER_PROFILE=<path.json>: record timing spans for this run (see py_spans)
+    py_spans.enable_from_env()
+    if len(sys.argv) > 1:
+        # Subcommands (bundle, load, diff, upload, ...): see py_cli
+        from py_cli import main
+        sys.exit(main(sys.argv[1:], App))
+    App().run()
\ No newline at end of file
@@ -0,0 +1,171 @@
+# py_modstore.py
+"""
+Optional content-addressed store for mod files, shared by every profile.
+
+Enabled by MODGNIZER_MOD_STORE=<folder>, best on the same drive as the launchers'
+profiles. Installs (py_report.install_mods) then put each archive file into the
+store once, named by its DIFF_HASH digest:
+
+    <store>/<first 2 hex digits>/<digest>
+
+and give the profile a hard link to it (a py_copy copy_file where linking fails,
+a reflink when the filesystem has them), so an identical jar in ten profiles takes
+its space once and installing a mod that is already stored is a link instead of a copy. On another volume than the profile
+the store is skipped and files are copied as before.
+
+A blob no profile links to anymore has a link count of 1: gc() removes those.
+Profiles that got a reflink hold no link; their files don't depend on the blob.
+"""
+from __future__ import annotations
+from typing import Dict
+from py_imports import *
+from py_report import DIFF_HASH
+from py_copy import copy_file
+import hashlib
+import shutil
+
+ENV_MOD_STORE = "MODGNIZER_MOD_STORE"   # e.g. D:\Games\ModGnizerStore
+
+
+class ModStoreError(Exception):
+    pass
+
+
+def mod_store_from_env() -> "ModStore | None":
+    root = os.environ.get(ENV_MOD_STORE, "").strip()
+    return ModStore(Path(os.path.expandvars(root))) if root else None
+
+
+class ModStore:
+    IO_BUFFER = 1024 * 1024
+
+    def __init__(self, root: Path, algorithm: str = DIFF_HASH):
+        self.root = Path(root)
+        self.algorithm = algorithm
+
+    # -------------------------
+    # PUBLIC API
+    # -------------------------
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def can_link(self, folder: Path) -> bool:
+        """True when files in folder can be linked to the store (same volume)"""
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            return self.root.stat().st_dev == Path(folder).stat().st_dev
+        except OSError:
+            return False
+
+    def put(self, src: Path, digest: str | None = None) -> Path:
+        """
+        The blob holding src's content, added if it isn't stored yet. digest (of src,
+        e.g. from the streaming extraction) saves hashing it; otherwise it is hashed
+        while being copied in.
+        """
+        src = Path(src)
+        size = src.stat().st_size
+        if digest:
+            blob = self.blob_path(digest)
+            if blob.is_file() and blob.stat().st_size == size:
+                return blob
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".incoming-{os.getpid()}-{src.name}"
+        h = hashlib.new(self.algorithm)
+        buffer = memoryview(bytearray(self.IO_BUFFER))
+        try:
+            with src.open("rb") as fin, tmp.open("wb") as fout:
+                while True:
+                    n = fin.readinto(buffer)
+                    if not n:
+                        break
+                    h.update(buffer[:n])
+                    fout.write(buffer[:n])
+            if digest and h.hexdigest() != digest:
+                raise ModStoreError(f"{src.name} doesn't match its digest (expected {digest}, got {h.hexdigest()}).")
+            shutil.copystat(src, tmp)
+            blob = self.blob_path(h.hexdigest())
+            if blob.is_file() and blob.stat().st_size == size:
+                return blob
+            blob.parent.mkdir(exist_ok=True)
+            tmp.replace(blob)
+            return blob
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def install(self, src: Path, dest: Path, digest: str | None = None) -> str:
+        """Store src and place it at dest. Returns how: "link", or the py_copy strategy used instead."""
+        blob = self.put(src, digest)
+        dest = Path(dest)
+        dest.unlink(missing_ok=True)
+        try:
+            os.link(blob, dest)
+            return "link"
+        except OSError:
+            # No hard links here (e.g. FAT), or the blob is at the filesystem's link limit
+            return copy_file(blob, dest)
+
+    def blobs(self):
+        """(path, os.stat_result) of every stored blob"""
+        if not self.root.is_dir():
+            return
+        for bucket in self.root.iterdir():
+            if not bucket.is_dir() or len(bucket.name) != 2:
+                continue
+            for blob in bucket.iterdir():
+                try:
+                    yield blob, blob.stat()
+                except OSError:
+                    continue
+
+    def usage(self) -> Dict[str, int]:
+        """{"blobs", "bytes", "unreferenced", "unreferenced_bytes"}"""
+        usage = {"blobs": 0, "bytes": 0, "unreferenced": 0, "unreferenced_bytes": 0}
+        for _, st in self.blobs():
+            usage["blobs"] += 1
+            usage["bytes"] += st.st_size
+            if st.st_nlink <= 1:
+                usage["unreferenced"] += 1
+                usage["unreferenced_bytes"] += st.st_size
+        return usage
+
+    def gc(self, verify: bool = False, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Remove blobs no profile links to. verify=True also re-hashes the rest and drops
+        any whose content no longer matches its name (a linked file edited in place);
+        the profiles keep their files, they just stop sharing that blob.
+        Returns {"removed", "freed", "corrupt"}.
+        """
+        result = {"removed": 0, "freed": 0, "corrupt": 0}
+        for blob, st in list(self.blobs()):
+            unreferenced = st.st_nlink <= 1
+            corrupt = not unreferenced and verify and self._digest(blob) != blob.name
+            if not (unreferenced or corrupt):
+                continue
+            if not dry_run:
+                try:
+                    blob.unlink()
+                except OSError:
+                    continue
+            result["corrupt" if corrupt else "removed"] += 1
+            if unreferenced:
+                result["freed"] += st.st_size
+        # Leftovers of an interrupted put()
+        if not dry_run and self.root.is_dir():
+            for tmp in self.root.glob(".incoming-*"):
+                tmp.unlink(missing_ok=True)
+        return result
+
+    # -------------------------
+    # HELPERS
+    # -------------------------
+
+    def _digest(self, path: Path) -> str:
+        h = hashlib.new(self.algorithm)
+        with path.open("rb") as fh:
+            for chunk in iter(lambda: fh.read(self.IO_BUFFER), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
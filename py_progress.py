@@ -0,0 +1,127 @@
+# py_progress.py
+"""
+Progress events for long-running operations (hashing, copying, bundling,
+extracting, transfers), on one process-wide bus the UI subscribes to.
+
+    with Progress("Installing mods", bytes_total=n, items_total=len(files)) as progress:
+        for f in files:
+            ...
+            progress.update(f.stat().st_size, items=1)
+
+Every event is a dict:
+    {
+        "label": str,
+        "bytes_done": int,
+        "bytes_total": int|None,
+        "items_done": int,
+        "items_total": int|None,
+        "rate": float,           # bytes/sec since the operation started
+        "eta": float|None,       # seconds remaining, None if no total is known
+        "latency": float|None,   # transfers: seconds waiting on the server (final event)
+        "done": bool,
+        "ok": bool,
+    }
+Intermediate events are throttled to one per `interval` seconds per operation;
+the final event is always sent.
+"""
+from __future__ import annotations
+from typing import Callable, List
+import threading
+import time
+
+_subscribers: List[Callable[[dict], None]] = []
+_lock = threading.Lock()
+
+
+def subscribe(callback: Callable[[dict], None]) -> Callable[[], None]:
+    """Receive every progress event (from any thread). Returns a function that unsubscribes."""
+    with _lock:
+        _subscribers.append(callback)
+
+    def unsubscribe():
+        with _lock:
+            if callback in _subscribers:
+                _subscribers.remove(callback)
+    return unsubscribe
+
+
+def publish(event: dict):
+    with _lock:
+        subscribers = list(_subscribers)
+    for callback in subscribers:
+        callback(event)
+
+
+class Progress:
+    """
+    One operation's progress. Events go to `callback` when one is given
+    (e.g. TmpFilesClient(on_progress=...)), otherwise to the bus.
+    Usable as a context manager: the final event is sent on exit, ok=False on an exception.
+    """
+
+    def __init__(
+        self,
+        label: str,
+        bytes_total: int | None = None,
+        items_total: int | None = None,
+        callback: Callable[[dict], None] | None = None,
+        interval: float = 0.25,
+    ):
+        self.label = label
+        self.bytes_total = bytes_total
+        self.items_total = items_total
+        self.callback = callback or publish
+        self.interval = interval
+        self.bytes_done = 0
+        self.items_done = 0
+        self.started = time.perf_counter()
+        self.last_io = self.started
+        self._last_emit = 0.0
+        self._finished = False
+
+    def __enter__(self) -> "Progress":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._finished:
+            self.done(ok=exc_type is None)
+        return False
+
+    def update(self, nbytes: int = 0, items: int = 0):
+        self.bytes_done += nbytes
+        self.items_done += items
+        self.last_io = time.perf_counter()
+        if self.last_io - self._last_emit >= self.interval:
+            self._last_emit = self.last_io
+            self.callback(self._event())
+
+    def elapsed(self) -> float:
+        return max(time.perf_counter() - self.started, 1e-9)
+
+    def rate(self) -> float:
+        return self.bytes_done / self.elapsed()
+
+    def eta(self) -> float | None:
+        if self.bytes_total and self.bytes_done:
+            return max(self.bytes_total - self.bytes_done, 0) / self.rate()
+        if self.items_total and self.items_done:
+            return max(self.items_total - self.items_done, 0) * self.elapsed() / self.items_done
+        return None
+
+    def done(self, latency: float | None = None, ok: bool = True):
+        self._finished = True
+        self.callback(self._event(done=True, ok=ok, latency=latency))
+
+    def _event(self, done: bool = False, ok: bool = True, latency: float | None = None) -> dict:
+        return {
+            "label": self.label,
+            "bytes_done": self.bytes_done,
+            "bytes_total": self.bytes_total,
+            "items_done": self.items_done,
+            "items_total": self.items_total,
+            "rate": self.rate(),
+            "eta": self.eta(),
+            "latency": latency,
+            "done": done,
+            "ok": ok,
+        }
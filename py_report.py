@@ -1,39 +1,52 @@
 from py_imports import *
+from py_templedger import temp_ledger
+from py_spans import span
+from py_progress import Progress
+from py_copy import copy_file, copy_files, format_strategies
 import hashlib
 import shutil
-from typing import Callable
 from colorama import Fore
 
-def _md5_of_file(p: Path, chunk_size: int = 8192) -> str:
-    h = hashlib.md5()
+# Digest used to compare archive files against the profile (also computed while streaming an import, see py_streamzip).
+# It also names py_modstore blobs, where MD5's cheap collisions would let a crafted jar stand in for another.
+DIFF_HASH = "sha1"
+
+def _digest_of_file(p: Path, chunk_size: int = 8192, progress: Progress | None = None) -> str:
+    h = hashlib.new(DIFF_HASH)
     with p.open("rb") as fh:
         for chunk in iter(lambda: fh.read(chunk_size), b""):
             h.update(chunk)
+            if progress:
+                progress.update(len(chunk))
     return h.hexdigest()
 
-def review_and_install(
-    extracted_path: Path,
-    chosen_mod_manager: dict,
-    chosen_mod_profile: dict,
-    get_consent,
-    set_operation_text,
-) -> bool:
+def profile_mods_dir(chosen_mod_manager: dict, chosen_mod_profile: dict) -> Path:
+    return chosen_mod_manager["profiles_path"] / chosen_mod_profile["folder"] / "mods"
 
-    # Resolve profile mods directory
-    try:
-        profile_folder_name = chosen_mod_profile["folder"]
-        profile_root = chosen_mod_manager["profiles_path"] / profile_folder_name
-        profile_mods_dir = profile_root / "mods"
-    except Exception:
-        set_operation_text(Fore.RED + "Unable to resolve profile mods directory.")
-        return True
-
-    if not profile_mods_dir.exists():
-        set_operation_text(Fore.RED + f"Mods folder not found: {profile_mods_dir}")
-        return True
-
-    extracted_files = [p for p in Path(extracted_path).rglob("*") if p.is_file()]
-    profile_files = [p for p in profile_mods_dir.iterdir() if p.is_file()]
+def diff_profile(
+    extracted_path: Path,
+    mods_dir: Path,
+    extracted_digests: dict[Path, str] | None = None,
+    hash_cache=None,
+    extracted_files: list[Path] | None = None,
+) -> dict:
+    """
+    Compare the extracted archive against a profile's mods folder, by file name then digest:
+    {
+        "identical": [...], "differing": [...],
+        "only_in_extracted": [...], "only_in_profile": [...],   # file names
+        "extracted_files": [Path, ...], "profile_files": [Path, ...],
+        "extracted_digests": {Path: digest},   # the archive files hashed so far
+    }
+    Archive files hashed here are added to extracted_digests, and extracted_files can be
+    passed back in from an earlier diff, so one archive diffed against several profiles
+    is scanned and hashed once.
+    """
+    with span("report.diff.scan") as s:
+        if extracted_files is None:
+            extracted_files = [p for p in Path(extracted_path).rglob("*") if p.is_file()]
+        profile_files = [p for p in Path(mods_dir).iterdir() if p.is_file()]
+        s.add(items=len(extracted_files) + len(profile_files))
 
     # Build name maps
     def build_map(files):
@@ -47,52 +60,205 @@ def review_and_install(
 
     identical, differing, only_in_extracted, only_in_profile = [], [], [], []
 
-    # Compare MD5s
-    for name, ex_list in extracted_map.items():
-        prof_list = profile_map.get(name)
-        if not prof_list:
-            only_in_extracted.append(name)
-            continue
+    extracted_digests = {} if extracted_digests is None else extracted_digests
 
-        matched = False
-        for ex in ex_list:
-            ex_md5 = _md5_of_file(ex)
-            for pf in prof_list:
-                if ex_md5 == _md5_of_file(pf):
-                    identical.append(name)
-                    matched = True
+    def profile_digest(pf: Path, st: os.stat_result) -> str:
+        # A digest from an earlier run (or kept current by watch mode), if the file is unchanged
+        if hash_cache:
+            return hash_cache.digest(pf, st)
+        return _digest_of_file(pf, progress=progress)
+
+    # Compare digests (taken from the streaming extraction / hash cache when available)
+    # span bytes = archive-side bytes hashed here because no streamed digest was available
+    # progress: names compared, bytes hashed on the archive side
+    with span("report.diff.compare") as s, Progress("Comparing mods", items_total=len(extracted_map)) as progress:
+        for name, ex_list in extracted_map.items():
+            progress.update(items=1)
+            prof_list = profile_map.get(name)
+            if not prof_list:
+                only_in_extracted.append(name)
+                continue
+
+            matched = False
+            s.add(items=1)
+            for ex in ex_list:
+                ex_size = ex.stat().st_size
+                ex_digest = None
+                for pf in prof_list:
+                    pf_stat = pf.stat()
+                    # Different sizes can't be identical: no need to hash either file
+                    if pf_stat.st_size != ex_size:
+                        continue
+                    if ex_digest is None:
+                        ex_digest = extracted_digests.get(ex)
+                        if ex_digest is None:
+                            ex_digest = extracted_digests[ex] = _digest_of_file(ex, progress=progress)
+                            s.add(bytes=ex_size)
+                    if ex_digest == profile_digest(pf, pf_stat):
+                        identical.append(name)
+                        matched = True
+                        break
+                if matched:
                     break
-            if matched:
-                break
-        if not matched:
-            differing.append(name)
+            if not matched:
+                differing.append(name)
 
     for name in profile_map.keys():
         if name not in extracted_map:
             only_in_profile.append(name)
 
-    # Print report
+    if hash_cache:
+        hash_cache.save()
 
+    return {
+        "identical": identical,
+        "differing": differing,
+        "only_in_extracted": only_in_extracted,
+        "only_in_profile": only_in_profile,
+        "extracted_files": extracted_files,
+        "profile_files": profile_files,
+        "extracted_digests": extracted_digests,
+    }
+
+def _same_volume(a: Path, b: Path) -> bool:
+    try:
+        return a.stat().st_dev == b.stat().st_dev
+    except OSError:
+        return False
+
+def _hard_link(existing: Path, dest: Path) -> bool:
+    # False when the filesystem can't, or an earlier same-named file is already in the way
+    try:
+        os.link(existing, dest)
+        return True
+    except OSError:
+        return False
+
+def install_mods(
+    extracted_files: list[Path],
+    profile_files: list[Path],
+    mods_dir: Path,
+    link_from: Path | None = None,
+    mod_store=None,
+    extracted_digests: dict[Path, str] | None = None,
+    strategies: dict | None = None,
+) -> Path:
+    """
+    Back the profile's current mods up to %TEMP%/ModGnizer/backup_<ts>, wipe them, copy the archive's in. Returns the backup folder.
+    link_from: a mods folder the same archive was just installed into; on the same volume its files are hard-linked instead of copied.
+    mod_store: a py_modstore.ModStore; on the profile's volume, files are linked from it instead (extracted_digests save hashing them).
+    strategies: filled with how the files got there (see py_copy), {"backup": {strategy: files}, "install": {...}}.
+    Files are copied concurrently by py_copy.copy_files.
+    """
+    short_ts = datetime.now().strftime("%Y%m%d%H%M%S")
+    backup_root = Path(shutil.os.environ.get("TEMP", Path.home() / "AppData/Local/Temp")) / "ModGnizer" / f"backup_{short_ts}"
+    # Several profiles installed within the same second each need their own backup
+    suffix = 1
+    while backup_root.exists():
+        backup_root = backup_root.with_name(f"backup_{short_ts}_{suffix}")
+        suffix += 1
+    backup_root.mkdir(parents=True, exist_ok=True)
+    strategies = {} if strategies is None else strategies
+
+    # Backup existing mods; the originals are deleted next, so a hard link is as good as a copy
+    sizes = [f.stat().st_size for f in profile_files]
+    with span("report.install.backup") as s, Progress("Backing up mods", sum(sizes), len(profile_files)) as progress:
+        used = copy_files(
+            ((f, backup_root / f.name) for f in profile_files),
+            allow_link=True,
+            on_done=lambda src, dest, size: progress.update(size, items=1),
+        )
+        temp_ledger().add(backup_root, progress.bytes_done)
+        s.add(bytes=progress.bytes_done, items=progress.items_done)
+        s.set(strategies=dict(used))
+    strategies["backup"] = dict(used)
+
+    # Wipe mods folder
+    for f in profile_files:
+        f.unlink()
+
+    # Install all extracted files
+    sizes = [src.stat().st_size for src in extracted_files]
+    storing = mod_store is not None and mod_store.can_link(mods_dir)
+    linking = not storing and link_from is not None and _same_volume(link_from, mods_dir)
+    extracted_digests = extracted_digests or {}
+
+    def place(src: Path, dest: Path) -> str:
+        if storing:
+            return mod_store.install(src, dest, extracted_digests.get(src))
+        if linking and _hard_link(link_from / src.name, dest):
+            return "link"
+        return copy_file(src, dest)
+
+    with span("report.install.copy", store=storing) as s, Progress("Installing mods", sum(sizes), len(extracted_files)) as progress:
+        used = copy_files(
+            ((src, mods_dir / src.name) for src in extracted_files),
+            copy=place,
+            on_done=lambda src, dest, size: progress.update(size, items=1),
+        )
+        s.add(bytes=progress.bytes_done, items=progress.items_done)
+        s.set(strategies=dict(used))
+    strategies["install"] = dict(used)
+
+    return backup_root
+
+def print_strategies(strategies: dict):
+    # How install_mods moved the bytes, e.g. "Backup: 212 link   Install: 200 copy_file_range, 12 link"
+    parts = [f"{step.capitalize()}: {format_strategies(used)}" for step, used in strategies.items() if used]
+    if parts:
+        print(Fore.LIGHTBLACK_EX + "   ".join(parts))
+
+def count_mismatches(diff: dict) -> int:
+    return len(diff["differing"]) + len(diff["only_in_extracted"]) + len(diff["only_in_profile"])
+
+def print_diff(diff: dict):
     def print_section(title_color, title, items):
         print(title_color + f"{title} ({len(items)}):")
         for item in items:
             print(Fore.LIGHTBLACK_EX + f"  - {item}")
         print()  # blank line after each section
 
-    if identical:
-        print_section(Fore.GREEN, "Identical", identical)
+    if diff["identical"]:
+        print_section(Fore.GREEN, "Identical", diff["identical"])
+
+    if diff["differing"]:
+        print_section(Fore.YELLOW, "Differing", diff["differing"])
+
+    if diff["only_in_extracted"]:
+        print_section(Fore.CYAN, "New (in archive only)", diff["only_in_extracted"])
+
+    if diff["only_in_profile"]:
+        print_section(Fore.MAGENTA, "Removed (in profile only)", diff["only_in_profile"])
+
+def review_and_install(
+    extracted_path: Path,
+    chosen_mod_manager: dict,
+    chosen_mod_profile: dict,
+    get_consent,
+    set_operation_text,
+    extracted_digests: dict[Path, str] | None = None,
+    hash_cache=None,
+    mod_store=None,
+) -> bool:
+
+    # Resolve profile mods directory
+    try:
+        mods_dir = profile_mods_dir(chosen_mod_manager, chosen_mod_profile)
+    except Exception:
+        set_operation_text(Fore.RED + "Unable to resolve profile mods directory.")
+        return True
 
-    if differing:
-        print_section(Fore.YELLOW, "Differing", differing)
+    if not mods_dir.exists():
+        set_operation_text(Fore.RED + f"Mods folder not found: {mods_dir}")
+        return True
 
-    if only_in_extracted:
-        print_section(Fore.CYAN, "New (in archive only)", only_in_extracted)
+    diff = diff_profile(extracted_path, mods_dir, extracted_digests, hash_cache)
 
-    if only_in_profile:
-        print_section(Fore.MAGENTA, "Removed (in profile only)", only_in_profile)
+    # Print report
+    print_diff(diff)
 
     # Determine if ANY mismatch exists
-    mismatches = len(differing) + len(only_in_extracted) + len(only_in_profile)
+    mismatches = count_mismatches(diff)
 
     if mismatches == 0:
         print(Fore.GREEN + "\nNo differences detected. Nothing to install.")
@@ -113,28 +279,97 @@ def review_and_install(
         return True
 
     # Backup + wipe + install
-    short_ts = datetime.now().strftime("%Y%m%d%H%M%S")
-    backup_root = Path(shutil.os.environ.get("TEMP", Path.home() / "AppData/Local/Temp")) / "ModGnizer" / f"backup_{short_ts}"
-    backup_root.mkdir(parents=True, exist_ok=True)
-
     try:
-        # Backup existing mods
-        for f in profile_files:
-            shutil.copy2(f, backup_root / f.name)
-
-        # Wipe mods folder
-        for f in profile_files:
-            f.unlink()
-
-        # Install all extracted files
-        for src in extracted_files:
-            dest = profile_mods_dir / src.name
-            shutil.copy2(src, dest)
+        strategies = {}
+        backup_root = install_mods(diff["extracted_files"], diff["profile_files"], mods_dir, mod_store=mod_store, extracted_digests=diff["extracted_digests"], strategies=strategies)
 
         set_operation_text(f"Installed fresh modlist. Backup saved to: {backup_root}")
         print(Fore.GREEN + f"\nInstallation complete. Backup saved to: {backup_root}")
+        print_strategies(strategies)
         return True
 
     except Exception as e:
         set_operation_text(Fore.RED + f"Installation failed: {e}")
         return True
+
+def review_and_install_many(
+    extracted_path: Path,
+    chosen_mod_manager: dict,
+    chosen_mod_profiles: list[dict],
+    get_consent,
+    set_operation_text,
+    extracted_digests: dict[Path, str] | None = None,
+    hash_cache=None,
+    mod_store=None,
+) -> bool:
+    """
+    review_and_install for several profiles of one launcher from a single extraction:
+    the archive is scanned and hashed once, each profile is diffed against it, one
+    confirmation covers every profile that differs, and profiles after the first get
+    the archive's files hard-linked from the previous one when on the same volume
+    (or, with a mod_store, all of them from the store).
+    """
+    extracted_digests = {} if extracted_digests is None else extracted_digests
+    extracted_files = None
+    targets = []
+
+    for profile in chosen_mod_profiles:
+        label = f"{profile['name']} ({profile['folder']})"
+        print(Fore.WHITE + f"\n== {label} ==")
+        try:
+            mods_dir = profile_mods_dir(chosen_mod_manager, profile)
+        except Exception:
+            print(Fore.RED + "Unable to resolve profile mods directory: skipped.")
+            continue
+        if not mods_dir.exists():
+            print(Fore.RED + f"Mods folder not found: {mods_dir}: skipped.")
+            continue
+
+        diff = diff_profile(extracted_path, mods_dir, extracted_digests, hash_cache, extracted_files)
+        extracted_files = diff["extracted_files"]
+
+        mismatches = count_mismatches(diff)
+        if not mismatches:
+            print(Fore.GREEN + f"No differences ({len(diff['identical'])} identical).")
+            continue
+        print_diff(diff)
+        print(Fore.YELLOW + f"{mismatches} mismatched or new files.")
+        targets.append((label, mods_dir, diff))
+
+    if not targets:
+        set_operation_text("No changes detected in the selected profiles.")
+        return True
+
+    print(Fore.YELLOW + f"\n{len(targets)} of {len(chosen_mod_profiles)} profile(s) need changes: " + ", ".join(t[0] for t in targets))
+
+    # First confirmation
+    if not get_consent(Fore.YELLOW + f"Proceed with installation into {len(targets)} profile(s) (this will replace their mods)"):
+        set_operation_text("Installation cancelled.")
+        return True
+
+    # Second confirmation (opposite wording)
+    print("\n" + Fore.RED + f"WARNING: This will DELETE ALL existing mods in {len(targets)} profile(s).")
+    if not get_consent(Fore.RED + "Are you absolutely sure you want to continue"):
+        set_operation_text("Installation cancelled at final confirmation.")
+        return True
+
+    # Backup + wipe + install, one profile at a time
+    installed, failed = [], []
+    link_from = None
+    for label, mods_dir, diff in targets:
+        try:
+            strategies = {}
+            backup_root = install_mods(diff["extracted_files"], diff["profile_files"], mods_dir, link_from, mod_store, diff["extracted_digests"], strategies)
+            link_from = mods_dir
+            installed.append(label)
+            print(Fore.GREEN + f"Installed into {label}. Backup saved to: {backup_root}")
+            print_strategies(strategies)
+        except Exception as e:
+            failed.append(label)
+            print(Fore.RED + f"Installation into {label} failed: {e}")
+
+    if failed:
+        set_operation_text(Fore.RED + f"Installed into {len(installed)} profile(s); failed: {', '.join(failed)}")
+    else:
+        set_operation_text(f"Installed fresh modlist into {len(installed)} profile(s). Backups saved to %TEMP%/ModGnizer.")
+    return True
@@ -0,0 +1,272 @@
+# py_spans.py
+"""
+Lightweight timing spans for the pipeline stages.
+
+    from py_spans import span, traced
+
+    with span("archive.extract", archive=path.name) as s:
+        ...
+        s.add(bytes=n, items=count)
+
+    @traced("undbj.scan")
+    def scan(...): ...
+
+Disabled by default: span() then hands back a shared no-op object and traced
+functions are called straight through, so instrumented code costs one global
+lookup per stage. Turned on by enable(), by `--profile-out PATH` on the CLI
+(placed before the command; `--profile` picks a mod manager profile instead), or
+for any run by setting MODGNIZER_PROFILE=<path.json> (MODGNIZER_CPROFILE=1, or
+`--cprofile` on the CLI, adds a cProfile of the same run, written next to it as
+<path>.prof).
+
+Each span records its duration, parent span, thread, the bytes / item counts the
+stage reports, and the modules first imported while it was open, so a slow
+lazy import shows up under the stage that triggered it.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List
+from py_imports import *
+import atexit
+import functools
+import json
+import threading
+import time
+
+ENV_PROFILE = "MODGNIZER_PROFILE"
+ENV_CPROFILE = "MODGNIZER_CPROFILE"
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, bytes: int = 0, items: int = 0):
+        pass
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL = _NullSpan()
+
+
+class Span:
+    __slots__ = ("recorder", "id", "name", "parent", "thread", "start", "duration", "bytes", "items", "attrs", "imports", "error", "_modules")
+
+    def __init__(self, recorder: "_Recorder", name: str, attrs: Dict[str, Any]):
+        self.recorder = recorder
+        self.name = name
+        self.attrs = attrs
+        self.bytes = 0
+        self.items = 0
+        self.imports: List[str] = []
+        self.error = None
+        self.duration = None
+
+    def __enter__(self) -> "Span":
+        self.recorder.open(self)
+        self._modules = set(sys.modules)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if len(sys.modules) != len(self._modules):
+            self.imports = sorted(set(sys.modules) - self._modules)
+        self._modules = None
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        self.recorder.close(self)
+        return False
+
+    def add(self, bytes: int = 0, items: int = 0):
+        """Count work done by this stage (accumulates)."""
+        self.bytes += bytes
+        self.items += items
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {
+            "id": self.id,
+            "name": self.name,
+            "parent": self.parent,
+            "thread": self.thread,
+            "start": round(self.start - self.recorder.t0, 6),
+            "duration": round(self.duration, 6) if self.duration is not None else None,
+            "bytes": self.bytes,
+            "items": self.items,
+        }
+        if self.attrs:
+            out["attrs"] = self.attrs
+        if self.imports:
+            out["imports"] = self.imports
+        if self.error:
+            out["error"] = self.error
+        return out
+
+
+class _Recorder:
+    def __init__(self, path: Path | None, cprofile: bool):
+        self.path = Path(path) if path else None
+        self.t0 = time.perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._next_id = 0
+        self.profiler = None
+        if cprofile:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def open(self, s: Span):
+        stack = self._stack()
+        s.parent = stack[-1].id if stack else None
+        s.thread = threading.current_thread().name
+        with self._lock:
+            s.id = self._next_id
+            self._next_id += 1
+            self.spans.append(s)
+        stack.append(s)
+
+    def close(self, s: Span):
+        stack = self._stack()
+        if stack and stack[-1] is s:
+            stack.pop()
+        elif s in stack:
+            stack.remove(s)
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+_recorder: _Recorder | None = None
+
+
+# -------------------------
+# PUBLIC API
+# -------------------------
+
+def span(name: str, **attrs):
+    """Context manager timing one stage; a no-op unless spans are enabled."""
+    recorder = _recorder
+    if recorder is None:
+        return _NULL
+    return Span(recorder, name, attrs)
+
+
+def traced(name: str | None = None):
+    """Decorator: run the function inside span(name) (default: module.qualname)."""
+    def decorate(fn: Callable):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _recorder is None:
+                return fn(*args, **kwargs)
+            with Span(_recorder, label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record(name: str, duration: float, bytes: int = 0, items: int = 0, **attrs):
+    """Add a stage that measured itself (e.g. a transfer's TransferProgress), ending now."""
+    recorder = _recorder
+    if recorder is None:
+        return
+    s = Span(recorder, name, attrs)
+    s.add(bytes=bytes, items=items)
+    recorder.open(s)
+    recorder.close(s)
+    s.start = time.perf_counter() - duration
+    s.duration = duration
+
+
+def enabled() -> bool:
+    return _recorder is not None
+
+
+def enable(path: Path | str | None = None, cprofile: bool = False):
+    """Start recording. With a path, the report is written there when the process exits (or on export())."""
+    global _recorder
+    if _recorder is not None:
+        return
+    _recorder = _Recorder(path, cprofile)
+    if path:
+        atexit.register(export)
+
+
+def enable_from_env():
+    """Honour MODGNIZER_PROFILE / MODGNIZER_CPROFILE (called once at startup)."""
+    path = os.environ.get(ENV_PROFILE, "").strip()
+    if path:
+        enable(path, cprofile=os.environ.get(ENV_CPROFILE, "") not in ("", "0"))
+
+
+def report() -> Dict[str, Any]:
+    """
+    {
+        "spans": [ {id, name, parent, thread, start, duration, bytes, items, attrs?, imports?, error?}, ... ],
+        "stages": { name: {"count", "total", "max", "bytes", "items"} },   # slowest total first
+    }
+    """
+    recorder = _recorder
+    if recorder is None:
+        return {"spans": [], "stages": {}}
+    with recorder._lock:
+        spans = list(recorder.spans)
+
+    stages: Dict[str, Dict[str, Any]] = {}
+    for s in spans:
+        if s.duration is None:
+            continue
+        stage = stages.setdefault(s.name, {"count": 0, "total": 0.0, "max": 0.0, "bytes": 0, "items": 0})
+        stage["count"] += 1
+        stage["total"] += s.duration
+        stage["max"] = max(stage["max"], s.duration)
+        stage["bytes"] += s.bytes
+        stage["items"] += s.items
+    for stage in stages.values():
+        stage["total"] = round(stage["total"], 6)
+        stage["max"] = round(stage["max"], 6)
+
+    return {
+        "spans": [s.to_dict() for s in spans],
+        "stages": dict(sorted(stages.items(), key=lambda kv: kv[1]["total"], reverse=True)),
+    }
+
+
+def export(path: Path | str | None = None) -> Path | None:
+    """Write report() as JSON (and the cProfile stats as <path>.prof). Returns the JSON path."""
+    recorder = _recorder
+    if recorder is None:
+        return None
+    path = Path(path) if path else recorder.path
+    if path is None:
+        return None
+
+    data = report()
+    if recorder.profiler is not None:
+        recorder.profiler.disable()
+        prof_path = path.with_suffix(".prof")
+        recorder.profiler.dump_stats(str(prof_path))
+        data["cprofile"] = str(prof_path)
+        recorder.profiler.enable()
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, indent=2, default=str), encoding="utf-8")
+    except OSError:
+        return None
+    return path
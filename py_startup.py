@@ -0,0 +1,115 @@
+# py_startup.py
+"""
+Startup profiling for ModGnizer.
+
+Imports py_main in a fresh interpreter under `python -X importtime` (py_main only
+builds the App under `__main__`, so nothing interactive runs) and reports where the
+import time goes, per module:
+
+    python py_startup.py                 # slowest modules by cumulative import time
+    python py_startup.py --top 40
+    python py_startup.py --check         # exit 1 if the startup budget is exceeded
+
+--check fails when importing py_main takes longer than --budget ms (median of --runs
+runs), or when any module in DEFERRED was imported at startup; those must stay
+lazy (imported on first use) so they aren't on the path to the first menu.
+
+For time-to-first-menu of a real run (including the packaged exe), set
+MODGNIZER_PROFILE_STARTUP=1: the main menu then shows the startup time.
+"""
+from __future__ import annotations
+from py_imports import *
+import argparse
+import statistics
+import subprocess
+
+DEFAULT_BUDGET_MS = 250
+DEFERRED = ("PyQt5", "requests", "send2trash", "sqlite3", "py_tmpfiles", "py_storage", "py_undbj", "py_watch")
+
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$")
+
+
+def profile_imports(module: str = "py_main") -> dict:
+    """
+    Import `module` in a child interpreter and return
+        {"total_ms": float, "modules": {name: (self_ms, cumulative_ms, depth)}}
+    Raises RuntimeError with the child's stderr if the import fails.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).resolve().parent,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(line for line in proc.stderr.splitlines() if not line.startswith("import time:"))
+        raise RuntimeError(f"Importing {module} failed:\n{tail}")
+
+    modules = {}
+    total_ms = 0.0
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME.match(line)
+        if not m:
+            continue
+        self_us, cumulative_us, indent, name = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+        depth = (len(indent) - 1) // 2
+        modules[name] = (self_us / 1000, cumulative_us / 1000, depth)
+        if name == module:
+            total_ms = cumulative_us / 1000
+    return {"total_ms": total_ms, "modules": modules}
+
+
+def deferred_imported(modules: dict) -> list[str]:
+    """Names in DEFERRED that were imported (as a package or any submodule of it)."""
+    loaded = set()
+    for name in modules:
+        root = name.split(".")[0]
+        if root in DEFERRED:
+            loaded.add(root)
+    return sorted(loaded)
+
+
+def _report(result: dict, top: int):
+    print(f"import py_main: {result['total_ms']:.1f} ms\n")
+    print(f"{'cumulative':>11} {'self':>9}  module")
+    ranked = sorted(result["modules"].items(), key=lambda kv: kv[1][1], reverse=True)
+    for name, (self_ms, cumulative_ms, depth) in ranked[:top]:
+        print(f"{cumulative_ms:>8.1f} ms {self_ms:>6.1f} ms  {'  ' * depth}{name}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Profile ModGnizer's startup imports.")
+    parser.add_argument("--top", type=int, default=25, help="modules to list")
+    parser.add_argument("--check", action="store_true", help="enforce the startup budget")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_MS, help="import budget in ms for --check")
+    parser.add_argument("--runs", type=int, default=3, help="runs to take the median of for --check")
+    args = parser.parse_args(argv)
+
+    try:
+        if not args.check:
+            _report(profile_imports(), args.top)
+            return 0
+        results = [profile_imports() for _ in range(max(1, args.runs))]
+    except RuntimeError as e:
+        print(e)
+        return 2
+
+    median_ms = statistics.median(r["total_ms"] for r in results)
+    loaded = deferred_imported(results[-1]["modules"])
+
+    ok = True
+    print(f"import py_main: {median_ms:.1f} ms (median of {len(results)}, budget {args.budget:.0f} ms)")
+    if median_ms > args.budget:
+        ok = False
+        print(f"FAIL: over budget by {median_ms - args.budget:.1f} ms")
+        _report(results[-1], args.top)
+    if loaded:
+        ok = False
+        print(f"FAIL: imported at startup, should be deferred: {', '.join(loaded)}")
+    if ok:
+        print("OK")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,448 @@
+# py_storage.py
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterator
+from urllib.parse import urlparse, quote, unquote
+from urllib.request import url2pathname
+from py_imports import *
+from py_transfer import TransferProgress
+import shutil
+import time
+import uuid
+import requests
+
+
+class StorageError(Exception):
+    """Raised for upload/download errors on any storage backend."""
+
+
+class StorageIntegrityError(StorageError):
+    """Raised when downloaded bytes don't match the size/digest carried in the manifest."""
+
+
+class StorageTransientError(StorageError):
+    """Raised for failures worth retrying: network errors, HTTP 429 and 5xx."""
+
+
+class _MultipartStream:
+    """
+    A single-file multipart/form-data body that is read in small pieces,
+    so requests streams it instead of encoding the whole part in memory.
+    Every read of file bytes is reported to `progress`.
+    """
+
+    def __init__(self, field: str, filename: str, reader, size: int, progress: TransferProgress | None = None):
+        boundary = uuid.uuid4().hex
+        safe_name = filename.replace('"', "%22")
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        self._segments = [
+            (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="{field}"; filename="{safe_name}"\r\n'
+                "Content-Type: application/octet-stream\r\n\r\n"
+            ).encode("utf-8"),
+            reader,
+            f"\r\n--{boundary}--\r\n".encode("utf-8"),
+        ]
+        self.len = len(self._segments[0]) + size + len(self._segments[2])
+        self._progress = progress
+        self._offset = 0  # position inside the current bytes segment
+
+    def __len__(self) -> int:
+        return self.len
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(1024 * 1024)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, size: int = -1) -> bytes:
+        out = b""
+        while self._segments and (size < 0 or len(out) < size):
+            want = -1 if size < 0 else size - len(out)
+            seg = self._segments[0]
+            if isinstance(seg, bytes):
+                end = len(seg) if want < 0 else self._offset + want
+                piece = seg[self._offset:end]
+                self._offset += len(piece)
+                if self._offset >= len(seg):
+                    self._segments.pop(0)
+                    self._offset = 0
+            else:
+                piece = seg.read(want)
+                if not piece:
+                    self._segments.pop(0)
+                    continue
+                if self._progress:
+                    self._progress.update(len(piece))
+            out += piece
+        return out
+
+
+class _ProgressReader:
+    """Raw file body (HTTP PUT, local copy) that reports every read to `progress`."""
+
+    def __init__(self, reader, size: int, progress: TransferProgress | None = None):
+        self._reader = reader
+        self.len = size
+        self._progress = progress
+
+    def __len__(self) -> int:
+        return self.len
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(1024 * 1024)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._reader.read(size)
+        if data and self._progress:
+            self._progress.update(len(data))
+        return data
+
+
+class DownloadStream:
+    """
+    An open download: `length` (bytes, None if unknown), `latency` (seconds to
+    first response) and chunks(). Use as a context manager.
+    """
+
+    def __init__(self, chunks: Iterator[bytes], length: int | None, latency: float | None, close: Callable[[], None]):
+        self._chunks = chunks
+        self.length = length
+        self.latency = latency
+        self._close = close
+
+    def chunks(self) -> Iterator[bytes]:
+        return self._chunks
+
+    def close(self):
+        self._close()
+
+    def __enter__(self) -> "DownloadStream":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StorageBackend(ABC):
+    """
+    Where share parts live. A backend moves one file per call; splitting,
+    hashing, caching and manifests stay in TmpFilesClient.
+
+    Subclasses implement:
+        upload(file_path, reader, size, progress) -> (link, payload)
+        open_download(link, offset=0) -> DownloadStream
+        handles(link) -> bool
+    and may override direct_url()/filename(). `ttl` is how long an upload stays
+    available in seconds and `max_part_size` the largest single upload
+    (None = no limit for either).
+    """
+
+    name = "base"
+    label = "Storage"
+    ttl: int | None = None
+    max_part_size: int | None = None
+    IO_CHUNK = 1024 * 1024
+
+    @abstractmethod
+    def upload(self, file_path: Path, reader, size: int, progress: TransferProgress | None = None) -> tuple[str, Any]:
+        ...
+
+    @abstractmethod
+    def open_download(self, link: str, offset: int = 0) -> DownloadStream:
+        ...
+
+    @abstractmethod
+    def handles(self, link: str) -> bool:
+        ...
+
+    def read_range(self, link: str, start: int, length: int) -> bytes:
+        """Return `length` bytes starting at `start` (fewer at end of file)."""
+        out = bytearray()
+        with self.open_download(link, offset=start) as stream:
+            for chunk in stream.chunks():
+                out += chunk
+                if len(out) >= length:
+                    break
+        return bytes(out[:length])
+
+    def expires_at(self, uploaded_at: float | None = None) -> float | None:
+        if self.ttl is None:
+            return None
+        return (uploaded_at or time.time()) + self.ttl
+
+    def direct_url(self, link: str) -> str:
+        return link
+
+    def filename(self, link: str) -> str:
+        return Path(unquote(urlparse(self.direct_url(link)).path)).name
+
+
+class _HttpBackend(StorageBackend):
+    """Shared GET handling for HTTP backends."""
+
+    def __init__(self, base_url: str, timeout: int = 120, get_session: Callable[[], requests.Session] | None = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.headers: Dict[str, str] = {}
+        self._session = None if get_session else requests.Session()
+        self._get_session = get_session or (lambda: self._session)
+
+    @property
+    def session(self) -> requests.Session:
+        return self._get_session()
+
+    def handles(self, link: str) -> bool:
+        return urlparse(self.base_url).netloc in urlparse(link).netloc
+
+    def open_download(self, link: str, offset: int = 0) -> DownloadStream:
+        headers = dict(self.headers)
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        try:
+            resp = self.session.get(self.direct_url(link), stream=True, timeout=self.timeout, headers=headers)
+        except requests.RequestException as e:
+            raise StorageTransientError(f"Network error during download: {e}") from e
+
+        latency = resp.elapsed.total_seconds()
+        if not resp.ok:
+            error = self._http_error(resp, "download")
+            resp.close()
+            raise error
+
+        length = resp.headers.get("Content-Length")
+        length = int(length) if length and length.isdigit() else None
+        chunks = resp.iter_content(chunk_size=self.IO_CHUNK)
+
+        if offset and resp.status_code != 206:
+            # Server ignored the Range header: skip ahead ourselves
+            chunks = self._skip(chunks, offset)
+            length = length - offset if length is not None else None
+
+        return DownloadStream(self._guard(chunks), length, latency, resp.close)
+
+    @staticmethod
+    def _skip(chunks: Iterator[bytes], offset: int) -> Iterator[bytes]:
+        for chunk in chunks:
+            if offset >= len(chunk):
+                offset -= len(chunk)
+                continue
+            yield chunk[offset:]
+            offset = 0
+
+    @staticmethod
+    def _guard(chunks: Iterator[bytes]) -> Iterator[bytes]:
+        try:
+            for chunk in chunks:
+                if chunk:
+                    yield chunk
+        except requests.RequestException as e:
+            raise StorageTransientError(f"Network error during download: {e}") from e
+
+    @staticmethod
+    def _http_error(resp: requests.Response, action: str) -> StorageError:
+        error = StorageTransientError if resp.status_code == 429 or resp.status_code >= 500 else StorageError
+        return error(f"HTTP {resp.status_code} during {action}\n{resp.text[:500]}")
+
+
+class TmpFilesBackend(_HttpBackend):
+    """tmpfiles.org (or a compatible server such as py_tmpfiles_standin): multipart POST, /dl/ GET, 60 min TTL."""
+
+    name = "tmpfiles"
+    label = "tmpfiles.org (public, deleted after 60 minutes)"
+    BASE_URL = "https://tmpfiles.org"
+    ttl = 60 * 60
+    max_part_size = 90 * 1024 * 1024  # tmpfiles.org rejects uploads over 100 MB
+
+    def __init__(self, base_url: str | None = None, timeout: int = 120, get_session: Callable[[], requests.Session] | None = None):
+        super().__init__(base_url or self.BASE_URL, timeout, get_session)
+        self.upload_url = f"{self.base_url}/api/v1/upload"
+
+    def upload(self, file_path: Path, reader, size: int, progress: TransferProgress | None = None) -> tuple[str, Any]:
+        body = _MultipartStream("file", Path(file_path).name, reader, size, progress)
+        try:
+            resp = self.session.post(
+                self.upload_url,
+                data=body,
+                headers={"Content-Type": body.content_type},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            raise StorageTransientError(f"Network error during upload: {e}") from e
+
+        if not resp.ok:
+            raise self._http_error(resp, "upload")
+
+        try:
+            payload = resp.json()
+        except ValueError:
+            raise StorageError(
+                "Upload response was not JSON:\n"
+                f"{resp.text[:2000]}"
+            )
+
+        link = None
+        if isinstance(payload, dict):
+            data = payload.get("data")
+            if isinstance(data, dict) and "url" in data:
+                link = data["url"]
+            elif "url" in payload:
+                link = payload["url"]
+
+        if not link:
+            raise StorageError(f"Upload succeeded but no URL found: {payload}")
+        return link, payload
+
+    def direct_url(self, link: str) -> str:
+        """
+        Converts:
+        http(s)://tmpfiles.org/12345/file.rar
+        → https://tmpfiles.org/dl/12345/file.rar
+        """
+        base = urlparse(self.base_url)
+        if "/dl/" in link:
+            return link.replace("http://", "https://") if base.scheme == "https" else link
+
+        parsed = urlparse(link)
+        if base.netloc not in parsed.netloc:
+            raise StorageError(f"URL is not a {base.netloc} link.")
+
+        path = parsed.path.lstrip("/")
+        return f"{self.base_url}/dl/{path}"
+
+
+class HttpPutBackend(_HttpBackend):
+    """
+    Any HTTP server that accepts PUT and serves GET on the same URL
+    (nginx/Apache WebDAV, rclone serve, a NAS, ...). Uploads land at
+    <base_url>/<random id>/<file name>; nothing expires.
+    """
+
+    name = "http"
+    label = "HTTP server"
+    max_part_size = 512 * 1024 * 1024  # stay under common reverse-proxy body limits
+
+    def __init__(self, base_url: str, timeout: int = 120, get_session: Callable[[], requests.Session] | None = None, headers: Dict[str, str] | None = None):
+        super().__init__(base_url, timeout, get_session)
+        self.headers = dict(headers or {})
+        self.label = f"HTTP server ({self.base_url})"
+
+    def upload(self, file_path: Path, reader, size: int, progress: TransferProgress | None = None) -> tuple[str, Any]:
+        link = f"{self.base_url}/{uuid.uuid4().hex[:12]}/{quote(Path(file_path).name)}"
+        body = _ProgressReader(reader, size, progress)
+        try:
+            resp = self.session.put(
+                link,
+                data=body,
+                headers={"Content-Type": "application/octet-stream", **self.headers},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            raise StorageTransientError(f"Network error during upload: {e}") from e
+
+        if not resp.ok:
+            raise self._http_error(resp, "upload")
+        return link, {"status": resp.status_code}
+
+
+class LocalDirBackend(StorageBackend):
+    """
+    A directory, local or on a LAN share (e.g. \\\\nas\\modpacks). Links are file:// URIs,
+    so whoever imports the share needs the same path to be reachable.
+    """
+
+    name = "local"
+    label = "Local folder"
+
+    def __init__(self, root: Path | None = None):
+        self.root = Path(root) if root else None
+        if self.root:
+            self.label = f"Local folder ({self.root})"
+
+    def handles(self, link: str) -> bool:
+        return urlparse(link).scheme == "file"
+
+    def upload(self, file_path: Path, reader, size: int, progress: TransferProgress | None = None) -> tuple[str, Any]:
+        if not self.root:
+            raise StorageError("Local storage has no target directory configured.")
+
+        target = self.root / uuid.uuid4().hex[:12] / Path(file_path).name
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with target.open("wb") as out:
+                shutil.copyfileobj(_ProgressReader(reader, size, progress), out, self.IO_CHUNK)
+        except OSError as e:
+            raise StorageError(f"Failed writing to {target}: {e}") from e
+        return target.resolve().as_uri(), {"path": str(target)}
+
+    def open_download(self, link: str, offset: int = 0) -> DownloadStream:
+        path = self._path(link)
+        started = time.perf_counter()
+        try:
+            fh = path.open("rb")
+            size = os.fstat(fh.fileno()).st_size
+        except OSError as e:
+            raise StorageError(f"Cannot read {path}: {e}") from e
+
+        fh.seek(offset)
+        latency = time.perf_counter() - started
+        chunks = iter(lambda: fh.read(self.IO_CHUNK), b"")
+        return DownloadStream(chunks, max(size - offset, 0), latency, fh.close)
+
+    def filename(self, link: str) -> str:
+        return self._path(link).name
+
+    @staticmethod
+    def _path(link: str) -> Path:
+        parsed = urlparse(link)
+        # file://host/share/x is a UNC path; file:///C:/x a local one
+        path = f"//{parsed.netloc}{parsed.path}" if parsed.netloc else parsed.path
+        return Path(url2pathname(path))
+
+
+# -------------------------
+# SELECTION
+# -------------------------
+
+ENV_HTTP_URL = "MODGNIZER_HTTP_STORAGE"     # e.g. http://nas.lan:8080/modgnizer
+ENV_LOCAL_DIR = "MODGNIZER_LOCAL_STORAGE"   # e.g. \\nas\modpacks or D:\Shares\ModGnizer
+
+
+def available_backends(timeout: int = 120, get_session: Callable[[], requests.Session] | None = None) -> Dict[str, StorageBackend]:
+    """Backends a share can be uploaded to: tmpfiles.org always, plus any configured through the environment."""
+    backends: Dict[str, StorageBackend] = {"tmpfiles": TmpFilesBackend(timeout=timeout, get_session=get_session)}
+
+    http_url = os.environ.get(ENV_HTTP_URL, "").strip()
+    if http_url:
+        backends["http"] = HttpPutBackend(http_url, timeout=timeout, get_session=get_session)
+
+    local_dir = os.environ.get(ENV_LOCAL_DIR, "").strip()
+    if local_dir:
+        backends["local"] = LocalDirBackend(Path(os.path.expandvars(local_dir)))
+
+    return backends
+
+
+def backend_for_link(link: str, timeout: int = 120, get_session: Callable[[], requests.Session] | None = None, store: str | None = None) -> StorageBackend:
+    """
+    Pick the backend that can download `link` (file:// → local, tmpfiles.org → tmpfiles,
+    other http(s) → plain GET). `store` is the backend name from the share manifest;
+    it wins over the host, e.g. for a tmpfiles.org-compatible server on another address.
+    """
+    parsed = urlparse(link)
+    if parsed.scheme == "file":
+        return LocalDirBackend()
+    if "tmpfiles.org" in parsed.netloc:
+        return TmpFilesBackend(timeout=timeout, get_session=get_session)
+    if store == TmpFilesBackend.name and parsed.scheme in ("http", "https"):
+        return TmpFilesBackend(f"{parsed.scheme}://{parsed.netloc}", timeout=timeout, get_session=get_session)
+    if parsed.scheme in ("http", "https"):
+        return HttpPutBackend(f"{parsed.scheme}://{parsed.netloc}", timeout=timeout, get_session=get_session)
+    raise StorageError(f"Unsupported link: {link}")
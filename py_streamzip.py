@@ -0,0 +1,348 @@
+# py_streamzip.py
+from __future__ import annotations
+from typing import Dict
+from py_imports import *
+from py_report import DIFF_HASH
+from py_templedger import temp_ledger
+import hashlib
+import shutil
+import struct
+import threading
+import zlib
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_LOCAL_SIG = 0x04034B50
+_DESCRIPTOR_SIG = 0x08074B50
+_END_SIGS = (0x02014B50, 0x06054B50, 0x06064B50)  # central directory / (zip64) end record
+
+_FLAG_ENCRYPTED = 0x1
+_FLAG_DESCRIPTOR = 0x8
+_FLAG_UTF8 = 0x800
+
+_STORED, _DEFLATED = 0, 8
+
+
+class StreamZipError(Exception):
+    """The bytes fed so far can't be extracted front-to-back (encrypted, unsupported or damaged)."""
+
+
+class StreamingZipExtractor:
+    """
+    Extracts a ZIP archive from its bytes in file order, without the central directory.
+
+    feed() the archive as it arrives; each member is written under out_dir, CRC-checked
+    and hashed with py_report.DIFF_HASH as it's inflated, so the import diff doesn't
+    have to read it back. Only stored/deflated, unencrypted members are handled:
+    anything else raises StreamZipError and the caller falls back to zipfile.
+
+        extractor = StreamingZipExtractor(out_dir)
+        for chunk in chunks:
+            extractor.feed(chunk)
+        extractor.close()
+        extractor.digests  # {Path: hexdigest}
+    """
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = Path(out_dir)
+        self.digests: Dict[Path, str] = {}
+        self._buf = bytearray()
+        self._member: dict | None = None
+        self._finished = False
+
+    def feed(self, data: bytes):
+        if self._finished:
+            return
+        self._buf += data
+        while self._step():
+            pass
+
+    def close(self):
+        if not self._finished:
+            raise StreamZipError("Archive ended in the middle of a member.")
+
+    def abandon(self):
+        """Close the member being written, if any (after a failed or aborted stream)."""
+        if self._member and self._member["out"]:
+            self._member["out"].close()
+        self._member = None
+
+    # -------------------------
+    # PARSER
+    # -------------------------
+
+    def _step(self) -> bool:
+        """Consume as much of the buffer as possible; False when more bytes are needed."""
+        if self._finished:
+            return False
+        if self._member is None:
+            return self._read_header()
+        if self._member["descriptor"] == "pending":
+            return self._read_descriptor()
+        return self._read_data()
+
+    def _read_header(self) -> bool:
+        if len(self._buf) < 4:
+            return False
+        sig = struct.unpack_from("<I", self._buf)[0]
+        if sig in _END_SIGS:
+            self._finished = True
+            self._buf.clear()
+            return False
+        if sig != _LOCAL_SIG:
+            raise StreamZipError("Not a ZIP local file header.")
+        if len(self._buf) < _LOCAL_HEADER.size:
+            return False
+
+        _, _, flags, method, _, _, crc, csize, usize, name_len, extra_len = _LOCAL_HEADER.unpack_from(self._buf)
+        header_len = _LOCAL_HEADER.size + name_len + extra_len
+        if len(self._buf) < header_len:
+            return False
+
+        raw_name = bytes(self._buf[_LOCAL_HEADER.size:_LOCAL_HEADER.size + name_len])
+        extra = bytes(self._buf[_LOCAL_HEADER.size + name_len:header_len])
+        del self._buf[:header_len]
+
+        if flags & _FLAG_ENCRYPTED:
+            raise StreamZipError("Archive is encrypted.")
+        if method not in (_STORED, _DEFLATED):
+            raise StreamZipError(f"Unsupported compression method {method}.")
+
+        zip64 = csize == 0xFFFFFFFF or usize == 0xFFFFFFFF
+        if zip64:
+            usize, csize = self._zip64_sizes(extra, usize, csize)
+
+        descriptor = bool(flags & _FLAG_DESCRIPTOR)
+        if descriptor and method == _STORED:
+            # No way to find the end of a stored member without its size
+            raise StreamZipError("Stored member with trailing data descriptor.")
+
+        name = raw_name.decode("utf-8" if flags & _FLAG_UTF8 else "cp437")
+        target = self._target_for(name)
+
+        self._member = {
+            "target": target,
+            "method": method,
+            "crc": crc,
+            "usize": usize,
+            "remaining": None if descriptor else csize,
+            "descriptor": descriptor,
+            "zip64": zip64,
+            "inflater": zlib.decompressobj(-15) if method == _DEFLATED else None,
+            "hash": hashlib.new(DIFF_HASH),
+            "crc_now": 0,
+            "written": 0,
+            "out": None,
+        }
+        if target is not None and not name.endswith("/"):
+            target.parent.mkdir(parents=True, exist_ok=True)
+            self._member["out"] = target.open("wb")
+        elif target is not None:
+            target.mkdir(parents=True, exist_ok=True)
+        return True
+
+    def _read_data(self) -> bool:
+        m = self._member
+        if not self._buf and m["remaining"] != 0:
+            return False
+
+        if m["remaining"] is None:
+            # Size only known from the deflate stream itself
+            data = bytes(self._buf)
+            self._buf.clear()
+            self._write(m["inflater"].decompress(data))
+            if not m["inflater"].eof:
+                return False
+            self._buf[:0] = m["inflater"].unused_data
+            m["descriptor"] = "pending"
+            return True
+
+        take = min(m["remaining"], len(self._buf))
+        data = bytes(self._buf[:take])
+        del self._buf[:take]
+        m["remaining"] -= take
+        self._write(m["inflater"].decompress(data) if m["inflater"] else data)
+        if m["remaining"]:
+            return False
+
+        if m["inflater"]:
+            self._write(m["inflater"].flush())
+        self._finish_member(m["crc"], m["usize"])
+        return True
+
+    def _read_descriptor(self) -> bool:
+        m = self._member
+        size_len = 8 if m["zip64"] else 4
+        need = 4 + 2 * size_len
+        if len(self._buf) < 4:
+            return False
+        if struct.unpack_from("<I", self._buf)[0] == _DESCRIPTOR_SIG:
+            need += 4
+        if len(self._buf) < need:
+            return False
+
+        offset = need - (4 + 2 * size_len)
+        crc = struct.unpack_from("<I", self._buf, offset)[0]
+        usize = struct.unpack_from("<Q" if m["zip64"] else "<I", self._buf, offset + 4 + size_len)[0]
+        del self._buf[:need]
+        self._finish_member(crc, usize)
+        return True
+
+    # -------------------------
+    # HELPERS
+    # -------------------------
+
+    def _write(self, data: bytes):
+        if not data:
+            return
+        m = self._member
+        m["crc_now"] = zlib.crc32(data, m["crc_now"])
+        m["hash"].update(data)
+        m["written"] += len(data)
+        if m["out"]:
+            m["out"].write(data)
+
+    def _finish_member(self, crc: int, usize: int):
+        m = self._member
+        self._member = None
+        if m["out"]:
+            m["out"].close()
+            self.digests[m["target"]] = m["hash"].hexdigest()
+        if m["crc_now"] != crc or m["written"] != usize:
+            raise StreamZipError(f"CRC or size mismatch in {m['target']}.")
+
+    @staticmethod
+    def _zip64_sizes(extra: bytes, usize: int, csize: int) -> tuple[int, int]:
+        pos = 0
+        while pos + 4 <= len(extra):
+            tag, length = struct.unpack_from("<HH", extra, pos)
+            if tag == 0x0001:
+                fields = extra[pos + 4:pos + 4 + length]
+                values = [struct.unpack_from("<Q", fields, i)[0] for i in range(0, len(fields) - 7, 8)]
+                if usize == 0xFFFFFFFF and values:
+                    usize = values.pop(0)
+                if csize == 0xFFFFFFFF and values:
+                    csize = values.pop(0)
+                return usize, csize
+            pos += 4 + length
+        raise StreamZipError("ZIP64 member without size information.")
+
+    def _target_for(self, name: str) -> Path | None:
+        """Same sanitising as zipfile's extract: no drives, no absolute paths, no '..'."""
+        parts = [p for p in name.replace("\\", "/").split("/") if p not in ("", ".", "..")]
+        if not parts:
+            return None
+        parts[0] = parts[0].split(":")[-1] or "_"
+        return self.out_dir.joinpath(*parts)
+
+
+class PipelinedZipExtraction:
+    """
+    Feeds downloaded parts of a split ZIP to a StreamingZipExtractor on a worker thread,
+    so members are extracted while later parts are still downloading.
+
+    Pass part_ready as the on_part callback of TmpFilesClient.download_from_paste (with
+    reassemble=False); parts may arrive in any order and on any thread, they are
+    consumed in index order. The whole archive is hashed on the way through, so a
+    complete, verified extraction needs no reassembled copy.
+
+    finish() returns the extraction folder only when every member was extracted and
+    the archive matches expected_digest. Otherwise it returns None and keeps the parts,
+    so the archive can be reassembled and extracted the usual way — see `fallback_reason`.
+    """
+
+    READ_CHUNK = 1024 * 1024
+    HASH_ALGORITHM = "sha256"   # TmpFilesClient.HASH_ALGORITHM, the manifest's "sha256"
+
+    def __init__(self, out_dir: Path, part_count: int, expected_digest: str | None = None):
+        self.out_dir = Path(out_dir)
+        self.part_count = part_count
+        self.expected_digest = expected_digest.lower() if expected_digest else None
+        self.fallback_reason: str | None = None
+        self._extractor = StreamingZipExtractor(self.out_dir)
+        self._hash = hashlib.new(self.HASH_ALGORITHM)
+        self._parts: Dict[int, Path] = {}
+        self._cond = threading.Condition()
+        self._aborted = False
+        self._completed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def digests(self) -> Dict[Path, str]:
+        return self._extractor.digests
+
+    def part_ready(self, index: int, path: Path):
+        with self._cond:
+            self._parts[index] = Path(path)
+            self._cond.notify()
+
+    @property
+    def archive_digest(self) -> str:
+        """HASH_ALGORITHM digest of the parts fed so far, in order (the whole archive once finished)"""
+        return self._hash.hexdigest()
+
+    def finish(self, cleanup_parts: bool = True) -> Path | None:
+        """The extraction folder, or None (see fallback_reason); parts are only cleaned up on success."""
+        self._thread.join()
+        if not self.fallback_reason:
+            if not self._completed:
+                self.fallback_reason = "streamed extraction did not finish"
+            elif self.expected_digest and self.archive_digest != self.expected_digest:
+                self.fallback_reason = (
+                    f"archive digest mismatch (expected {self.expected_digest}, got {self.archive_digest})"
+                )
+        if self.fallback_reason:
+            shutil.rmtree(self.out_dir, ignore_errors=True)
+            return None
+        if cleanup_parts:
+            self._discard_parts()
+        temp_ledger().add(self.out_dir)
+        return self.out_dir
+
+    def abort(self, cleanup_parts: bool = True):
+        with self._cond:
+            self._aborted = True
+            self._cond.notify()
+        self._thread.join()
+        if cleanup_parts:
+            self._discard_parts()
+        shutil.rmtree(self.out_dir, ignore_errors=True)
+
+    def _run(self):
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            for index in range(self.part_count):
+                path = self._wait_for(index)
+                if path is None:
+                    return
+                with path.open("rb") as fh:
+                    for chunk in iter(lambda: fh.read(self.READ_CHUNK), b""):
+                        if self._aborted:
+                            return
+                        self._hash.update(chunk)
+                        self._extractor.feed(chunk)
+            self._extractor.close()
+            self._completed = True
+        except (StreamZipError, OSError, zlib.error, UnicodeDecodeError) as e:
+            self.fallback_reason = str(e) or type(e).__name__
+        except Exception as e:
+            # Anything unexpected (e.g. a member name the OS rejects) must not pass for a finished extraction
+            self.fallback_reason = f"{type(e).__name__}: {e}"
+        finally:
+            self._extractor.abandon()
+
+    def _wait_for(self, index: int) -> Path | None:
+        with self._cond:
+            while index not in self._parts and not self._aborted:
+                self._cond.wait()
+            return None if self._aborted else self._parts[index]
+
+    def _discard_parts(self):
+        with self._cond:
+            parts = list(self._parts.values())
+        for p in parts:
+            try:
+                temp_ledger().discard(p)
+                p.unlink(missing_ok=True)
+            except OSError:
+                pass
@@ -0,0 +1,195 @@
+# py_templedger.py
+from __future__ import annotations
+from typing import Dict
+from py_imports import *
+import json
+import threading
+import time
+
+
+class TempLedger:
+    """
+    Running total of what ModGnizer keeps in %TEMP%/ModGnizer, so the main menu can
+    show the cache size without walking the tree on every render.
+
+    The modules that write into the temp area report what they add and what they
+    are about to delete (add / discard). Anything they don't report (small state
+    files, crashes mid-write, the user deleting things by hand) is corrected by
+    reconcile(), an os.scandir walk that runs on a background thread at most every
+    RECONCILE_AFTER seconds.
+
+    Stored in %TEMP%/ModGnizer/temp_ledger.json, per top-level entry of the temp dir:
+        { "reconciled_at": float, "entries": { "download_cache": bytes, "backup_...": bytes, ... } }
+    """
+
+    LEDGER_NAME = "temp_ledger.json"
+    RECONCILE_AFTER = 10 * 60
+
+    def __init__(self, root: Path | None = None):
+        if root is None:
+            temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
+            root = temp_root / "ModGnizer"
+        self.root = Path(root)
+        self.path = self.root / self.LEDGER_NAME
+        self._entries: Dict[str, int] | None = None
+        self._reconciled_at = 0.0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._reconciling: threading.Thread | None = None
+
+    # -------------------------
+    # PUBLIC API
+    # -------------------------
+
+    def total(self) -> int | None:
+        """Cached size of the temp dir in bytes; None until it has been counted once."""
+        with self._lock:
+            self._load()
+            return sum(self._entries.values()) if self._reconciled_at else None
+
+    def entries(self) -> Dict[str, int]:
+        """Cached size of each top-level entry of the temp dir."""
+        with self._lock:
+            return dict(self._load())
+
+    def add(self, path: Path, size: int | None = None):
+        """Account for a file or folder that was just written under the temp dir."""
+        self._adjust(path, size if size is not None else tree_size(Path(path)))
+
+    def discard(self, path: Path, size: int | None = None):
+        """Account for a file or folder that is about to be deleted. Call before deleting it."""
+        self._adjust(path, -(size if size is not None else tree_size(Path(path))))
+
+    def reset(self):
+        """The temp dir was emptied."""
+        with self._lock:
+            self._entries = {}
+            self._reconciled_at = time.time()
+            self._dirty = True
+        self.save()
+
+    def reconcile(self, wait: bool = False):
+        """
+        Recount the temp dir with os.scandir on a background thread (at most one at a time).
+        With wait=True, block until the count is done.
+        """
+        with self._lock:
+            thread = self._reconciling
+            if thread is None or not thread.is_alive():
+                thread = self._reconciling = threading.Thread(target=self._reconcile, daemon=True)
+                thread.start()
+        if wait:
+            thread.join()
+
+    def reconcile_if_stale(self):
+        with self._lock:
+            self._load()
+            stale = time.time() - self._reconciled_at >= self.RECONCILE_AFTER
+        if stale:
+            self.reconcile()
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            payload = json.dumps({"reconciled_at": self._reconciled_at, "entries": self._entries})
+            self._dirty = False
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(payload, encoding="utf-8")
+            tmp.replace(self.path)
+        except OSError:
+            pass
+
+    # -------------------------
+    # HELPERS
+    # -------------------------
+
+    def _adjust(self, path: Path, delta: int):
+        try:
+            top = Path(path).relative_to(self.root).parts[0]
+        except (ValueError, IndexError):
+            return  # outside the temp dir (or the dir itself)
+        with self._lock:
+            entries = self._load()
+            size = entries.get(top, 0) + delta
+            if size > 0:
+                entries[top] = size
+            else:
+                entries.pop(top, None)
+            self._dirty = True
+
+    def _reconcile(self):
+        counted: Dict[str, int] = {}
+        try:
+            with os.scandir(self.root) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            counted[entry.name] = tree_size(Path(entry.path))
+                        else:
+                            counted[entry.name] = entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return
+
+        with self._lock:
+            self._entries = {name: size for name, size in counted.items() if size}
+            self._reconciled_at = time.time()
+            self._dirty = True
+        self.save()
+
+    def _load(self) -> Dict[str, int]:
+        if self._entries is None:
+            self._entries = {}
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if isinstance(data.get("entries"), dict):
+                    self._entries = {k: int(v) for k, v in data["entries"].items()}
+                    self._reconciled_at = float(data.get("reconciled_at") or 0)
+            except (OSError, ValueError, TypeError, AttributeError):
+                pass
+        return self._entries
+
+
+def tree_size(path: Path) -> int:
+    """Bytes in the files at or below path (iterative os.scandir walk, symlinks not followed)."""
+    try:
+        if not path.is_dir() or path.is_symlink():
+            return path.lstat().st_size if path.is_file() else 0
+    except OSError:
+        return 0
+
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+
+_shared: TempLedger | None = None
+_shared_lock = threading.Lock()
+
+
+def temp_ledger() -> TempLedger:
+    """The process-wide ledger every module reports into."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = TempLedger()
+        return _shared
@@ -1,38 +1,109 @@
 # py_tmpfiles.py
 from __future__ import annotations
-from typing import Dict, Any, List
-from urllib.parse import urlparse
+from typing import Dict, Any, List, Callable
 from py_imports import *
+from py_dlcache import DownloadCache
+from py_templedger import temp_ledger
+from py_spans import span, traced, record as record_span
+from py_transfer import TransferProgress, TransferStats
+from py_progress import Progress
+from py_storage import (
+    StorageBackend, TmpFilesBackend, backend_for_link,
+    StorageError, StorageIntegrityError, StorageTransientError,
+)
+import base64
+import hashlib
+import json
+import shutil
+import time
 import requests
 
 
-class TmpFilesError(Exception):
-    """Raised for tmpfiles.org upload/download errors."""
+# Historical names; storage backends (py_storage) raise these same classes
+TmpFilesError = StorageError
+TmpFilesIntegrityError = StorageIntegrityError
+TmpFilesTransientError = StorageTransientError
+
+
+class _HashingReader:
+    """
+    File wrapper that feeds every byte read through a hash, so a digest falls
+    out of a read we were doing anyway (upload, split) instead of a second pass.
+    """
+
+    def __init__(self, fh, algorithm: str = "sha256"):
+        self._fh = fh
+        self._hash = hashlib.new(algorithm)
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._fh.read(size)
+        if data:
+            self._hash.update(data)
+            self.bytes_read += len(data)
+        return data
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
 
 
 class TmpFilesClient:
-    UPLOAD_URL = "https://tmpfiles.org/api/v1/upload"
-    DEFAULT_TIMEOUT = 120
+    """
+    Splits, hashes, caches and reassembles shares. The bytes themselves go
+    through a StorageBackend (tmpfiles.org unless another one is passed in);
+    downloads pick the backend from each link.
+    Progress events go to the py_progress bus, or to on_progress when given.
+    """
 
-    def __init__(self, timeout: int = DEFAULT_TIMEOUT):
+    DEFAULT_TIMEOUT = 120
+    HASH_ALGORITHM = "sha256"
+    IO_BUFFER = 1024 * 1024  # bytes held in memory per read while splitting/reassembling
+    PART_RETRIES = 2  # extra attempts per part on a digest mismatch or a transient error
+    RETRY_BACKOFF = 2.0  # seconds, doubled per attempt
+    MANIFEST_VERSION = 2
+    MANIFEST_TAG = "MODGNIZER-MANIFEST"
+
+    def __init__(
+        self,
+        timeout: int = DEFAULT_TIMEOUT,
+        cache: DownloadCache | None = None,
+        use_cache: bool = True,
+        stats: TransferStats | None = None,
+        on_progress: Callable[[dict], None] | None = None,
+        base_url: str | None = None,
+        backend: StorageBackend | None = None,
+    ):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.setdefault(
+        self.cache = (cache or DownloadCache()) if use_cache else None
+        self.stats = stats or TransferStats()
+        self.on_progress = on_progress
+        self.session = self._make_session()
+        # base_url points the default backend at a tmpfiles-compatible server (e.g. py_tmpfiles_standin)
+        self.backend = backend or TmpFilesBackend(base_url, timeout, get_session=lambda: self.session)
+
+    def _make_session(self) -> requests.Session:
+        session = requests.Session()
+        session.headers.setdefault(
             "User-Agent",
             "ModGnizer/1.0 (+https://tmpfiles.org)"
         )
+        return session
 
     # -------------------------
     # FILE SPLITTING (helper)
     # -------------------------
-    def _split_file_to_parts(self, file_path: Path, chunk_size: int) -> List[Path]:
+    def _split_file_to_parts(self, file_path: Path, chunk_size: int) -> tuple[List[Path], List[str], str]:
         """
         Split file into zip-branded chunks written into:
         %TEMP%/ModGnizer/uploads/
 
         Part names: <original_filename>0.zip, <original_filename>1.zip, ...
 
-        Returns list of part Path objects (ascending order).
+        Digests of every part and of the whole file are computed from the same
+        bytes being written, so no extra read pass is needed. Parts are copied
+        through one IO_BUFFER-sized buffer, so memory doesn't grow with chunk_size.
+
+        Returns (parts, part_digests, whole_digest), parts in ascending order.
         """
         file_path = Path(file_path)
         if not file_path.exists() or not file_path.is_file():
@@ -44,12 +115,16 @@ class TmpFilesClient:
         uploads_dir.mkdir(parents=True, exist_ok=True)
 
         parts: List[Path] = []
+        part_digests: List[str] = []
+        whole = hashlib.new(self.HASH_ALGORITHM)
+        buffer = memoryview(bytearray(min(self.IO_BUFFER, chunk_size)))
         index = 0
         try:
-            with file_path.open("rb") as src:
+            progress = Progress(f"Splitting {file_path.name}", file_path.stat().st_size, callback=self.on_progress)
+            with span("tmpfiles.split") as s, progress, file_path.open("rb") as src:
                 while True:
-                    chunk = src.read(chunk_size)
-                    if not chunk:
+                    n = src.readinto(buffer)
+                    if not n:
                         break
 
                     # keep the original extension inside the name, but force .zip suffix
@@ -59,30 +134,43 @@ class TmpFilesClient:
                     # If parts collide from a previous run, ensure we don't accidentally append to them
                     if part_path.exists():
                         try:
+                            temp_ledger().discard(part_path)
                             part_path.unlink()
                         except Exception:
                             pass
 
-                    with part_path.open("wb") as out:
-                        out.write(chunk)
-
+                    part_hash = hashlib.new(self.HASH_ALGORITHM)
+                    written = 0
                     parts.append(part_path)
+                    with part_path.open("wb") as out:
+                        while n:
+                            data = buffer[:n]
+                            out.write(data)
+                            part_hash.update(data)
+                            whole.update(data)
+                            written += n
+                            s.add(bytes=n)
+                            progress.update(n)
+                            if written >= chunk_size:
+                                break
+                            n = src.readinto(buffer[:min(len(buffer), chunk_size - written)])
+                    temp_ledger().add(part_path, written)
+
+                    part_digests.append(part_hash.hexdigest())
                     index += 1
+                    s.add(items=1)
+                    progress.update(items=1)
 
         except OSError as e:
             # Clean up any partial parts written
-            for p in parts:
-                try:
-                    p.unlink(missing_ok=True)
-                except Exception:
-                    pass
+            self._discard(parts)
             raise TmpFilesError(f"Failed splitting file: {e}") from e
 
         if not parts:
             raise TmpFilesError("Splitting resulted in no parts.")
 
-        return parts
-    
+        return parts, part_digests, whole.hexdigest()
+
     # -------------------------
     # UPLOAD
     # -------------------------
@@ -93,61 +181,60 @@ class TmpFilesClient:
         if not file_path.exists() or not file_path.is_file():
             raise TmpFilesError(f"File not found: {file_path}")
 
+        size = file_path.stat().st_size
+        progress = TransferProgress(f"Uploading {file_path.name}", size, self.on_progress)
+        uploaded_at = time.time()
         try:
             with file_path.open("rb") as f:
-                resp = self.session.post(
-                    self.UPLOAD_URL,
-                    files={"file": (file_path.name, f)},
-                    timeout=self.timeout,
-                )
-        except requests.RequestException as e:
-            raise TmpFilesError(f"Network error during upload: {e}") from e
-
-        if not resp.ok:
-            raise TmpFilesError(
-                f"HTTP {resp.status_code} during upload\n{resp.text[:1000]}"
-            )
-
-        try:
-            payload = resp.json()
-        except ValueError:
-            raise TmpFilesError(
-                "Upload response was not JSON:\n"
-                f"{resp.text[:2000]}"
-            )
-
-        link = None
-        if isinstance(payload, dict):
-            data = payload.get("data")
-            if isinstance(data, dict) and "url" in data:
-                link = data["url"]
-            elif "url" in payload:
-                link = payload["url"]
+                reader = _HashingReader(f, self.HASH_ALGORITHM)
+                link, payload = self.backend.upload(file_path, reader, size, progress)
+        except OSError as e:
+            self._record("upload", progress, ok=False)
+            raise TmpFilesError(f"Failed reading {file_path}: {e}") from e
+        except TmpFilesError:
+            self._record("upload", progress, ok=False)
+            raise
 
-        if not link:
-            raise TmpFilesError(f"Upload succeeded but no URL found: {payload}")
+        # Time between the last byte sent and the response is the server's share
+        self._record("upload", progress, ok=True, latency=time.perf_counter() - progress.last_io)
 
         return {
             "link": link,  # ← restore expected key
             "share_url": link,
-            "direct_url": self._ensure_direct_url(link),
+            "direct_url": self.backend.direct_url(link),
             "payload": payload,
+            "sha256": reader.hexdigest(),
+            "size": reader.bytes_read,
+            "backend": self.backend.name,
+            "expires_at": self.backend.expires_at(uploaded_at),
         }
 
     # -------------------------
     # CHUNKED UPLOAD (public)
     # -------------------------
-    def upload_in_chunks(self, file_path: Path, chunk_size: int = 90 * 1024 * 1024, cleanup_parts: bool = True) -> Dict[str, Any]:
+    @traced("tmpfiles.upload_in_chunks")
+    def upload_in_chunks(self, file_path: Path, chunk_size: int | None = None, cleanup_parts: bool = True) -> Dict[str, Any]:
         """
+        chunk_size defaults to a size picked from measured upload throughput and
+        error rate (see TransferStats.choose_part_size), capped at the backend's
+        max_part_size.
+
         If file <= chunk_size → uploads as single file (behaves like upload()) and returns a dict:
-            { "links": [shareable_link], "parts": [file_path], "payloads": [payloads...] }
+            { "links": [shareable_link], "parts": [file_path], "payloads": [payloads...],
+              "sha256": "...", "part_sha256s": ["..."], "part_sizes": [n], "size": n }
 
         If file > chunk_size → splits file into parts and uploads each part separately.
         Returns:
             {
                 "links": [link_part1, link_part2, ...],
                 "parts": [Path(part1), Path(part2), ...],
-                "payloads": [payload1, payload2, ...]
+                "payloads": [payload1, payload2, ...],
+                "sha256": "<digest of the whole file>",
+                "part_sha256s": ["<digest of part1>", "<digest of part2>", ...],
+                "part_sizes": [bytes of part1, bytes of part2, ...],
+                "size": <bytes of the whole file>,
+                "backend": "<StorageBackend.name>",
+                "expires_at": <epoch seconds>|None
             }
 
         NOTE: After uploading parts, the consumer must re-assemble them in order:
@@ -166,62 +253,108 @@ class TmpFilesClient:
             raise TmpFilesError(f"File not found: {file_path}")
 
         file_size = file_path.stat().st_size
+        if chunk_size is None:
+            max_part = self.backend.max_part_size or max(file_size, 1)
+            chunk_size = self.stats.choose_part_size(file_size, max_part)
         if file_size <= chunk_size:
             # small enough for single upload
             single_resp = self.upload(file_path)  # existing method
             return {
                 "links": [single_resp["link"]],
                 "parts": [file_path],
-                "payloads": [single_resp.get("payload")]
+                "payloads": [single_resp.get("payload")],
+                "sha256": single_resp["sha256"],
+                "part_sha256s": [single_resp["sha256"]],
+                "part_sizes": [single_resp["size"]],
+                "size": single_resp["size"],
+                "backend": single_resp["backend"],
+                "expires_at": single_resp["expires_at"],
             }
 
         # split then upload
-        parts = self._split_file_to_parts(file_path, chunk_size)
-        links: List[str] = []
-        payloads: List[Any] = []
-
-        print("Chunking ...")
+        parts, part_digests, whole_digest = self._split_file_to_parts(file_path, chunk_size)
+        # The first part is the first to expire
+        expires_at = self.backend.expires_at()
+        print(f"Chunking into {len(parts)} part(s) of up to {chunk_size / (1024 * 1024):.0f} MB ...")
         try:
-            for p in parts:
-                # Reuse the upload() method so we keep consistent request handling
-                print(f"Uploading part: {p.name} ({p.stat().st_size} bytes)")
-                resp = self.upload(p)
-                link = resp.get("link") or resp.get("share_url") or resp.get("direct_url")
-                if not link:
-                    raise TmpFilesError(f"Upload succeeded but no link returned for part: {p.name}")
-                links.append(link)
-                payloads.append(resp.get("payload"))
+            links, payloads = self._upload_parts(parts)
         except Exception as e:
             # Attempt best-effort cleanup of parts on failure
-            for p in parts:
-                try:
-                    p.unlink(missing_ok=True)
-                except Exception:
-                    pass
+            self._discard(parts)
             raise TmpFilesError(f"Chunked upload failed: {e}") from e
 
         # Optionally remove parts after successful upload
         if cleanup_parts:
-            for p in parts:
-                try:
-                    p.unlink(missing_ok=True)
-                except Exception:
-                    # don't block the overall success if part deletion fails
-                    pass
+            # don't block the overall success if part deletion fails
+            self._discard(parts)
 
-        return {"links": links, "parts": parts, "payloads": payloads}
+        return {
+            "links": links,
+            "parts": parts,
+            "payloads": payloads,
+            "sha256": whole_digest,
+            "part_sha256s": part_digests,
+            "part_sizes": [min(chunk_size, file_size - i * chunk_size) for i in range(len(parts))],
+            "size": file_size,
+            "backend": self.backend.name,
+            "expires_at": expires_at,
+        }
+
+    def _upload_parts(self, parts: List[Path]) -> tuple[List[str], List[Any]]:
+        """Upload parts one after another; returns (links, payloads) in part order."""
+        links: List[str] = []
+        payloads: List[Any] = []
+        for p in parts:
+            link, payload = self._upload_part(p)
+            links.append(link)
+            payloads.append(payload)
+        return links, payloads
+
+    def _upload_part(self, part: Path) -> tuple[str, Any]:
+        attempt = 0
+        while True:
+            try:
+                # Reuse the upload() method so we keep consistent request handling
+                print(f"Uploading part: {part.name} ({part.stat().st_size} bytes)")
+                resp = self.upload(part)
+                break
+            except TmpFilesTransientError as e:
+                attempt += 1
+                if attempt > self.PART_RETRIES:
+                    raise
+                print(f"{e.args[0].splitlines()[0]} Retrying {part.name} ({attempt}/{self.PART_RETRIES}) ...")
+                time.sleep(self.RETRY_BACKOFF * 2 ** (attempt - 1))
+
+        link = resp.get("link") or resp.get("share_url") or resp.get("direct_url")
+        if not link:
+            raise TmpFilesError(f"Upload succeeded but no link returned for part: {part.name}")
+        return link, resp.get("payload")
 
     # -------------------------
     # DOWNLOAD
     # -------------------------
 
-    def download_from_paste(self, manifest: dict, cleanup_parts: bool = True) -> list[Path]:
+    @traced("tmpfiles.download_from_paste")
+    def download_from_paste(
+        self,
+        manifest: dict,
+        cleanup_parts: bool = True,
+        on_part: Callable[[int, Path], None] | None = None,
+        reassemble: bool = True,
+    ) -> list[Path]:
         """
         Download parts described in a parsed MODGNIZER manifest.
 
         Args:
             manifest: dict returned by parse_modgnizer_manifest(), must contain "links" (ordered).
             cleanup_parts: if True, remove individual part files after successful reassembly/rename.
+            on_part: called as on_part(index, path) once each part is downloaded and verified
+                     (0-based, possibly out of order and from a worker thread), e.g. to start
+                     extracting before the last part arrives. Pass cleanup_parts=False if the
+                     callback still reads the part after this method returns.
+            reassemble: False returns the verified parts of a multi-part share as they are,
+                     e.g. when on_part already extracted them; reassemble_parts() can still
+                     join them later.
 
         Returns:
             List[Path] - if multiple parts were downloaded but not reassembled, returns all part paths.
@@ -237,28 +370,44 @@ class TmpFilesClient:
         if not links:
             raise TmpFilesError("Manifest contains no links to download.")
 
-        # Download each link using existing download() method
-        downloaded_parts: list[Path] = []
-        for idx, link in enumerate(links, start=1):
-            try:
-                print(f"Downloading part [{idx}/{len(links)}]: {link}")
-                p = self.download(link)
-                downloaded_parts.append(p)
-                print(f"Saved: {p}")
-            except Exception as e:
-                # Best-effort cleanup of any parts already downloaded
-                for q in downloaded_parts:
-                    try:
-                        q.unlink(missing_ok=True)
-                    except Exception:
-                        pass
-                raise TmpFilesError(f"Failed to download part {link}: {e}") from e
+        part_digests = manifest.get("part_sha256s") or []
+        if part_digests and len(part_digests) != len(links):
+            # Mismatched checksum list — don't guess which digest belongs to which part
+            part_digests = []
+
+        part_sizes = manifest.get("part_sizes") or []
+        if part_sizes and len(part_sizes) != len(links):
+            part_sizes = []
 
-        # If only one part and we have an internal name, rename to preserve original filename
         internal_name = manifest.get("internal_name")
         temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
         download_dir = temp_root / "ModGnizer" / "downloaded_from_tmpfiles_org"
 
+        # With known sizes (v2 manifests), fail before downloading anything if the disk can't hold
+        # the parts plus the reassembled archive
+        total_size = sum(part_sizes) if part_sizes else None
+        if total_size:
+            download_dir.mkdir(parents=True, exist_ok=True)
+            needed = total_size * (2 if len(links) > 1 and reassemble else 1)
+            free = shutil.disk_usage(download_dir).free
+            if free < needed:
+                raise TmpFilesError(
+                    f"Not enough disk space in {download_dir}: need {needed} bytes, {free} free."
+                )
+
+        # Parts already in the download cache are served whatever the share's age, so expiry
+        # (stamped by the uploader's clock) only explains a fetch that actually failed
+        try:
+            downloaded_parts = self._fetch_parts(links, part_digests, part_sizes, manifest.get("backend"), on_part)
+        except TmpFilesError as e:
+            expires_at = manifest.get("expires_at")
+            if expires_at and time.time() > expires_at:
+                expired = datetime.fromtimestamp(expires_at).strftime("%Y-%m-%d %H:%M")
+                raise TmpFilesError(f"This share expired on {expired}; ask for a fresh one. ({e})") from e
+            raise
+
+        # If only one part and we have an internal name, rename to preserve original filename
+
         if len(downloaded_parts) == 1:
             single = downloaded_parts[0]
             if internal_name:
@@ -270,6 +419,7 @@ class TmpFilesClient:
 
                     # If assembled exists, overwrite
                     if assembled.exists():
+                        temp_ledger().discard(assembled)
                         assembled.unlink()
 
                     single.replace(assembled)
@@ -282,107 +432,344 @@ class TmpFilesClient:
 
 
         # Multiple parts: if we have an internal_name, reassemble by concatenation
-        if internal_name:
-            assembled = download_dir / internal_name
-            try:
-                # Ensure parent exists
-                assembled.parent.mkdir(parents=True, exist_ok=True)
-                # Overwrite if exists
-                if assembled.exists():
-                    assembled.unlink()
-                with assembled.open("wb") as out:
-                    for part in downloaded_parts:
-                        with part.open("rb") as pf:
-                            while True:
-                                chunk = pf.read(1024 * 1024)
-                                if not chunk:
-                                    break
-                                out.write(chunk)
-                # Optionally remove part files
-                if cleanup_parts:
-                    for part in downloaded_parts:
-                        try:
-                            part.unlink(missing_ok=True)
-                        except Exception:
-                            pass
-                return [assembled]
-            except Exception as e:
-                # Attempt cleanup
-                try:
-                    assembled.unlink(missing_ok=True)
-                except Exception:
-                    pass
-                raise TmpFilesError(f"Failed to reassemble parts: {e}") from e
+        if internal_name and reassemble:
+            return [self.reassemble_parts(downloaded_parts, internal_name, manifest.get("sha256"), total_size, cleanup_parts)]
+
+        # No internal name (or reassemble=False): return the list of downloaded parts (caller must reassemble)
+        return downloaded_parts
 
-        # No internal name: return the list of downloaded parts (caller must reassemble)
+    def reassembly_path(self, internal_name: str) -> Path:
+        temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
+        return temp_root / "ModGnizer" / "downloaded_from_tmpfiles_org" / internal_name
+
+    def reassemble_parts(
+        self,
+        parts: List[Path],
+        internal_name: str,
+        expected_whole: str | None = None,
+        total_size: int | None = None,
+        cleanup_parts: bool = True,
+    ) -> Path:
+        """Concatenate downloaded parts (in order) into reassembly_path(internal_name), checking the whole digest."""
+        assembled = self.reassembly_path(internal_name)
+        whole = hashlib.new(self.HASH_ALGORITHM)
+        try:
+            # Ensure parent exists
+            assembled.parent.mkdir(parents=True, exist_ok=True)
+            # Overwrite if exists
+            if assembled.exists():
+                temp_ledger().discard(assembled)
+                assembled.unlink()
+            progress = Progress(f"Reassembling {internal_name}", total_size, len(parts), callback=self.on_progress)
+            with span("tmpfiles.reassemble") as s, progress, assembled.open("wb") as out:
+                if total_size:
+                    # Preallocate so the reassembly can't run out of space halfway
+                    out.truncate(total_size)
+                buffer = memoryview(bytearray(self.IO_BUFFER))
+                for part in parts:
+                    with part.open("rb") as pf:
+                        while True:
+                            n = pf.readinto(buffer)
+                            if not n:
+                                break
+                            whole.update(buffer[:n])
+                            out.write(buffer[:n])
+                            s.add(bytes=n)
+                            progress.update(n)
+                    s.add(items=1)
+                    progress.update(items=1)
+            if expected_whole and whole.hexdigest() != expected_whole.lower():
+                raise TmpFilesIntegrityError(
+                    f"Reassembled archive digest mismatch (expected {expected_whole}, got {whole.hexdigest()})."
+                )
+            temp_ledger().add(assembled)
+            # Optionally remove part files
+            if cleanup_parts:
+                self._discard(parts)
+            return assembled
+        except Exception as e:
+            # Attempt cleanup
+            try:
+                assembled.unlink(missing_ok=True)
+            except Exception:
+                pass
+            if isinstance(e, TmpFilesIntegrityError):
+                raise
+            raise TmpFilesError(f"Failed to reassemble parts: {e}") from e
+
+
+    def _fetch_parts(
+        self,
+        links: List[str],
+        part_digests: List[str],
+        part_sizes: List[int] | None = None,
+        store: str | None = None,
+        on_part: Callable[[int, Path], None] | None = None,
+    ) -> List[Path]:
+        """Download parts one after another; returns paths in link order."""
+        downloaded_parts: List[Path] = []
+        for idx, link in enumerate(links, start=1):
+            expected = part_digests[idx - 1] if part_digests else None
+            expected_size = part_sizes[idx - 1] if part_sizes else None
+            try:
+                downloaded_parts.append(self._fetch_part(idx, len(links), link, expected, expected_size, store))
+                if on_part:
+                    on_part(idx - 1, downloaded_parts[-1])
+            except Exception:
+                # Best-effort cleanup of any parts already downloaded
+                self._discard(downloaded_parts)
+                raise
         return downloaded_parts
 
+    def _fetch_part(self, idx: int, count: int, link: str, expected: str | None, expected_size: int | None = None, store: str | None = None) -> Path:
+        """
+        Download one part via download().
+        A part whose digest doesn't match (or that hit a transient error) is
+        re-fetched on its own; other parts are unaffected.
+        """
+        attempt = 0
+        while True:
+            try:
+                print(f"Downloading part [{idx}/{count}]: {link}")
+                p = self.download(link, expected_sha256=expected, expected_size=expected_size, store=store)
+                print(f"Saved: {p}")
+                return p
+            except (TmpFilesIntegrityError, TmpFilesTransientError) as e:
+                attempt += 1
+                if attempt > self.PART_RETRIES:
+                    if isinstance(e, TmpFilesIntegrityError):
+                        raise
+                    raise TmpFilesError(f"Failed to download part {link}: {e}") from e
+                print(f"{e.args[0].splitlines()[0]} Re-fetching part [{idx}/{count}] ({attempt}/{self.PART_RETRIES}) ...")
+                if isinstance(e, TmpFilesTransientError):
+                    time.sleep(self.RETRY_BACKOFF * 2 ** (attempt - 1))
+            except TmpFilesError:
+                raise
+            except Exception as e:
+                raise TmpFilesError(f"Failed to download part {link}: {e}") from e
 
-    def download(self, url: str) -> Path:
+    def download(self, url: str, expected_sha256: str | None = None, expected_size: int | None = None, store: str | None = None) -> Path:
         """
-        Downloads a tmpfiles.org file into %TEMP%\\ModGnizer\\
-        Accepts either share URL or /dl/ direct URL.
+        Downloads a shared file into %TEMP%\\ModGnizer\\
+        Accepts a tmpfiles.org share URL or /dl/ direct URL, or a link from
+        any other storage backend (see py_storage.backend_for_link).
+
+        If expected_sha256 is given, the digest is computed as bytes stream in
+        and a mismatch removes the file and raises TmpFilesIntegrityError.
+        If expected_size is given, a server reporting a different length is
+        rejected before the body is read. `store` is the backend name recorded
+        in the share manifest, for links whose host alone doesn't identify it.
 
         Returns:
             Path to downloaded file.
         """
-        direct_url = self._ensure_direct_url(url)
+        backend = self._backend_for(url, store)
+        direct_url = backend.direct_url(url)
 
         temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
         download_dir = temp_root / "ModGnizer" / "downloaded_from_tmpfiles_org"
         download_dir.mkdir(parents=True, exist_ok=True)
 
-        filename = Path(urlparse(direct_url).path).name
+        filename = backend.filename(url)
         if not filename:
             raise TmpFilesError("Could not determine filename from URL.")
 
         target_path = download_dir / filename
 
+        # Served from the local cache when this link (or this content) was fetched before
+        if self.cache:
+            cached = self.cache.lookup(direct_url, expected_sha256)
+            if cached:
+                print(f"Using cached copy of {filename}")
+                with span("tmpfiles.download", cached=True):
+                    temp_ledger().discard(target_path)
+                    self.cache.materialize(cached, target_path)
+                    temp_ledger().add(target_path)
+                return target_path
+
+        # Don't truncate in place: the old file may be a hard link into the cache
+        temp_ledger().discard(target_path)
+        target_path.unlink(missing_ok=True)
+        digest = hashlib.new(self.HASH_ALGORITHM)
+        progress = TransferProgress(f"Downloading {filename}", None, self.on_progress)
+        latency = None
+
         try:
-            with self.session.get(
-                direct_url,
-                stream=True,
-                timeout=self.timeout,
-            ) as resp:
-                if not resp.ok:
-                    raise TmpFilesError(
-                        f"HTTP {resp.status_code} during download\n"
-                        f"{resp.text[:500]}"
+            with backend.open_download(url) as stream:
+                # Time to response headers
+                latency = stream.latency
+                progress.total = stream.length if stream.length is not None else expected_size
+                if expected_size is not None and progress.total != expected_size:
+                    raise TmpFilesIntegrityError(
+                        f"Size mismatch for {filename} (expected {expected_size} bytes, server reports {progress.total})."
                     )
 
                 with target_path.open("wb") as out:
-                    for chunk in resp.iter_content(chunk_size=1024 * 1024):
-                        if chunk:
-                            out.write(chunk)
+                    for chunk in stream.chunks():
+                        digest.update(chunk)
+                        out.write(chunk)
+                        progress.update(len(chunk))
 
-        except requests.RequestException as e:
-            raise TmpFilesError(f"Network error during download: {e}") from e
+        except TmpFilesError:
+            self._record("download", progress, ok=False, latency=latency)
+            raise
+        except OSError as e:
+            self._record("download", progress, ok=False, latency=latency)
+            raise TmpFilesError(f"Failed writing {target_path}: {e}") from e
+
+        self._record("download", progress, ok=True, latency=latency)
 
         if not target_path.exists() or target_path.stat().st_size == 0:
             raise TmpFilesError("Downloaded file is empty or missing.")
 
+        if expected_size is not None and progress.bytes_done != expected_size:
+            target_path.unlink(missing_ok=True)
+            raise TmpFilesIntegrityError(
+                f"Size mismatch for {filename} (expected {expected_size} bytes, got {progress.bytes_done})."
+            )
+
+        if expected_sha256 and digest.hexdigest() != expected_sha256.lower():
+            target_path.unlink(missing_ok=True)
+            raise TmpFilesIntegrityError(
+                f"Checksum mismatch for {filename} (expected {expected_sha256}, got {digest.hexdigest()})."
+            )
+
+        temp_ledger().add(target_path, progress.bytes_done)
+        if self.cache:
+            self.cache.store(direct_url, target_path, digest.hexdigest())
+
         return target_path
 
     # -------------------------
     # HELPERS
     # -------------------------
 
+    def _record(self, direction: str, progress: TransferProgress, ok: bool, latency: float | None = None):
+        progress.done(latency=latency, ok=ok)
+        self.stats.record(direction, progress.bytes_done, progress.elapsed(), latency=latency, ok=ok)
+        record_span(f"tmpfiles.{direction}", progress.elapsed(), bytes=progress.bytes_done, items=1, ok=ok, latency=latency)
+
+    @staticmethod
+    def _discard(paths: list[Path]):
+        for q in paths:
+            try:
+                temp_ledger().discard(q)
+                q.unlink(missing_ok=True)
+            except Exception:
+                pass
+
+    @staticmethod
+    def encode_manifest_payload(
+        internal_name: str,
+        size_bytes: int,
+        timestamp: str,
+        links: List[str],
+        sha256: str | None = None,
+        part_sha256s: List[str] | None = None,
+        part_sizes: List[int] | None = None,
+        backend: str | None = None,
+        expires_at: float | None = None,
+    ) -> str:
+        """
+        Build the machine-readable line embedded in a MODGNIZER share block:
+            MODGNIZER-MANIFEST v2: <base64 of compact JSON>
+
+        JSON payload (v2):
+            {
+                "v": 2,
+                "name": str, "size": int, "ts": str, "sha256": str|None,
+                "store": str|None,        # StorageBackend.name the parts were uploaded to
+                "exp": float|None,        # epoch seconds the first part expires, None = never
+                "parts": [{"url": str, "size": int|None, "sha256": str|None}, ...]   # in order
+            }
+        """
+        parts = []
+        for i, url in enumerate(links):
+            parts.append({
+                "url": url,
+                "size": part_sizes[i] if part_sizes and len(part_sizes) == len(links) else None,
+                "sha256": part_sha256s[i] if part_sha256s and len(part_sha256s) == len(links) else None,
+            })
+        payload = {
+            "v": TmpFilesClient.MANIFEST_VERSION,
+            "name": internal_name,
+            "size": size_bytes,
+            "ts": timestamp,
+            "sha256": sha256,
+            "store": backend,
+            "exp": int(expires_at) if expires_at else None,
+            "parts": parts,
+        }
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        encoded = base64.urlsafe_b64encode(raw).decode("ascii")
+        return f"{TmpFilesClient.MANIFEST_TAG} v{TmpFilesClient.MANIFEST_VERSION}: {encoded}"
+
+    @staticmethod
+    def _decode_manifest_payload(text: str) -> dict | None:
+        """
+        Decode an embedded v2+ payload into the parse_modgnizer_manifest() shape.
+        Returns None when there is no payload, it is unreadable, or it was written
+        by a newer format we don't know — callers then fall back to the v1 text fields.
+        """
+        m = re.search(
+            rf"{TmpFilesClient.MANIFEST_TAG} v(\d+):\s*([A-Za-z0-9_\-=]+)", text
+        )
+        if not m or int(m.group(1)) > TmpFilesClient.MANIFEST_VERSION:
+            return None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(m.group(2)).decode("utf-8"))
+            parts = payload["parts"]
+            links = [p["url"] for p in parts]
+        except (ValueError, KeyError, TypeError):
+            return None
+        if not links:
+            return None
+
+        sizes = [p.get("size") for p in parts]
+        digests = [p.get("sha256") for p in parts]
+        return {
+            "version": int(payload.get("v", m.group(1))),
+            "internal_name": payload.get("name"),
+            "size_bytes": payload.get("size"),
+            "timestamp": payload.get("ts"),
+            "sha256": (payload.get("sha256") or "").lower() or None,
+            "part_sha256s": [d.lower() for d in digests] if all(digests) else None,
+            "part_sizes": sizes if all(isinstance(n, int) for n in sizes) else None,
+            "backend": payload.get("store"),
+            "expires_at": payload.get("exp"),
+            "links": links,
+        }
+
+    @staticmethod
     def parse_modgnizer_manifest(raw_text: str) -> dict:
         """
         Parse a MODGNIZER markdown block or free text and return:
             {
+                "version": int,         # 2 when a machine-readable payload was found, else 1
                 "internal_name": str,   # original filename (required if present)
                 "size_bytes": Optional[int],
                 "timestamp": Optional[str],
-                "links": List[str]      # ordered list of tmpfiles.org URLs
+                "sha256": Optional[str],             # digest of the whole archive
+                "part_sha256s": Optional[List[str]], # digest per link, same order
+                "part_sizes": Optional[List[int]],   # bytes per link, same order (v2 only)
+                "backend": Optional[str],            # storage backend name (v2 only)
+                "expires_at": Optional[float],       # epoch seconds (v2 only)
+                "links": List[str]      # ordered list of download URLs
             }
-        Raises ModGnizerManifestError on malformed content.
+        v2 blocks carry an encoded payload (see encode_manifest_payload); v1 blocks
+        are scraped from the human-readable lines.
+        Raises ValueError on malformed content.
         """
         if not raw_text or not raw_text.strip():
             raise ValueError("Manifest text is empty.")
 
         text = raw_text.strip()
 
+        decoded = TmpFilesClient._decode_manifest_payload(text)
+        if decoded:
+            return decoded
+
         # Detect a MODGNIZER block (loose detection is fine)
         is_modgnizer = "# MODGNIZER" in text or "MODGNIZER" in text.splitlines()[0] if text else False
 
@@ -404,34 +791,48 @@ class TmpFilesClient:
             m_ts = re.search(r'Date of modlist:\s*([0-9:\- \w]+)', text, flags=re.IGNORECASE)
             timestamp = m_ts.group(1).strip() if m_ts else None
 
+            # Checksums (optional, older blocks don't carry them)
+            m_sha = re.search(r'SHA-256 of modlist:\s*([0-9a-fA-F]{64})', text, flags=re.IGNORECASE)
+            sha256 = m_sha.group(1).lower() if m_sha else None
+
+            part_rows = re.findall(r'^\s*(\d+):\s*([0-9a-fA-F]{64})\s*$', text, flags=re.MULTILINE)
+            part_sha256s = [h.lower() for _, h in sorted(part_rows, key=lambda r: int(r[0]))] or None
+
             if not urls:
                 raise ValueError("Found MODGNIZER header but no tmpfiles.org links were detected.")
 
             return {
+                "version": 1,
                 "internal_name": internal_name,
                 "size_bytes": size_bytes,
                 "timestamp": timestamp,
+                "sha256": sha256,
+                "part_sha256s": part_sha256s,
+                "part_sizes": None,
+                "backend": "tmpfiles",
+                "expires_at": None,
                 "links": urls,
             }
 
         # Not an explicit MODGNIZER block — fallback to plain links
         if urls:
-            return {"internal_name": None, "size_bytes": None, "timestamp": None, "links": urls}
+            return {
+                "version": 1, "internal_name": None, "size_bytes": None, "timestamp": None,
+                "sha256": None, "part_sha256s": None, "part_sizes": None,
+                "backend": "tmpfiles", "expires_at": None, "links": urls,
+            }
 
         raise ValueError("Text does not contain MODGNIZER data or tmpfiles.org links.")
 
+    def _backend_for(self, link: str, store: str | None = None) -> StorageBackend:
+        if self.backend.handles(link):
+            return self.backend
+        return backend_for_link(link, self.timeout, get_session=lambda: self.session, store=store)
+
     def _ensure_direct_url(self, url: str) -> str:
         """
-        Converts:
+        Converts a share link into the URL the bytes are fetched from, e.g.
         http(s)://tmpfiles.org/12345/file.rar
         → https://tmpfiles.org/dl/12345/file.rar
         """
-        if "/dl/" in url:
-            return url.replace("http://", "https://")
-
-        parsed = urlparse(url)
-        if "tmpfiles.org" not in parsed.netloc:
-            raise TmpFilesError("URL is not a tmpfiles.org link.")
-
-        path = parsed.path.lstrip("/")
-        return f"https://tmpfiles.org/dl/{path}"
\ No newline at end of file
+        return self._backend_for(url).direct_url(url)
\ No newline at end of file
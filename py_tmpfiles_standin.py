@@ -0,0 +1,342 @@
+# py_tmpfiles_standin.py
+"""
+Local stand-in for tmpfiles.org, for offline testing and benchmarking.
+
+Mimics the two endpoints ModGnizer uses:
+    POST /api/v1/upload          multipart "file" → {"status": "success", "data": {"url": "<base>/<id>/<name>"}}
+    GET  /dl/<id>/<name>         raw bytes
+    GET  /<id>/<name>            small HTML share page
+
+and can inject latency, bandwidth throttling and failures.
+
+    python py_tmpfiles_standin.py --port 8080 --latency 0.2 --throttle 2000000 --fail-rate 0.1
+    python py_tmpfiles_standin.py --bench --size 200000000 --concurrency 4
+"""
+from __future__ import annotations
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import unquote
+from py_imports import *
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients abandoning a response (e.g. a size check failing on the headers) is normal here
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class StandInServer:
+    MAX_UPLOAD = 100 * 1024 * 1024  # same limit as tmpfiles.org
+    IO_CHUNK = 256 * 1024
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        throttle_bps: int | None = None,
+        fail_rate: float = 0.0,
+        fail_status: int = 503,
+        max_upload: int = MAX_UPLOAD,
+        seed: int | None = None,
+    ):
+        """
+        Args:
+            root: where uploads are stored (a temp dir, removed on stop(), when omitted)
+            latency: seconds slept before answering each request
+            throttle_bps: per-connection bandwidth cap in bytes/sec, both directions
+            fail_rate: probability [0..1] that a request is answered with fail_status
+            fail_status: e.g. 503 (server error) or 429 (rate limited)
+        """
+        self._own_root = root is None
+        self.root = Path(root or tempfile.mkdtemp(prefix="modgnizer_standin_"))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.latency = latency
+        self.throttle_bps = throttle_bps
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.max_upload = max_upload
+        self.requests = {"upload": 0, "download": 0, "failed": 0}
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._httpd = _QuietHTTPServer((host, port), self._make_handler())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._own_root:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # -------------------------
+    # HELPERS
+    # -------------------------
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            failed = self.fail_rate > 0 and self._random.random() < self.fail_rate
+            if failed:
+                self.requests["failed"] += 1
+            return failed
+
+    def _allocate_id(self) -> int:
+        with self._lock:
+            file_id = self._next_id
+            self._next_id += 1
+            return file_id
+
+    def _count(self, kind: str):
+        with self._lock:
+            self.requests[kind] += 1
+
+    def _throttle(self, started: float, nbytes: int):
+        """Sleep until nbytes moved since `started` fits under throttle_bps."""
+        if not self.throttle_bps:
+            return
+        ahead = nbytes / self.throttle_bps - (time.perf_counter() - started)
+        if ahead > 0:
+            time.sleep(ahead)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: bytes, content_type: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _reply_json(self, status: int, payload: dict):
+                self._reply(status, json.dumps(payload).encode("utf-8"))
+
+            def _drain(self, length: int):
+                while length > 0:
+                    chunk = self.rfile.read(min(length, server.IO_CHUNK))
+                    if not chunk:
+                        break
+                    length -= len(chunk)
+
+            # POST /api/v1/upload
+            def do_POST(self):
+                if server.latency:
+                    time.sleep(server.latency)
+
+                length = int(self.headers.get("Content-Length") or 0)
+                if self.path.rstrip("/") != "/api/v1/upload":
+                    self._drain(length)
+                    return self._reply_json(404, {"status": "error", "message": "Not found"})
+
+                if server._should_fail():
+                    self._drain(length)
+                    return self._reply_json(server.fail_status, {"status": "error", "message": "Injected failure"})
+
+                if length > server.max_upload:
+                    self._drain(length)
+                    return self._reply_json(413, {"status": "error", "message": "File too large"})
+
+                ctype = self.headers.get("Content-Type", "")
+                if "boundary=" not in ctype:
+                    self._drain(length)
+                    return self._reply_json(400, {"status": "error", "message": "Expected multipart/form-data"})
+                boundary = ctype.split("boundary=", 1)[1].strip().strip('"').encode("ascii")
+
+                try:
+                    name, file_id = self._store_upload(length, boundary)
+                except ValueError as e:
+                    return self._reply_json(400, {"status": "error", "message": str(e)})
+
+                server._count("upload")
+                # tmpfiles.org answers with its plain share URL (no /dl/)
+                url = f"{server.base_url}/{file_id}/{name}"
+                self._reply_json(200, {"status": "success", "data": {"url": url}})
+
+            def _store_upload(self, length: int, boundary: bytes) -> tuple[str, int]:
+                """Stream the single "file" part of the body to disk without buffering it."""
+                started = time.perf_counter()
+                head = b""
+                while b"\r\n\r\n" not in head:
+                    line = self.rfile.readline(64 * 1024)
+                    if not line:
+                        raise ValueError("Truncated multipart body")
+                    head += line
+                    if len(head) > 64 * 1024:
+                        raise ValueError("Multipart headers too large")
+
+                disposition = head.decode("utf-8", "replace")
+                if 'filename="' not in disposition:
+                    raise ValueError("No file part in upload")
+                name = disposition.split('filename="', 1)[1].split('"', 1)[0]
+                name = Path(unquote(name)).name or "file"
+
+                tail = len(b"\r\n--" + boundary + b"--\r\n")
+                remaining = length - len(head) - tail
+                if remaining < 0:
+                    raise ValueError("Malformed multipart body")
+
+                file_id = server._allocate_id()
+                target = server.root / str(file_id) / name
+                target.parent.mkdir(parents=True, exist_ok=True)
+                received = 0
+                with target.open("wb") as out:
+                    while received < remaining:
+                        chunk = self.rfile.read(min(server.IO_CHUNK, remaining - received))
+                        if not chunk:
+                            raise ValueError("Truncated upload")
+                        out.write(chunk)
+                        received += len(chunk)
+                        server._throttle(started, received)
+                self.rfile.read(tail)
+                return name, file_id
+
+            # GET /dl/<id>/<name> and GET /<id>/<name>
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+
+                parts = [unquote(p) for p in self.path.split("?", 1)[0].strip("/").split("/")]
+                direct = len(parts) == 3 and parts[0] == "dl"
+                if direct:
+                    parts = parts[1:]
+
+                if len(parts) != 2 or ".." in parts:
+                    return self._reply(404, b"Not found", "text/plain")
+
+                target = server.root / parts[0] / parts[1]
+                if not target.is_file():
+                    return self._reply(404, b"Not found", "text/plain")
+
+                if not direct:
+                    page = f"<html><body><a href=\"/dl/{parts[0]}/{parts[1]}\">{parts[1]}</a></body></html>"
+                    return self._reply(200, page.encode("utf-8"), "text/html")
+
+                if server._should_fail():
+                    return self._reply_json(server.fail_status, {"status": "error", "message": "Injected failure"})
+
+                server._count("download")
+                size = target.stat().st_size
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(size))
+                self.end_headers()
+
+                started = time.perf_counter()
+                sent = 0
+                with target.open("rb") as fh:
+                    for chunk in iter(lambda: fh.read(server.IO_CHUNK), b""):
+                        self.wfile.write(chunk)
+                        sent += len(chunk)
+                        server._throttle(started, sent)
+
+        return Handler
+
+
+def _bench(args):
+    """Upload + download one synthetic file through the stand-in, sequential vs concurrent."""
+    from py_tmpfiles import TmpFilesClient
+    from py_asynctransfer import AsyncTmpFilesClient
+
+    work = Path(tempfile.mkdtemp(prefix="modgnizer_bench_"))
+    os.environ["TEMP"] = str(work / "temp")
+    src = work / "bench.zip"
+    with src.open("wb") as fh:
+        block = os.urandom(1024 * 1024)
+        for _ in range(max(1, args.size // len(block))):
+            fh.write(block)
+
+    try:
+        with StandInServer(latency=args.latency, throttle_bps=args.throttle, fail_rate=args.fail_rate, seed=1) as server:
+            clients = {
+                "sequential": TmpFilesClient(base_url=server.base_url, use_cache=False),
+                f"async x{args.concurrency}": AsyncTmpFilesClient(base_url=server.base_url, use_cache=False, concurrency=args.concurrency),
+            }
+            for label, client in clients.items():
+                client.RETRY_BACKOFF = 0.05
+                t0 = time.perf_counter()
+                result = client.upload_in_chunks(src, chunk_size=args.chunk)
+                t1 = time.perf_counter()
+                client.download_from_paste({
+                    "internal_name": src.name,
+                    "links": result["links"],
+                    "sha256": result["sha256"],
+                    "part_sha256s": result["part_sha256s"],
+                })
+                t2 = time.perf_counter()
+                print(f"{label:<14} parts={len(result['links']):<3} upload={t1 - t0:7.2f}s  download={t2 - t1:7.2f}s")
+            print(f"server requests: {server.requests}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local tmpfiles.org stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--root", type=Path, default=None, help="storage directory (temp dir if omitted)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--throttle", type=int, default=None, help="bandwidth cap per connection, bytes/sec")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="probability of an injected failure")
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--bench", action="store_true", help="run a sequential vs concurrent transfer benchmark")
+    parser.add_argument("--size", type=int, default=64 * 1024 * 1024, help="bench: file size in bytes")
+    parser.add_argument("--chunk", type=int, default=8 * 1024 * 1024, help="bench: part size in bytes")
+    parser.add_argument("--concurrency", type=int, default=4, help="bench: concurrent transfers")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        _bench(args)
+        return 0
+
+    server = StandInServer(
+        root=args.root, host=args.host, port=args.port, latency=args.latency,
+        throttle_bps=args.throttle, fail_rate=args.fail_rate, fail_status=args.fail_status,
+    )
+    print(f"tmpfiles stand-in listening on {server.base_url} (storage: {server.root})")
+    try:
+        server.start()
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
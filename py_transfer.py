@@ -0,0 +1,146 @@
+# py_transfer.py
+from __future__ import annotations
+from typing import Callable, Dict, Any, List
+from py_imports import *
+from py_progress import Progress
+import json
+import math
+import threading
+import time
+
+MB = 1024 * 1024
+
+
+class TransferProgress(Progress):
+    """
+    Progress of one request (an upload or a download); `total` is its size in bytes.
+    Events are py_progress events (items unused); the final one carries the latency.
+    """
+
+    def __init__(self, label: str, total: int | None, callback: Callable[[dict], None] | None = None, interval: float = 0.25):
+        super().__init__(label, bytes_total=total, callback=callback, interval=interval)
+
+    @property
+    def total(self) -> int | None:
+        return self.bytes_total
+
+    @total.setter
+    def total(self, value: int | None):
+        self.bytes_total = value
+
+
+class TransferStats:
+    """
+    Rolling per-request measurements (throughput, latency, errors), persisted in
+    %TEMP%/ModGnizer/transfer_stats.json so the next upload can size its parts
+    from how the link actually behaved last time.
+    """
+
+    STATS_NAME = "transfer_stats.json"
+    HISTORY = 20                 # requests kept per direction
+    TARGET_PART_SECONDS = 45     # aim for parts that finish in under a minute on this link
+    MIN_PART_SIZE = 8 * MB
+
+    def __init__(self, path: Path | None = None):
+        if path is None:
+            temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
+            path = temp_root / "ModGnizer" / self.STATS_NAME
+        self.path = Path(path)
+        self._records: Dict[str, List[dict]] | None = None
+        self._lock = threading.Lock()  # requests may finish on several worker threads
+
+    # -------------------------
+    # RECORDING
+    # -------------------------
+
+    def record(self, direction: str, nbytes: int, seconds: float, latency: float | None = None, ok: bool = True):
+        with self._lock:
+            records = self._load().setdefault(direction, [])
+            records.append({
+                "bytes": int(nbytes),
+                "seconds": round(float(seconds), 4),
+                "latency": round(float(latency), 4) if latency is not None else None,
+                "ok": bool(ok),
+                "at": time.time(),
+            })
+            del records[:-self.HISTORY]
+            self._save()
+
+    # -------------------------
+    # QUERIES
+    # -------------------------
+
+    def throughput(self, direction: str) -> float | None:
+        """Bytes/sec over recent successful requests, weighted by bytes moved."""
+        ok = [r for r in self._load().get(direction, []) if r["ok"] and r["seconds"] > 0]
+        if not ok:
+            return None
+        return sum(r["bytes"] for r in ok) / sum(r["seconds"] for r in ok)
+
+    def error_rate(self, direction: str) -> float:
+        records = self._load().get(direction, [])
+        if not records:
+            return 0.0
+        return sum(1 for r in records if not r["ok"]) / len(records)
+
+    def mean_latency(self, direction: str) -> float | None:
+        lat = [r["latency"] for r in self._load().get(direction, []) if r.get("latency") is not None]
+        return sum(lat) / len(lat) if lat else None
+
+    def choose_part_size(self, file_size: int, max_part: int, direction: str = "upload") -> int:
+        """
+        Pick a part size for file_size bytes.
+
+        - No history: use the server limit (fewest requests).
+        - Otherwise size parts to finish in ~TARGET_PART_SECONDS at the measured
+          rate, shrunk further when requests have been failing, so a retry costs less.
+        - Parts are then evened out so the last one isn't a tiny remainder.
+        """
+        rate = self.throughput(direction)
+        if rate is None:
+            size = max_part
+        else:
+            size = rate * self.TARGET_PART_SECONDS * (1.0 - self.error_rate(direction))
+
+        size = int(min(max(size, self.MIN_PART_SIZE), max_part))
+        if file_size <= size:
+            return size
+
+        parts = math.ceil(file_size / size)
+        even = math.ceil(file_size / parts)
+        return min(math.ceil(even / MB) * MB, max_part)
+
+    # -------------------------
+    # PERSISTENCE
+    # -------------------------
+
+    def _load(self) -> Dict[str, List[dict]]:
+        if self._records is None:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self._records = data if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                self._records = {}
+        return self._records
+
+    def _save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self._records), encoding="utf-8")
+        except OSError:
+            pass
+
+
+def format_rate(bps: float) -> str:
+    for unit in ("B/s", "KB/s", "MB/s"):
+        if bps < 1024:
+            return f"{bps:.1f} {unit}"
+        bps /= 1024
+    return f"{bps:.1f} GB/s"
+
+
+def format_eta(seconds: float | None) -> str:
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
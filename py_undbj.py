@@ -1,7 +1,22 @@
 import sqlite3, json
 from py_imports import *
+from py_catalog import InstanceCatalog, ProfileCatalog, ProfileRecord
+from py_jsonscan import read_top_level_fields
+from py_spans import span
+from concurrent.futures import ThreadPoolExecutor
 
 class UnDBJ:
+    # Top-level fields read from minecraftinstance.json: per field, its spellings across CurseForge
+    # versions in order of preference. The scan ends once each field has a value, and CurseForge
+    # writes these ahead of installedAddons, so the addon list is normally never read.
+    MANIFEST_FIELDS = (
+        ("lastPlayed", "last_played", "lastLaunch", "lastLaunchTime"),
+        ("name", "instanceName", "displayName"),
+        ("minecraftVersion", "version", "mcVersion", "minecraft_version", "gameVersion"),
+        ("modLoader", "modLoaderType", "loader", "modloader", "mod_loader", "baseModLoader"),
+    )
+    MANIFEST_WORKERS = 8
+
     def __init__(self, source_path):
         self.source_path = Path(source_path)
 
@@ -23,13 +38,25 @@ class UnDBJ:
         }
         """
 
+        profiles = self._get_raw_profiles()
+        return self._format_profiles(profiles) if profiles else []
+
+    def get_profile_catalog(self) -> ProfileCatalog:
+        """Same profiles as get_internal_profiles, as a searchable catalog formatted on demand."""
+        return ProfileCatalog(ProfileRecord.from_profile(p) for p in self._get_raw_profiles())
+
+    def _get_raw_profiles(self):
         if self.source_path.is_file() and self.source_path.suffix == ".db":
-            profiles = self._get_modrinth_profiles()
-            return self._format_profiles(profiles)
-        
+            with span("undbj.profiles", launcher="modrinth") as s:
+                profiles = self._get_modrinth_profiles()
+                s.add(items=len(profiles))
+                return profiles
+
         if not self.source_path.is_file():
-            profiles = self._get_curseforge_profiles()
-            return self._format_profiles(profiles)
+            with span("undbj.profiles", launcher="curseforge") as s:
+                profiles = self._get_curseforge_profiles()
+                s.add(items=len(profiles))
+                return profiles
 
         print(f"Unsupported profile source: {self.source_path}")
         return []
@@ -42,7 +69,7 @@ class UnDBJ:
         profiles = []
 
         try:
-            conn = sqlite3.connect(self.source_path)
+            conn = self._connect_readonly()
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT path, name, game_version, mod_loader, last_played FROM profiles"
@@ -64,7 +91,11 @@ class UnDBJ:
             print(f"Error reading Modrinth DB: {e}")
 
         return profiles
-    
+
+    def _connect_readonly(self) -> sqlite3.Connection:
+        # The launcher owns app.db: never create journals or take write locks on it
+        return sqlite3.connect(f"{self.source_path.resolve().as_uri()}?mode=ro", uri=True)
+
     # -------------------------
     # CURSEFORGE
     # -------------------------
@@ -91,132 +122,166 @@ class UnDBJ:
             if not base.exists() or not base.is_dir():
                 return profiles
 
-            # Each instance is typically a directory under the Instances folder
-            for inst in sorted(base.iterdir()):
-                try:
-                    if not inst.is_dir():
-                        continue
+            # Manifest locations and parsed fields from earlier scans
+            catalog = InstanceCatalog()
+            instances = []  # [inst, json_path, stat, data]
 
-                    # Candidate locations for minecraftinstance.json
-                    candidates = [
-                        inst / "minecraftinstance.json",
-                        inst / "instance" / "minecraftinstance.json",
-                        inst / "config" / "minecraftinstance.json",
-                    ]
-
-                    # Also search shallowly if not found in common spots
-                    if not any(p.exists() for p in candidates):
-                        found = None
-                        for p in inst.rglob("minecraftinstance.json"):
-                            # prefer files not buried too deep
-                            if len(p.relative_to(inst).parts) <= 4:
-                                found = p
-                                break
-                        if found:
-                            candidates.insert(0, found)
-
-                    json_path = next((p for p in candidates if p.exists()), None)
-                    if not json_path:
-                        # No manifest found; still add a minimal profile using folder name
-                        profiles.append({
-                            "path": inst / "mods",
-                            "folder": inst.name,
-                            "name": inst.name,
-                            "game_version": "unknown",
-                            "mod_loader": "unknown",
-                            "last_played": int(inst.stat().st_mtime) if inst.exists() else None,
-                        })
-                        continue
-
-                    with json_path.open("r", encoding="utf-8") as fh:
-                        try:
-                            data = json.load(fh)
-                        except Exception:
-                            # If JSON is malformed, fall back to folder-based profile
-                            profiles.append({
-                                "path": inst / "mods",
-                                "folder": inst.name,
-                                "name": inst.name,
-                                "game_version": "unknown",
-                                "mod_loader": "unknown",
-                                "last_played": int(inst.stat().st_mtime) if inst.exists() else None,
-                            })
+            # Each instance is typically a directory under the Instances folder
+            with span("undbj.curseforge.locate") as s:
+                for inst in sorted(base.iterdir()):
+                    try:
+                        if not inst.is_dir():
                             continue
-
-                    # Extract fields with multiple fallbacks to be robust across versions
-                    name = (
-                        data.get("name")
-                        or data.get("instanceName")
-                        or data.get("displayName")
-                        or inst.name
-                    )
-
-                    # Common keys for Minecraft version vary; try several
-                    game_version = (
-                        data.get("minecraftVersion")
-                        or data.get("version")
-                        or data.get("mcVersion")
-                        or data.get("minecraft_version")
-                        or "unknown"
-                    )
-
-                    # Mod loader info can be stored under different keys
-                    mod_loader = (
-                        data.get("modLoader")
-                        or data.get("modLoaderType")
-                        or data.get("loader")
-                        or data.get("modloader")
-                        or data.get("mod_loader")
-                        or "unknown"
-                    )
-
-                    # last_played: try explicit field, else use folder mtime as epoch seconds
-                    last_played = None
-                    for key in ("lastPlayed", "last_played", "lastLaunch", "lastLaunchTime"):
-                        if key in data and data[key]:
-                            try:
-                                # some manifests store ms, some seconds — normalize heuristically
-                                val = int(data[key])
-                                if val > 10**12:  # milliseconds
-                                    val = val // 1000
-                                last_played = val
-                                break
-                            except Exception:
-                                pass
-                    if last_played is None:
-                        try:
-                            last_played = int(inst.stat().st_mtime)
-                        except Exception:
-                            last_played = None
-
-                    # Best-effort mods path (typical CurseForge instance layout)
-                    mods_path = inst / "mods"
-                    if not mods_path.exists():
-                        # some instances use 'minecraft/mods' or 'instance/mods'
-                        alt = inst / "minecraft" / "mods"
-                        if alt.exists():
-                            mods_path = alt
-                        else:
-                            mods_path = inst / "mods"  # keep default even if missing
-
-                    profiles.append({
-                        "path": mods_path,
-                        "folder": inst.name,
-                        "name": name,
-                        "game_version": str(game_version),
-                        "mod_loader": str(mod_loader),
-                        "last_played": last_played,
-                    })
-
+                        json_path = catalog.manifest_path(inst) or self._find_instance_manifest(inst)
+                        st = json_path.stat() if json_path else None
+                        data = catalog.fields(inst, json_path, st) if json_path else None
+                        instances.append([inst, json_path, st, data])
+                    except Exception:
+                        # Skip problematic instance but continue scanning others
+                        continue
+                s.add(items=len(instances))
+
+            # Parse new or changed manifests concurrently (mostly disk-bound on a cold cache)
+            stale = [entry for entry in instances if entry[1] and entry[3] is None]
+            if stale:
+                with span("undbj.curseforge.parse") as s, ThreadPoolExecutor(max_workers=min(self.MANIFEST_WORKERS, len(stale))) as pool:
+                    for entry, data in zip(stale, pool.map(lambda e: self._read_instance_manifest(e[1]), stale)):
+                        entry[3] = data
+                        catalog.put(entry[0], entry[1], entry[2], data)
+                    s.add(bytes=sum(entry[2].st_size for entry in stale), items=len(stale))
+
+            for inst, _, _, data in instances:
+                try:
+                    profiles.append(self._build_curseforge_profile(inst, data))
                 except Exception:
-                    # Skip problematic instance but continue scanning others
                     continue
 
+            catalog.prune(base, {str(entry[0]) for entry in instances})
+            catalog.save()
+
         except Exception as e:
             print(f"Error reading Instances: {e}")
 
         return profiles
 
+    @staticmethod
+    def _build_curseforge_profile(inst: Path, data: dict | None) -> dict:
+        if not data:
+            # No manifest found, or it's malformed; still add a minimal profile using folder name
+            return {
+                "path": inst / "mods",
+                "folder": inst.name,
+                "name": inst.name,
+                "game_version": "unknown",
+                "mod_loader": "unknown",
+                "last_played": int(inst.stat().st_mtime) if inst.exists() else None,
+            }
+
+        last_played = data["last_played"]
+        if last_played is None:
+            try:
+                last_played = int(inst.stat().st_mtime)
+            except Exception:
+                last_played = None
+
+        # Best-effort mods path (typical CurseForge instance layout)
+        mods_path = inst / "mods"
+        if not mods_path.exists():
+            # some instances use 'minecraft/mods' or 'instance/mods'
+            alt = inst / "minecraft" / "mods"
+            if alt.exists():
+                mods_path = alt
+            else:
+                mods_path = inst / "mods"  # keep default even if missing
+
+        return {
+            "path": mods_path,
+            "folder": inst.name,
+            "name": data["name"] or inst.name,
+            "game_version": data["game_version"],
+            "mod_loader": data["mod_loader"],
+            "last_played": last_played,
+        }
+
+    @staticmethod
+    def _find_instance_manifest(inst: Path) -> Path | None:
+        # Candidate locations for minecraftinstance.json
+        candidates = [
+            inst / "minecraftinstance.json",
+            inst / "instance" / "minecraftinstance.json",
+            inst / "config" / "minecraftinstance.json",
+        ]
+        found = next((p for p in candidates if p.exists()), None)
+        if found:
+            return found
+
+        # Also search shallowly if not found in common spots
+        for p in inst.rglob("minecraftinstance.json"):
+            # prefer files not buried too deep
+            if len(p.relative_to(inst).parts) <= 4:
+                return p
+        return None
+
+    @staticmethod
+    def _read_instance_manifest(json_path: Path) -> dict:
+        """Fields ModGnizer uses from minecraftinstance.json; {} if the JSON is malformed."""
+        try:
+            # Streams past installedAddons and the other large values instead of loading them
+            data = read_top_level_fields(json_path, UnDBJ.MANIFEST_FIELDS)
+        except Exception:
+            return {}
+
+        # Extract fields with multiple fallbacks to be robust across versions
+        name = (
+            data.get("name")
+            or data.get("instanceName")
+            or data.get("displayName")
+        )
+
+        # Common keys for Minecraft version vary; try several
+        game_version = (
+            data.get("minecraftVersion")
+            or data.get("version")
+            or data.get("mcVersion")
+            or data.get("minecraft_version")
+            or data.get("gameVersion")
+            or "unknown"
+        )
+
+        # Mod loader info can be stored under different keys
+        mod_loader = (
+            data.get("modLoader")
+            or data.get("modLoaderType")
+            or data.get("loader")
+            or data.get("modloader")
+            or data.get("mod_loader")
+            or "unknown"
+        )
+        if mod_loader == "unknown" and isinstance(data.get("baseModLoader"), dict):
+            # Current CurseForge only has {"name": "forge-47.2.0", ...}
+            mod_loader = str(data["baseModLoader"].get("name") or "unknown").split("-")[0]
+
+        # last_played: explicit field if present (the caller falls back to folder mtime)
+        last_played = None
+        for key in ("lastPlayed", "last_played", "lastLaunch", "lastLaunchTime"):
+            if key in data and data[key]:
+                try:
+                    # some manifests store ms, some seconds — normalize heuristically
+                    val = int(data[key])
+                    if val > 10**12:  # milliseconds
+                        val = val // 1000
+                    last_played = val
+                    break
+                except Exception:
+                    pass
+
+        return {
+            "name": name,
+            "game_version": str(game_version),
+            "mod_loader": str(mod_loader),
+            "last_played": last_played,
+        }
+
 
     # -------------------------
     # FORMATTER
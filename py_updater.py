@@ -1,12 +1,26 @@
 import re
-import requests
+import os
+import json
+import hashlib
+import threading
 from pathlib import Path
 import sys
 import subprocess
 from urllib.parse import urlparse
 import time
+from py_progress import Progress
+from py_delta import apply_patch, read_header
 
 GITHUB_API = "https://api.github.com/repos/LukieD4/ModGnizer/releases/latest"
+RELEASE_CACHE_TTL = 6 * 60 * 60  # seconds a cached release is used without asking GitHub
+DOWNLOAD_CHUNK = 1024 * 1024
+DOWNLOAD_TIMEOUT = (10, 60)      # seconds to connect, seconds between bytes
+# Delta patch from one build to the next, shipped next to the full exe (see py_delta)
+PATCH_NAME = re.compile(r".+-(\d[\w.]*)-to-(\d[\w.]*)\.mgpatch$", re.IGNORECASE)
+
+
+class UpdateIntegrityError(Exception):
+    pass
 
 def clean_markdown(text: str) -> str:
     lines = text.splitlines()
@@ -22,23 +36,94 @@ def get_local_version(version_file: Path) -> str:
         return "0.0.0"
     return version_file.read_text().strip()
 
-def get_latest_release():
-    resp = requests.get(GITHUB_API, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
+def _release_cache_path() -> Path:
+    temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
+    return temp_root / "ModGnizer" / "release_cache.json"
+
+def _load_release_cache() -> dict:
+    try:
+        data = json.loads(_release_cache_path().read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) and isinstance(data.get("release"), dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_release_cache(cache: dict):
+    path = _release_cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(cache), encoding="utf-8")
+        tmp.replace(path)
+    except OSError:
+        pass
+
+def _parse_asset(asset: dict) -> dict:
+    # GitHub reports "digest": "sha256:<hex>" for release assets
+    digest = asset.get("digest") or ""
+    return {
+        "name": asset.get("name") or Path(urlparse(asset["browser_download_url"]).path).name,
+        "url": asset["browser_download_url"],
+        "size": asset.get("size"),
+        "sha256": digest[len("sha256:"):].lower() if digest.startswith("sha256:") else None,
+    }
 
+def _parse_release(data: dict) -> dict:
     tag = data.get("tag_name", "") or data.get("name", "") or ""
 
-    assets = data.get("assets", [])
-    download_url = assets[0]["browser_download_url"] if assets else ""
+    assets = [_parse_asset(a) for a in data.get("assets", []) if a.get("browser_download_url")]
+    # The full build (e.g., ModGnizer-288.exe); patches are assets too
+    full = next((a for a in assets if a["name"].lower().endswith(".exe")), assets[0] if assets else None)
     changelog = data.get("body", "No release notes provided.")
 
-    # Extract asset filename (e.g., ModGnizer-288.exe)
-    asset_name = ""
-    if download_url:
-        asset_name = Path(urlparse(download_url).path).name
+    return {
+        "tag": tag,
+        "download_url": full["url"] if full else "",
+        "changelog": changelog,
+        "asset_name": full["name"] if full else "",
+        "size": full["size"] if full else None,
+        "sha256": full["sha256"] if full else None,
+        "assets": assets,
+    }
+
+def get_latest_release(max_age: float = RELEASE_CACHE_TTL):
+    """Latest release as (tag, download_url, changelog, asset_name); see get_latest_release_info."""
+    r = get_latest_release_info(max_age)
+    return r["tag"], r["download_url"], r["changelog"], r["asset_name"]
 
-    return tag, download_url, changelog, asset_name
+def get_latest_release_info(max_age: float = RELEASE_CACHE_TTL) -> dict:
+    """
+    Latest release as a dict: tag, download_url, changelog, asset_name, size,
+    sha256 (of the full build, when GitHub reports it) and assets.
+
+    The release is cached in %TEMP%/ModGnizer/release_cache.json with GitHub's ETag:
+    within max_age seconds the cached copy is returned without any request; after
+    that GitHub is asked with If-None-Match, and a 304 (which doesn't count against
+    the API rate limit) just renews the cached copy. If GitHub can't be reached,
+    a cached release of any age is used rather than failing.
+    """
+    cache = _load_release_cache()
+    if cache and time.time() - cache.get("fetched_at", 0) < max_age:
+        return cache["release"]
+
+    import requests  # deferred: only needed once the check actually runs
+    headers = {"If-None-Match": cache["etag"]} if cache.get("etag") else {}
+    try:
+        resp = requests.get(GITHUB_API, headers=headers, timeout=10)
+        if resp.status_code == 304 and cache:
+            release = cache["release"]
+        else:
+            resp.raise_for_status()
+            release = _parse_release(resp.json())
+            cache = {"etag": resp.headers.get("ETag"), "release": release}
+    except requests.RequestException:
+        if not cache:
+            raise
+        release = cache["release"]
+    else:
+        cache["fetched_at"] = time.time()
+        _save_release_cache(cache)
+
+    return release
 
 _VERSION_PARTS = 3
 
@@ -65,34 +150,96 @@ def _normalize_version(v: str):
 def is_newer(local: str, remote: str) -> bool:
     return _normalize_version(remote) > _normalize_version(local)
 
-def download_file(url: str, dest: Path):
-    print(url,dest)
-    input()
-    r = requests.get(url, stream=True)
-    r.raise_for_status()
-    with dest.open("wb") as f:
-        for chunk in r.iter_content(8192):
-            if chunk:
-                f.write(chunk)
+def download_file(url: str, dest: Path, expected_sha256: str | None = None, expected_size: int | None = None) -> str:
+    """
+    Stream url into dest in DOWNLOAD_CHUNK reads, hashing as it is written; returns the SHA-256.
 
-def check_for_updates(version_file: Path, consent_callback=None):
+    Written to <dest>.part and renamed only once complete and verified. A size or
+    checksum mismatch raises UpdateIntegrityError (a wrong size as soon as it shows,
+    before the rest is downloaded) and leaves nothing behind.
+    """
+    import requests
+    dest = Path(dest)
+    part = dest.with_name(dest.name + ".part")
+    digest = hashlib.sha256()
+    try:
+        with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as r:
+            r.raise_for_status()
+            length = r.headers.get("Content-Length")
+            length = int(length) if length and length.isdigit() and not r.headers.get("Content-Encoding") else None
+            if expected_size is not None and length is not None and length != expected_size:
+                raise UpdateIntegrityError(f"{dest.name}: server reports {length} bytes, expected {expected_size}.")
+
+            with Progress(f"Downloading {dest.name}", expected_size or length) as progress, part.open("wb") as f:
+                for chunk in r.iter_content(DOWNLOAD_CHUNK):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    progress.update(len(chunk))
+                    if expected_size is not None and progress.bytes_done > expected_size:
+                        raise UpdateIntegrityError(f"{dest.name}: more data than the expected {expected_size} bytes.")
+
+        if expected_size is not None and progress.bytes_done != expected_size:
+            raise UpdateIntegrityError(f"{dest.name}: got {progress.bytes_done} bytes, expected {expected_size}.")
+        if expected_sha256 and digest.hexdigest() != expected_sha256.lower():
+            raise UpdateIntegrityError(f"{dest.name}: checksum mismatch (expected {expected_sha256}, got {digest.hexdigest()}).")
+        part.replace(dest)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    return digest.hexdigest()
+
+def _find_patch(release: dict, local: str) -> dict | None:
+    """The release's delta patch from the local build, if it ships one."""
+    for asset in release.get("assets") or []:
+        m = PATCH_NAME.match(asset["name"])
+        if m and _normalize_version(m[1]) == _normalize_version(local) and _normalize_version(m[2]) == _normalize_version(release["tag"]):
+            return asset
+    return None
+
+def _install_from_patch(release: dict, exe_path: Path, dest: Path) -> bool:
+    """Rebuild the new exe from the running one + the release's patch. False (after saying why) to fall back to the full download."""
+    patch = release.get("patch")
+    if not patch:
+        return False
+    temp_root = Path(os.environ.get("TEMP", Path.home() / "AppData/Local/Temp"))
+    patch_path = temp_root / "ModGnizer" / patch["name"]
     try:
-        local = get_local_version(version_file)
-        remote_tag, url, changelog, asset_name = get_latest_release()
+        patch_path.parent.mkdir(parents=True, exist_ok=True)
+        download_file(patch["url"], patch_path, patch.get("sha256"), patch.get("size"))
+        with Progress("Applying update patch", read_header(patch_path)["new_size"]) as progress:
+            digest = apply_patch(exe_path, patch_path, dest, on_bytes=progress.update)
+        if release.get("sha256") and digest != release["sha256"]:
+            dest.unlink(missing_ok=True)
+            raise UpdateIntegrityError("patched build doesn't match the release checksum")
+        return True
+    except Exception as e:
+        print(f"Delta update not possible ({e}); downloading the full update instead.")
+        return False
+    finally:
+        patch_path.unlink(missing_ok=True)
 
-        print(clean_markdown(changelog))
+def find_update(version_file: Path):
+    """The latest release as a dict (see get_latest_release_info, plus "patch") when it is newer than the local build, else None."""
+    local = get_local_version(version_file)
+    release = dict(get_latest_release_info())
+    if not is_newer(local, release["tag"]):
+        return None
+    release["patch"] = _find_patch(release, local)
+    return release
 
-        if is_newer(): return False
+def install_update(release: dict, consent_callback=None):
+    """Show the changelog, ask, then download the new exe and hand over to it (exits the app)."""
+    try:
+        print(clean_markdown(release["changelog"]))
 
-        if not consent_callback():
+        if consent_callback and not consent_callback():
             return False
 
+        url, asset_name = release["download_url"], release["asset_name"]
         if not url:
             print("Update check failed: release has no downloadable asset.")
             return False
 
-        print("\nDownloading update...")
-
         # IMPORTANT: use the ORIGINAL EXE, not the temp one
         exe_path = Path(sys.argv[0]).resolve()
 
@@ -100,7 +247,13 @@ def check_for_updates(version_file: Path, consent_callback=None):
         new_exe_path = exe_path.with_name(asset_name)
         tmp_new = new_exe_path.with_suffix(".exe")
 
-        download_file(url, tmp_new)
+        # A patch against the running build moves a fraction of the bytes; else the full exe
+        patch = release.get("patch")
+        if patch and patch.get("size") and release.get("size"):
+            print(f"\nDownloading update patch ({patch['size'] * 100 // release['size']}% of the full build)...")
+        if not _install_from_patch(release, exe_path, tmp_new):
+            print("\nDownloading update...")
+            download_file(url, tmp_new, release.get("sha256"), release.get("size"))
 
         updater_bat = exe_path.with_suffix(".update.bat")
 
@@ -121,6 +274,52 @@ def check_for_updates(version_file: Path, consent_callback=None):
 
         sys.exit(0)
 
+    except Exception as e:
+        print(f"Update failed: {e}")
+        return False
+
+def check_for_updates(version_file: Path, consent_callback=None):
+    """Blocking check + install, as one step."""
+    try:
+        release = find_update(version_file)
     except Exception as e:
         print(f"Update check failed: {e}")
         return False
+    if not release:
+        return False
+    return install_update(release, consent_callback)
+
+
+class UpdateCheck:
+    """
+    Runs find_update on a background thread so startup never waits on GitHub.
+
+        check = UpdateCheck(version_file).start()
+        ...
+        if check.release: ...   # set once the check finished and found a newer build
+    """
+
+    def __init__(self, version_file: Path):
+        self.version_file = Path(version_file)
+        self.release = None
+        self.error = None
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def start(self) -> "UpdateCheck":
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    def _run(self):
+        try:
+            self.release = find_update(self.version_file)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
@@ -0,0 +1,339 @@
+# py_watch.py
+from __future__ import annotations
+from typing import Callable, Dict, Iterable, Set
+from py_imports import *
+import ctypes
+import ctypes.util
+import select
+import struct
+import threading
+import time
+
+
+class _PollingBackend:
+    """Portable fallback: compares directory listings (name, size, mtime) every `interval` seconds."""
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self._dirs: Dict[Path, Dict[str, tuple]] = {}
+        self._last_poll = 0.0
+
+    def add(self, directory: Path):
+        self._dirs[directory] = self._snapshot(directory)
+
+    def remove(self, directory: Path):
+        self._dirs.pop(directory, None)
+
+    def wait(self, timeout: float) -> Set[Path]:
+        delay = max(0.0, self._last_poll + self.interval - time.monotonic())
+        time.sleep(min(delay, timeout))
+        if time.monotonic() - self._last_poll < self.interval:
+            return set()
+        self._last_poll = time.monotonic()
+
+        changed: Set[Path] = set()
+        for directory, before in list(self._dirs.items()):
+            after = self._snapshot(directory)
+            if after is None and before is None:
+                continue
+            if directory not in self._dirs:
+                continue  # unwatched meanwhile
+            self._dirs[directory] = after
+            before, after = before or {}, after or {}
+            for name in before.keys() | after.keys():
+                if before.get(name) != after.get(name):
+                    changed.add(directory / name)
+        return changed
+
+    def close(self):
+        self._dirs.clear()
+
+    @staticmethod
+    def _snapshot(directory: Path) -> Dict[str, tuple] | None:
+        try:
+            with os.scandir(directory) as it:
+                out = {}
+                for entry in it:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                        out[entry.name] = (st.st_size, st.st_mtime_ns, entry.is_dir(follow_symlinks=False))
+                    except OSError:
+                        continue
+                return out
+        except OSError:
+            return None
+
+
+class _InotifyBackend:
+    """Linux inotify through libc (ctypes); only created when inotify_init1 is available."""
+
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_IGNORED = 0x8000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+
+        self._fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: Dict[int, Path] = {}
+
+    def add(self, directory: Path):
+        wd = self._add_watch(self._fd, os.fsencode(str(directory)), self.MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self._watches[wd] = directory
+
+    def remove(self, directory: Path):
+        for wd, path in list(self._watches.items()):
+            if path == directory:
+                self._rm_watch(self._fd, wd)
+                self._watches.pop(wd, None)
+
+    def wait(self, timeout: float) -> Set[Path]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed: Set[Path] = set()
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            wd, mask, _, name_len = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + name_len].rstrip(b"\0")
+            offset += name_len
+
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            if mask & self.IN_IGNORED:
+                # Watched directory went away
+                self._watches.pop(wd, None)
+                changed.add(directory)
+                continue
+            changed.add(directory / os.fsdecode(name) if name else directory)
+        return changed
+
+    def close(self):
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+        self._watches.clear()
+
+
+class FileWatcher:
+    """
+    Watches a set of directories (not recursively) and calls on_change(paths) from a
+    background thread with the paths that changed, batched until things have been
+    quiet for `debounce` seconds. Uses inotify where available, polling otherwise.
+    """
+
+    WAIT = 0.25  # longest a backend blocks, so stop() is noticed promptly
+
+    def __init__(self, on_change: Callable[[Set[Path]], None], interval: float = 2.0, debounce: float = 0.5, use_inotify: bool = True):
+        self.on_change = on_change
+        self.debounce = debounce
+        self._backend = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._backend = _InotifyBackend()
+            except (OSError, AttributeError):
+                self._backend = None
+        if self._backend is None:
+            self._backend = _PollingBackend(interval)
+
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def kind(self) -> str:
+        return "inotify" if isinstance(self._backend, _InotifyBackend) else "polling"
+
+    def watch(self, directory: Path) -> bool:
+        try:
+            self._backend.add(Path(directory))
+            return True
+        except OSError:
+            return False
+
+    def unwatch(self, directory: Path):
+        self._backend.remove(Path(directory))
+
+    def start(self) -> "FileWatcher":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._backend.close()
+
+    def _run(self):
+        pending: Set[Path] = set()
+        last_event = 0.0
+        while not self._stop.is_set():
+            changed = self._backend.wait(self.WAIT)
+            if changed:
+                pending |= changed
+                last_event = time.monotonic()
+
+            if pending and time.monotonic() - last_event >= self.debounce:
+                batch, pending = pending, set()
+                try:
+                    self.on_change(batch)
+                except Exception:
+                    # A failed refresh must not kill the watcher
+                    pass
+
+
+class ProfileWatch:
+    """
+    Optional background upkeep for the launcher profiles:
+
+    - the profile roots are watched so a profile being added or removed marks that
+      launcher's profile list stale (on_profiles_changed) and rebuilds it;
+    - every profile's mods folder is watched and changed files are re-hashed into
+      the HashCache straight away, so the review step finds current digests.
+
+    On start the most recently played profiles are hashed once in the background.
+    """
+
+    WARM_PROFILES = 3
+
+    def __init__(
+        self,
+        managers: Iterable[dict],
+        hash_cache,
+        on_profiles_changed: Callable[[dict], None],
+        load_profiles: Callable[[dict], Iterable] | None = None,
+    ):
+        """
+        Args:
+            managers: mod manager dicts as built by App.detect_mod_managers
+            hash_cache: HashCache to keep current
+            on_profiles_changed: called with the manager whose profile list is stale
+            load_profiles: returns the manager's profile records, most recent first;
+                           used to rebuild the list after a change and to pick profiles to warm
+        """
+        self.managers = list(managers)
+        self.hash_cache = hash_cache
+        self.on_profiles_changed = on_profiles_changed
+        self.load_profiles = load_profiles
+        self.watcher = FileWatcher(self._on_change)
+        self._roots: Dict[Path, dict] = {}
+        self._mods_dirs: Set[Path] = set()
+        self._stop = threading.Event()
+
+    def start(self) -> "ProfileWatch":
+        for manager in self.managers:
+            root = Path(manager["profiles_path"])
+            if self.watcher.watch(root):
+                self._roots[root] = manager
+            self._watch_mods_dirs(root)
+        self.watcher.start()
+        threading.Thread(target=self._warm, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.watcher.stop()
+        self.hash_cache.save()
+
+    # -------------------------
+    # HELPERS
+    # -------------------------
+
+    def _watch_mods_dirs(self, root: Path):
+        try:
+            profiles = [p for p in root.iterdir() if p.is_dir()]
+        except OSError:
+            return
+        for profile in profiles:
+            mods = profile / "mods"
+            if mods not in self._mods_dirs and mods.is_dir() and self.watcher.watch(mods):
+                self._mods_dirs.add(mods)
+
+    def _on_change(self, paths: Set[Path]):
+        stale = {}
+        for path in paths:
+            parent = path.parent
+            if parent in self._roots:
+                # A profile folder came, went or changed
+                stale[parent] = self._roots[parent]
+                if not path.exists():
+                    self._drop_mods_dir(path / "mods")
+            elif parent in self._mods_dirs:
+                self._refresh(path)
+            elif path in self._mods_dirs and not path.exists():
+                self._drop_mods_dir(path)
+
+        for root, manager in stale.items():
+            self._watch_mods_dirs(root)
+            self.on_profiles_changed(manager)
+            if self.load_profiles:
+                # Rebuild now, so the next visit to the profile picker doesn't have to
+                try:
+                    self.load_profiles(manager)
+                except Exception:
+                    pass
+        self.hash_cache.save()
+
+    def _drop_mods_dir(self, mods: Path):
+        if mods in self._mods_dirs:
+            self._mods_dirs.discard(mods)
+            self.watcher.unwatch(mods)
+
+    def _refresh(self, path: Path):
+        if path.is_file():
+            try:
+                self.hash_cache.digest(path)
+            except OSError:
+                pass
+        else:
+            self.hash_cache.forget(path)
+
+    def _warm(self):
+        if not self.load_profiles:
+            return
+        for manager in self.managers:
+            try:
+                records = list(self.load_profiles(manager))[:self.WARM_PROFILES]
+            except Exception:
+                continue
+            for record in records:
+                mods = Path(manager["profiles_path"]) / record["folder"] / "mods"
+                try:
+                    files = [p for p in mods.iterdir() if p.is_file()]
+                except OSError:
+                    continue
+                for f in files:
+                    if self._stop.is_set():
+                        return
+                    try:
+                        self.hash_cache.digest(f)
+                    except OSError:
+                        pass
+        self.hash_cache.save()